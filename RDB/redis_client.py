@@ -1,4 +1,7 @@
+import asyncio
+import weakref
 import redis
+from redis import asyncio as aioredis
 
 from app.helpers.variables import REDIS_HOST, REDIS_PORT
 
@@ -9,5 +12,28 @@ redis_client = redis.Redis(
     decode_responses=True
 )
 
+# redis.asyncio connections belong to the loop that opened them, so each
+# event loop (one in the server, one per test) gets its own client.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
 def get_redis_client():
-    return redis_client
\ No newline at end of file
+    return redis_client
+
+def get_async_redis_client() -> aioredis.Redis:
+    """Client for code running on the event loop; use this instead of redis_client there."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = aioredis.Redis(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=0,
+            decode_responses=True
+        )
+        _async_clients[loop] = client
+    return client
+
+async def close_async_redis_client():
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -9,6 +9,7 @@ from app.db.models.user import USER, USER_SESSION, USER_META
 from app.db.models.shop import SHOP
 from app.db.models.item import ITEM
 from app.db.models.inventory import INVENTORY
+from app.db.models.counter import ROW_COUNTER
 
 config = context.config
 
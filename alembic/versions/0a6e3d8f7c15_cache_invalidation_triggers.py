@@ -0,0 +1,95 @@
+"""Notify cache listeners of shop, item and inventory changes
+
+Revision ID: 0a6e3d8f7c15
+Revises: d41a7c9e2b58
+Create Date: 2026-10-18 15:48:21.337902
+
+Statement-level triggers send one NOTIFY on channel ``nearbuy_cache`` per
+write statement, carrying the distinct key columns of the rows it touched.
+app/db/cache_bus.py listens and evicts the matching Redis entries; it also
+installs the same DDL on databases bootstrapped from the models.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a6e3d8f7c15'
+down_revision: Union[str, Sequence[str], None] = 'd41a7c9e2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+KEY_COLUMNS = {
+    "shop": ["shop_id", "owner_id"],
+    "item": ["id", "shop_id", "itemName"],
+    "inventory": ["inventory_id", "shop_id", "item_id"],
+}
+TRANSITIONS = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "UPDATE": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION nearbuy_notify_cache() RETURNS trigger AS $$
+        DECLARE
+            keys jsonb := '[]'::jsonb;
+            changed jsonb;
+            payload text;
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                SELECT coalesce(jsonb_agg(DISTINCT picked.obj), '[]'::jsonb) INTO changed
+                FROM new_rows r
+                CROSS JOIN LATERAL (
+                    SELECT jsonb_object_agg(k, to_jsonb(r) -> k) AS obj FROM unnest(TG_ARGV) AS k
+                ) picked;
+                keys := keys || changed;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                SELECT coalesce(jsonb_agg(DISTINCT picked.obj), '[]'::jsonb) INTO changed
+                FROM old_rows r
+                CROSS JOIN LATERAL (
+                    SELECT jsonb_object_agg(k, to_jsonb(r) -> k) AS obj FROM unnest(TG_ARGV) AS k
+                ) picked;
+                keys := keys || changed;
+            END IF;
+            IF keys = '[]'::jsonb THEN
+                RETURN NULL;
+            END IF;
+            payload := jsonb_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'keys', keys)::text;
+            IF octet_length(payload) > 7900 THEN
+                payload := jsonb_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'all', true)::text;
+            END IF;
+            PERFORM pg_notify('nearbuy_cache', payload);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    inspector = sa.inspect(op.get_bind())
+    for table, columns in KEY_COLUMNS.items():
+        if not inspector.has_table(table):
+            continue
+        args = ", ".join(f"'{c}'" for c in columns)
+        for event, referencing in TRANSITIONS.items():
+            name = f"{table}_notify_cache_{event.lower()}"
+            op.execute(f'DROP TRIGGER IF EXISTS {name} ON "{table}"')
+            op.execute(
+                f'CREATE TRIGGER {name} AFTER {event} ON "{table}" {referencing} '
+                f"FOR EACH STATEMENT EXECUTE FUNCTION nearbuy_notify_cache({args})"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    for table in KEY_COLUMNS:
+        if inspector.has_table(table):
+            for event in TRANSITIONS:
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_notify_cache_{event.lower()} ON "{table}"')
+    op.execute("DROP FUNCTION IF EXISTS nearbuy_notify_cache()")
@@ -0,0 +1,70 @@
+"""Add indexes for the hot lookup paths
+
+Revision ID: 3c9d2e7a41b8
+Revises: 6fa6a760f6b1
+Create Date: 2026-10-18 10:02:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d2e7a41b8'
+down_revision: Union[str, Sequence[str], None] = '6fa6a760f6b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns, unique) - kept in sync with the model declarations.
+INDEXES = [
+    ("uq_item_shop_id_itemName", "item", ["shop_id", "itemName"], True),
+    ("ix_shop_owner_id", "shop", ["owner_id"], False),
+    ("ix_shop_shopName", "shop", ["shopName"], False),
+    ("ix_inventory_shop_id", "inventory", ["shop_id"], False),
+    ("ix_inventory_item_id", "inventory", ["item_id"], False),
+    ("ix_user_session_expired_at", "user_session", ["expired_at"], False),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # Tables are created by SQLModel.metadata.create_all on first start, with these
+    # indexes already declared; only existing tables need them added here.
+    existing = set(sa.inspect(bind).get_table_names())
+    indexes = [i for i in INDEXES if i[1] in existing]
+
+    duplicates = "item" in existing and bind.execute(sa.text(
+        'SELECT count(*) FROM (SELECT 1 FROM item GROUP BY shop_id, "itemName" HAVING count(*) > 1) d'
+    )).scalar()
+    if duplicates:
+        # Checked up front so a failed unique build does not leave an INVALID index behind.
+        raise RuntimeError(
+            f"{duplicates} (shop_id, itemName) pairs are duplicated in item; "
+            "remove the duplicates before applying this revision."
+        )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; the tables stay
+    # writable while each index builds.
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in indexes:
+            op.create_index(
+                name, table, columns,
+                unique=unique,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,125 @@
+"""Optionally hash-partition item and inventory by shop_id
+
+Revision ID: 5b7d2f9a0c41
+Revises: 8e1f4b2c9d30
+Create Date: 2026-10-18 14:05:52.730114
+
+Only does something when SHOP_HASH_PARTITIONS is set (> 0). To switch an
+existing database over later, set it and run
+``alembic downgrade 8e1f4b2c9d30 && alembic upgrade head``; the downgrade
+turns partitioned tables back into plain ones whatever the setting is.
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7d2f9a0c41'
+down_revision: Union[str, Sequence[str], None] = '8e1f4b2c9d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, columns, unique) - kept in sync with the model declarations.
+INDEXES = {
+    "item": [
+        ("ix_item_id", ["id"], False),
+        ("ix_item_itemName", ["itemName"], False),
+        ("uq_item_shop_id_itemName", ["shop_id", "itemName"], True),
+    ],
+    "inventory": [
+        ("ix_inventory_shop_id", ["shop_id"], False),
+        ("ix_inventory_item_id", ["item_id"], False),
+    ],
+}
+PLAIN_KEYS = {"item": ["id"], "inventory": ["inventory_id", "shop_id", "item_id"]}
+PARTITIONED_KEYS = {"item": ["id", "shop_id"], "inventory": ["inventory_id", "shop_id", "item_id"]}
+
+
+def _is_partitioned(bind, table: str) -> bool:
+    return bind.execute(
+        sa.text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:t)"), {"t": table}
+    ).scalar() is True
+
+
+def _quoted(columns):
+    return ", ".join(f'"{c}"' for c in columns)
+
+
+def _rebuild(table: str, keys, partitions: int):
+    """Recreate ``table`` (plain, or HASH partitioned when ``partitions``) and copy its rows."""
+    old = f"{table}_old"
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    op.execute(f"ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey")
+    for name, _, _ in INDEXES[table]:
+        op.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+    partition_by = " PARTITION BY HASH (shop_id)" if partitions else ""
+    op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS){partition_by}")
+    for remainder in range(partitions):
+        op.execute(
+            f"CREATE TABLE {table}_h{remainder} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({_quoted(keys)})")
+    op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    op.execute(f"DROP TABLE {old}")
+    for name, columns, unique in INDEXES[table]:
+        op.execute(f'CREATE {"UNIQUE " if unique else ""}INDEX "{name}" ON {table} ({_quoted(columns)})')
+    op.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_shop_id_fkey "
+        f"FOREIGN KEY (shop_id) REFERENCES shop (shop_id)"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    partitions = int(os.getenv("SHOP_HASH_PARTITIONS", "0"))
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if (
+        not partitions
+        or not (inspector.has_table("item") and inspector.has_table("inventory"))
+        or _is_partitioned(bind, "item")
+    ):
+        return
+
+    mismatched = bind.execute(sa.text(
+        "SELECT count(*) FROM inventory v JOIN item i ON i.id = v.item_id WHERE i.shop_id <> v.shop_id"
+    )).scalar()
+    if mismatched:
+        # The partitioned item table can only be referenced by (id, shop_id).
+        raise RuntimeError(
+            f"{mismatched} inventory rows point at an item of another shop; "
+            "fix them before applying this revision."
+        )
+
+    op.execute("ALTER TABLE inventory DROP CONSTRAINT IF EXISTS inventory_item_id_fkey")
+    op.execute("ALTER TABLE inventory DROP CONSTRAINT IF EXISTS inventory_shop_id_fkey")
+    op.execute("ALTER TABLE item DROP CONSTRAINT IF EXISTS item_shop_id_fkey")
+    _rebuild("item", PARTITIONED_KEYS["item"], partitions)
+    _rebuild("inventory", PARTITIONED_KEYS["inventory"], partitions)
+    op.execute(
+        "ALTER TABLE inventory ADD CONSTRAINT inventory_item_id_fkey "
+        "FOREIGN KEY (item_id, shop_id) REFERENCES item (id, shop_id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if not _is_partitioned(bind, "item"):
+        return
+
+    op.execute("ALTER TABLE inventory DROP CONSTRAINT IF EXISTS inventory_item_id_fkey")
+    op.execute("ALTER TABLE inventory DROP CONSTRAINT IF EXISTS inventory_shop_id_fkey")
+    op.execute("ALTER TABLE item DROP CONSTRAINT IF EXISTS item_shop_id_fkey")
+    _rebuild("item", PLAIN_KEYS["item"], 0)
+    _rebuild("inventory", PLAIN_KEYS["inventory"], 0)
+    op.execute(
+        "ALTER TABLE inventory ADD CONSTRAINT inventory_item_id_fkey "
+        "FOREIGN KEY (item_id) REFERENCES item (id)"
+    )
@@ -0,0 +1,126 @@
+"""Trigger-maintained row counters for shop, item and user
+
+Revision ID: 6c2b9e4f1a87
+Revises: 0a6e3d8f7c15
+Create Date: 2026-10-18 16:20:07.518443
+
+row_counter holds one row per counted table ("shop") plus one per user role
+("user:role:VENDOR"). Statement-level triggers keep them current so totals
+are a primary-key lookup instead of COUNT(*); app/db/counters.py reads them
+and installs the same DDL on databases bootstrapped from the models.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c2b9e4f1a87'
+down_revision: Union[str, Sequence[str], None] = '0a6e3d8f7c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# table -> column with per-value counters (None: total only)
+COUNTED_TABLES = {"shop": None, "item": None, "user": "role"}
+EVENTS = ["insert", "update", "delete", "truncate"]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "row_counter",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("value", sa.BigInteger(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.execute("""
+        CREATE OR REPLACE FUNCTION nearbuy_count_rows() RETURNS trigger AS $$
+        DECLARE
+            group_column text := TG_ARGV[0];
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                UPDATE row_counter SET value = 0
+                WHERE name = TG_TABLE_NAME OR starts_with(name, TG_TABLE_NAME || ':');
+            ELSIF TG_OP = 'INSERT' THEN
+                WITH changed(name, delta) AS (
+                    SELECT TG_TABLE_NAME, 1 FROM new_rows
+                    UNION ALL
+                    SELECT TG_TABLE_NAME || ':' || group_column || ':' || coalesce(to_jsonb(r) ->> group_column, ''), 1 FROM new_rows r WHERE group_column IS NOT NULL
+                )
+                INSERT INTO row_counter (name, value)
+                SELECT name, sum(delta) FROM changed
+                GROUP BY name HAVING sum(delta) <> 0
+                ORDER BY name
+                ON CONFLICT (name) DO UPDATE SET value = row_counter.value + excluded.value;
+            ELSIF TG_OP = 'DELETE' THEN
+                WITH changed(name, delta) AS (
+                    SELECT TG_TABLE_NAME, -1 FROM old_rows
+                    UNION ALL
+                    SELECT TG_TABLE_NAME || ':' || group_column || ':' || coalesce(to_jsonb(r) ->> group_column, ''), -1 FROM old_rows r WHERE group_column IS NOT NULL
+                )
+                INSERT INTO row_counter (name, value)
+                SELECT name, sum(delta) FROM changed
+                GROUP BY name HAVING sum(delta) <> 0
+                ORDER BY name
+                ON CONFLICT (name) DO UPDATE SET value = row_counter.value + excluded.value;
+            ELSE
+                -- UPDATE: the total is unchanged, only rows moving between groups count.
+                WITH changed(name, delta) AS (
+                    SELECT TG_TABLE_NAME || ':' || group_column || ':' || coalesce(to_jsonb(r) ->> group_column, ''), 1 FROM new_rows r
+                    UNION ALL
+                    SELECT TG_TABLE_NAME || ':' || group_column || ':' || coalesce(to_jsonb(r) ->> group_column, ''), -1 FROM old_rows r
+                )
+                INSERT INTO row_counter (name, value)
+                SELECT name, sum(delta) FROM changed
+                GROUP BY name HAVING sum(delta) <> 0
+                ORDER BY name
+                ON CONFLICT (name) DO UPDATE SET value = row_counter.value + excluded.value;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    inspector = sa.inspect(op.get_bind())
+    for table, column in COUNTED_TABLES.items():
+        if not inspector.has_table(table):
+            continue
+        args = f"'{column}'" if column else ""
+        # Block writes until the triggers exist and the initial count is in.
+        op.execute(f'LOCK TABLE "{table}" IN SHARE ROW EXCLUSIVE MODE')
+        op.execute(
+            f'CREATE TRIGGER {table}_count_rows_insert AFTER INSERT ON "{table}" '
+            f"REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION nearbuy_count_rows({args})"
+        )
+        op.execute(
+            f'CREATE TRIGGER {table}_count_rows_delete AFTER DELETE ON "{table}" '
+            f"REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION nearbuy_count_rows({args})"
+        )
+        op.execute(
+            f'CREATE TRIGGER {table}_count_rows_truncate AFTER TRUNCATE ON "{table}" '
+            f"FOR EACH STATEMENT EXECUTE FUNCTION nearbuy_count_rows()"
+        )
+        op.execute(f"INSERT INTO row_counter (name, value) SELECT '{table}', count(*) FROM \"{table}\"")
+        if column:
+            op.execute(
+                f'CREATE TRIGGER {table}_count_rows_update AFTER UPDATE ON "{table}" '
+                f"REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION nearbuy_count_rows({args})"
+            )
+            op.execute(
+                f"INSERT INTO row_counter (name, value) "
+                f"SELECT '{table}:{column}:' || coalesce(\"{column}\"::text, ''), count(*) "
+                f'FROM "{table}" GROUP BY "{column}"'
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    for table in COUNTED_TABLES:
+        if inspector.has_table(table):
+            for event in EVENTS:
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_count_rows_{event} ON "{table}"')
+    op.execute("DROP FUNCTION IF EXISTS nearbuy_count_rows()")
+    op.drop_table("row_counter")
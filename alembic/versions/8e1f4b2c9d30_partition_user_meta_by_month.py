@@ -0,0 +1,101 @@
+"""Partition user_meta by month on ts
+
+Revision ID: 8e1f4b2c9d30
+Revises: 3c9d2e7a41b8
+Create Date: 2026-10-18 13:27:05.441920
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e1f4b2c9d30'
+down_revision: Union[str, Sequence[str], None] = '3c9d2e7a41b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = "pk, email, reason, ip, role, browser, os, ts"
+# Months created past the current one; app/db/maintenance.py keeps this topped up.
+MONTHS_AHEAD = 3
+
+
+def _add_months(year, month, months):
+    index = year * 12 + (month - 1) + months
+    return index // 12, index % 12 + 1
+
+
+def _month_start(year, month):
+    return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("user_meta"):
+        # Fresh databases get the partitioned table from the models.
+        return
+
+    op.execute("ALTER TABLE user_meta RENAME TO user_meta_legacy")
+    op.execute("ALTER TABLE user_meta_legacy RENAME CONSTRAINT user_meta_pkey TO user_meta_legacy_pkey")
+    op.execute("UPDATE user_meta_legacy SET ts = extract(epoch FROM now())::int WHERE ts IS NULL")
+    op.execute("""
+        CREATE TABLE user_meta (
+            pk INTEGER NOT NULL,
+            email VARCHAR NOT NULL,
+            reason reasonenum NOT NULL,
+            ip VARCHAR,
+            role userrole NOT NULL,
+            browser VARCHAR,
+            os VARCHAR,
+            ts INTEGER NOT NULL,
+            CONSTRAINT user_meta_pkey PRIMARY KEY (pk, ts)
+        ) PARTITION BY RANGE (ts)
+    """)
+    # Keep handing out ids from the existing sequence.
+    op.execute("ALTER TABLE user_meta ALTER COLUMN pk SET DEFAULT nextval('user_meta_pk_seq')")
+    op.execute("ALTER SEQUENCE user_meta_pk_seq OWNED BY user_meta.pk")
+    op.execute("CREATE INDEX ix_user_meta_ts ON user_meta (ts)")
+
+    oldest = bind.execute(sa.text("SELECT min(ts) FROM user_meta_legacy")).scalar()
+    now = datetime.now(timezone.utc)
+    start = datetime.fromtimestamp(oldest, timezone.utc) if oldest is not None else now
+    year, month = start.year, start.month
+    last = _add_months(now.year, now.month, MONTHS_AHEAD)
+    while (year, month) <= last:
+        next_year, next_month = _add_months(year, month, 1)
+        op.execute(
+            f"CREATE TABLE user_meta_p{year:04d}{month:02d} PARTITION OF user_meta "
+            f"FOR VALUES FROM ({_month_start(year, month)}) TO ({_month_start(next_year, next_month)})"
+        )
+        year, month = next_year, next_month
+
+    op.execute(f"INSERT INTO user_meta ({COLUMNS}) SELECT {COLUMNS} FROM user_meta_legacy")
+    op.execute("DROP TABLE user_meta_legacy")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE user_meta RENAME TO user_meta_partitioned")
+    op.execute("ALTER TABLE user_meta_partitioned RENAME CONSTRAINT user_meta_pkey TO user_meta_partitioned_pkey")
+    op.execute("ALTER INDEX ix_user_meta_ts RENAME TO ix_user_meta_partitioned_ts")
+    op.execute("""
+        CREATE TABLE user_meta (
+            pk INTEGER NOT NULL DEFAULT nextval('user_meta_pk_seq'),
+            email VARCHAR NOT NULL,
+            reason reasonenum NOT NULL,
+            ip VARCHAR,
+            role userrole NOT NULL,
+            browser VARCHAR,
+            os VARCHAR,
+            ts INTEGER,
+            CONSTRAINT user_meta_pkey PRIMARY KEY (pk)
+        )
+    """)
+    op.execute(f"INSERT INTO user_meta ({COLUMNS}) SELECT {COLUMNS} FROM user_meta_partitioned")
+    op.execute("ALTER SEQUENCE user_meta_pk_seq OWNED BY user_meta.pk")
+    op.execute("DROP TABLE user_meta_partitioned")
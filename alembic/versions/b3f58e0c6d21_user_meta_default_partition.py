@@ -0,0 +1,43 @@
+"""Default partition for user_meta
+
+Revision ID: b3f58e0c6d21
+Revises: 6c2b9e4f1a87
+Create Date: 2026-10-19 09:12:44.106385
+
+Rows for a month whose partition does not exist yet (maintenance failed or
+fell behind) land here instead of failing the INSERT. app/db/maintenance.py
+moves them into the month's partition when it creates it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f58e0c6d21'
+down_revision: Union[str, Sequence[str], None] = '6c2b9e4f1a87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not sa.inspect(op.get_bind()).has_table("user_meta"):
+        return
+    op.execute("CREATE TABLE IF NOT EXISTS user_meta_default PARTITION OF user_meta DEFAULT")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Rows in it have no other partition to go to; refuse rather than drop them.
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM user_meta_default) THEN
+                RAISE EXCEPTION 'user_meta_default still holds rows; create their monthly partitions first';
+            END IF;
+        END
+        $$
+    """)
+    op.execute("DROP TABLE user_meta_default")
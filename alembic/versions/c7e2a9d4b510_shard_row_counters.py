@@ -0,0 +1,144 @@
+"""Shard row_counter rows
+
+Revision ID: c7e2a9d4b510
+Revises: b3f58e0c6d21
+Create Date: 2026-10-19 10:03:27.850214
+
+Every write to shop, item or user bumped the same counter row inside the
+writer's transaction, so concurrent writers to a table waited on each
+other's row lock until commit. Each counter is now 16 rows (name, shard);
+a write statement picks one at random and readers sum them. Existing
+totals stay in shard 0.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2a9d4b510'
+down_revision: Union[str, Sequence[str], None] = 'b3f58e0c6d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SHARDED_FUNCTION = """
+        CREATE OR REPLACE FUNCTION nearbuy_count_rows() RETURNS trigger AS $$
+        DECLARE
+            group_column text := TG_ARGV[0];
+            pick smallint := floor(random() * 16)::smallint;
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                UPDATE row_counter SET value = 0
+                WHERE name = TG_TABLE_NAME OR starts_with(name, TG_TABLE_NAME || ':');
+            ELSIF TG_OP = 'INSERT' THEN
+                WITH changed(name, delta) AS (
+                    SELECT TG_TABLE_NAME, 1 FROM new_rows
+                    UNION ALL
+                    SELECT TG_TABLE_NAME || ':' || group_column || ':' || coalesce(to_jsonb(r) ->> group_column, ''), 1 FROM new_rows r WHERE group_column IS NOT NULL
+                )
+                INSERT INTO row_counter (name, shard, value)
+                SELECT name, pick, sum(delta) FROM changed
+                GROUP BY name HAVING sum(delta) <> 0
+                ORDER BY name
+                ON CONFLICT (name, shard) DO UPDATE SET value = row_counter.value + excluded.value;
+            ELSIF TG_OP = 'DELETE' THEN
+                WITH changed(name, delta) AS (
+                    SELECT TG_TABLE_NAME, -1 FROM old_rows
+                    UNION ALL
+                    SELECT TG_TABLE_NAME || ':' || group_column || ':' || coalesce(to_jsonb(r) ->> group_column, ''), -1 FROM old_rows r WHERE group_column IS NOT NULL
+                )
+                INSERT INTO row_counter (name, shard, value)
+                SELECT name, pick, sum(delta) FROM changed
+                GROUP BY name HAVING sum(delta) <> 0
+                ORDER BY name
+                ON CONFLICT (name, shard) DO UPDATE SET value = row_counter.value + excluded.value;
+            ELSE
+                -- UPDATE: the total is unchanged, only rows moving between groups count.
+                WITH changed(name, delta) AS (
+                    SELECT TG_TABLE_NAME || ':' || group_column || ':' || coalesce(to_jsonb(r) ->> group_column, ''), 1 FROM new_rows r
+                    UNION ALL
+                    SELECT TG_TABLE_NAME || ':' || group_column || ':' || coalesce(to_jsonb(r) ->> group_column, ''), -1 FROM old_rows r
+                )
+                INSERT INTO row_counter (name, shard, value)
+                SELECT name, pick, sum(delta) FROM changed
+                GROUP BY name HAVING sum(delta) <> 0
+                ORDER BY name
+                ON CONFLICT (name, shard) DO UPDATE SET value = row_counter.value + excluded.value;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+"""
+
+UNSHARDED_FUNCTION = """
+        CREATE OR REPLACE FUNCTION nearbuy_count_rows() RETURNS trigger AS $$
+        DECLARE
+            group_column text := TG_ARGV[0];
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                UPDATE row_counter SET value = 0
+                WHERE name = TG_TABLE_NAME OR starts_with(name, TG_TABLE_NAME || ':');
+            ELSIF TG_OP = 'INSERT' THEN
+                WITH changed(name, delta) AS (
+                    SELECT TG_TABLE_NAME, 1 FROM new_rows
+                    UNION ALL
+                    SELECT TG_TABLE_NAME || ':' || group_column || ':' || coalesce(to_jsonb(r) ->> group_column, ''), 1 FROM new_rows r WHERE group_column IS NOT NULL
+                )
+                INSERT INTO row_counter (name, value)
+                SELECT name, sum(delta) FROM changed
+                GROUP BY name HAVING sum(delta) <> 0
+                ORDER BY name
+                ON CONFLICT (name) DO UPDATE SET value = row_counter.value + excluded.value;
+            ELSIF TG_OP = 'DELETE' THEN
+                WITH changed(name, delta) AS (
+                    SELECT TG_TABLE_NAME, -1 FROM old_rows
+                    UNION ALL
+                    SELECT TG_TABLE_NAME || ':' || group_column || ':' || coalesce(to_jsonb(r) ->> group_column, ''), -1 FROM old_rows r WHERE group_column IS NOT NULL
+                )
+                INSERT INTO row_counter (name, value)
+                SELECT name, sum(delta) FROM changed
+                GROUP BY name HAVING sum(delta) <> 0
+                ORDER BY name
+                ON CONFLICT (name) DO UPDATE SET value = row_counter.value + excluded.value;
+            ELSE
+                -- UPDATE: the total is unchanged, only rows moving between groups count.
+                WITH changed(name, delta) AS (
+                    SELECT TG_TABLE_NAME || ':' || group_column || ':' || coalesce(to_jsonb(r) ->> group_column, ''), 1 FROM new_rows r
+                    UNION ALL
+                    SELECT TG_TABLE_NAME || ':' || group_column || ':' || coalesce(to_jsonb(r) ->> group_column, ''), -1 FROM old_rows r
+                )
+                INSERT INTO row_counter (name, value)
+                SELECT name, sum(delta) FROM changed
+                GROUP BY name HAVING sum(delta) <> 0
+                ORDER BY name
+                ON CONFLICT (name) DO UPDATE SET value = row_counter.value + excluded.value;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "row_counter",
+        sa.Column("shard", sa.SmallInteger(), server_default="0", nullable=False),
+    )
+    op.execute("ALTER TABLE row_counter DROP CONSTRAINT row_counter_pkey, ADD PRIMARY KEY (name, shard)")
+    # Replacing the function is enough: the triggers call it by name.
+    op.execute(SHARDED_FUNCTION)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("LOCK TABLE row_counter IN EXCLUSIVE MODE")
+    op.execute("CREATE TEMPORARY TABLE row_counter_totals AS SELECT name, sum(value) AS value FROM row_counter GROUP BY name")
+    op.execute("DELETE FROM row_counter")
+    op.execute("INSERT INTO row_counter (name, shard, value) SELECT name, 0, value FROM row_counter_totals")
+    op.execute("DROP TABLE row_counter_totals")
+    op.execute(UNSHARDED_FUNCTION)
+    op.execute("ALTER TABLE row_counter DROP CONSTRAINT row_counter_pkey, ADD PRIMARY KEY (name)")
+    op.drop_column("row_counter", "shard")
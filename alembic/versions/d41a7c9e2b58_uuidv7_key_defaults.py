@@ -0,0 +1,65 @@
+"""Default new primary keys to time-ordered UUIDv7
+
+Revision ID: d41a7c9e2b58
+Revises: 5b7d2f9a0c41
+Create Date: 2026-10-18 15:12:40.906317
+
+The models generate UUIDv7 keys themselves (app/helpers/ids.py); the column
+defaults cover rows inserted with plain SQL. Existing keys are left alone:
+they are referenced by foreign keys, cookies and the search index, and v4
+and v7 values live side by side in a uuid column. Only new rows are
+appended in key order.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a7c9e2b58'
+down_revision: Union[str, Sequence[str], None] = '5b7d2f9a0c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, key column, default expression)
+DEFAULTS = [
+    ("user", "id", "uuid_generate_v7()"),
+    ("shop", "shop_id", "uuid_generate_v7()"),
+    ("item", "id", "uuid_generate_v7()"),
+    ("inventory", "inventory_id", "uuid_generate_v7()::text"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Same layout as uuid7() in app/helpers/ids.py: 48-bit Unix milliseconds,
+    # version 7, random rest (PostgreSQL 18's uuidv7() could replace this).
+    op.execute("""
+        CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+        DECLARE
+            ms bigint := floor(extract(epoch FROM clock_timestamp()) * 1000);
+            -- 10 random bytes from gen_random_uuid() (core since PostgreSQL 13, no pgcrypto).
+            bytes bytea := decode(lpad(to_hex(ms), 12, '0'), 'hex')
+                || substring(uuid_send(gen_random_uuid()) FROM 7 FOR 10);
+        BEGIN
+            bytes := set_byte(bytes, 6, (get_byte(bytes, 6) & 15) | 112);
+            bytes := set_byte(bytes, 8, (get_byte(bytes, 8) & 63) | 128);
+            RETURN encode(bytes, 'hex')::uuid;
+        END
+        $$ LANGUAGE plpgsql VOLATILE
+    """)
+    inspector = sa.inspect(op.get_bind())
+    for table, column, default in DEFAULTS:
+        if inspector.has_table(table):
+            op.execute(f'ALTER TABLE "{table}" ALTER COLUMN {column} SET DEFAULT {default}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    for table, column, _ in DEFAULTS:
+        if inspector.has_table(table):
+            op.execute(f'ALTER TABLE "{table}" ALTER COLUMN {column} DROP DEFAULT')
+    op.execute("DROP FUNCTION IF EXISTS uuid_generate_v7()")
@@ -1,5 +1,8 @@
 from fastapi import APIRouter, Depends, BackgroundTasks, Query, Request
+from app.core.metrics import metrics
+from app.db.engines import EngineRegistry, Workload
 from app.db.session import DataBasePool, authentication_required
+from app.db.slow_queries import slow_queries
 from app.db.models.user import UserRole
 from typesense_helper.sync_db_to_typesense import sync_database_to_typesense
 from app.helpers.fake_data_generator import generate_fake_data
@@ -8,6 +11,11 @@ from fastapi import status
 
 admin_router = APIRouter(prefix="/admin", tags=["Admin"])
 
+
+async def _generate_fake_data_task(shops_count: int, items_per_shop: int):
+    async with EngineRegistry.session(Workload.ADMIN) as session:
+        await generate_fake_data(session, shops_count, items_per_shop)
+
 @admin_router.post("/index-typesense", description="Trigger full database sync to Typesense (Admin only)")
 @authentication_required([UserRole.ADMIN, UserRole.SUPER_ADMIN])
 async def index_typesense_endpoint(
@@ -32,23 +40,71 @@ async def generate_fake_data_endpoint(
     items_per_shop: int = Query(5, description="Number of items per shop"),
     db_pool=Depends(DataBasePool.get_pool)
 ):
-    # Run fake data generation in background
-    # We need to pass a new session or handle session within the task. 
-    # generate_fake_data takes a session. 
-    # Since db_pool is a session, we can't pass it directly to background task if it gets closed.
-    # But DataBasePool.get_pool returns a session that is scoped to the request? 
-    # Actually DataBasePool._db_pool is a global session in this codebase (based on session.py).
-    # "with Session(cls._engine) as session: cls._db_pool = session" in setup.
-    # So it seems it's a single global session? That's weird for async, but okay.
-    # If it's a global session, we can pass it.
-    
-    # However, to be safe, let's wrap it in a function that creates a new session or uses the global pool correctly.
-    # generate_fake_data uses the passed session.
-    
-    background_tasks.add_task(generate_fake_data, db_pool, shops_count, items_per_shop)
+    # The request session is closed before background tasks run, so the task
+    # opens its own session on the admin pool.
+    background_tasks.add_task(_generate_fake_data_task, shops_count, items_per_shop)
     
     return send_json_response(
         message=f"Fake data generation started for {shops_count} shops.",
         status=status.HTTP_200_OK,
         body={}
     )
+
+
+@admin_router.get("/db-metrics", description="Connection pool and query timing metrics for this worker (Admin only)")
+@authentication_required([UserRole.ADMIN, UserRole.SUPER_ADMIN])
+async def db_metrics_endpoint(
+    request: Request,
+    reset: bool = Query(False, description="Clear the collected metrics after reading them"),
+    db_pool=Depends(DataBasePool.get_pool)
+):
+    body = {"pools": EngineRegistry.pool_status(), **metrics.snapshot()}
+    if reset:
+        metrics.reset()
+    return send_json_response(
+        message="Database metrics",
+        status=status.HTTP_200_OK,
+        body=body
+    )
+
+
+@admin_router.get("/slow-queries", description="Slow statements seen by this worker, grouped by shape (Admin only)")
+@authentication_required([UserRole.ADMIN, UserRole.SUPER_ADMIN])
+async def slow_queries_endpoint(
+    request: Request,
+    reset: bool = Query(False, description="Clear the slow-query log after reading it"),
+    db_pool=Depends(DataBasePool.get_pool)
+):
+    # Plans can be large; fetch one with /admin/slow-queries/{fingerprint}.
+    body = [
+        {**{k: v for k, v in entry.items() if k != "plan"}, "has_plan": isinstance(entry["plan"], dict)}
+        for entry in slow_queries.snapshot()
+    ]
+    if reset:
+        slow_queries.reset()
+    return send_json_response(
+        message="Slow queries",
+        status=status.HTTP_200_OK,
+        body=body
+    )
+
+
+@admin_router.get("/slow-queries/{fingerprint}", description="One slow-query entry with its captured plan (Admin only)")
+@authentication_required([UserRole.ADMIN, UserRole.SUPER_ADMIN])
+async def slow_query_detail_endpoint(
+    request: Request,
+    fingerprint: str,
+    db_pool=Depends(DataBasePool.get_pool)
+):
+    entry = slow_queries.get(fingerprint)
+    if entry is None:
+        return send_json_response(
+            message="Slow query not found",
+            status=status.HTTP_404_NOT_FOUND,
+            body={}
+        )
+    return send_json_response(
+        message="Slow query",
+        status=status.HTTP_200_OK,
+        body=entry
+    )
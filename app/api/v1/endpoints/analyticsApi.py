@@ -2,10 +2,13 @@
 Analytics API endpoint - Real-time statistics
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Dict
 
+from app.db.budget import query_budget
+from app.db.counters import counter_name, read_counters
 from app.db.session import DataBasePool
 from app.db.models.shop import SHOP
 from app.db.models.item import ITEM
@@ -15,7 +18,10 @@ router = APIRouter()
 
 
 @router.get("/stats", response_model=Dict)
-async def get_platform_stats() -> Dict:
+@query_budget(max_queries=10)
+async def get_platform_stats(
+    db_pool: AsyncSession = Depends(DataBasePool.get_read_pool),
+) -> Dict:
     """
     Get real-time platform statistics
 
@@ -27,19 +33,14 @@ async def get_platform_stats() -> Dict:
         - vendors_count: Total number of vendors
     """
     try:
-        # Get database session
-        db = DataBasePool._db_pool
-        if db is None:
-            raise HTTPException(status_code=500, detail="Database not available")
-
         # Count unique cities from shop addresses
         # We'll count distinct unique locations based on lat/lon pairs
         cities_count_query = select(func.count(func.distinct(SHOP.address)))
-        cities_result = db.exec(cities_count_query).one()
+        cities_result = (await db_pool.exec(cities_count_query)).one()
 
         # More accurate: count distinct city names from addresses
         # Extract city from address (this is approximate)
-        shops = db.exec(select(SHOP)).all()
+        shops = (await db_pool.exec(select(SHOP))).all()
         cities = set()
         for shop in shops:
             if shop.address:
@@ -57,30 +58,34 @@ async def get_platform_stats() -> Dict:
 
         cities_count = len(cities) if cities else cities_result or 0
 
-        # Count shops
-        shops_query = select(func.count()).select_from(SHOP)
-        shops_count = db.exec(shops_query).one() or 0
-
-        # Count total users
-        users_query = select(func.count()).select_from(USER)
-        users_count = db.exec(users_query).one() or 0
-
-        # Count items
-        items_query = select(func.count()).select_from(ITEM)
-        items_count = db.exec(items_query).one() or 0
-
-        # Count vendors specifically
-        vendors_query = (
-            select(func.count()).select_from(USER).where(USER.role == UserRole.VENDOR)
-        )
-        vendors_count = db.exec(vendors_query).one() or 0
+        # Shops, users, items and vendors come from the trigger-kept row
+        # counters in one lookup; COUNT(*) only where a counter is missing.
+        counter_names = {
+            "shops_count": counter_name("shop"),
+            "users_count": counter_name("user"),
+            "items_count": counter_name("item"),
+            "vendors_count": counter_name("user", "role", UserRole.VENDOR),
+        }
+        counters = await read_counters(db_pool, counter_names.values())
+        fallback_queries = {
+            "shops_count": select(func.count()).select_from(SHOP),
+            "users_count": select(func.count()).select_from(USER),
+            "items_count": select(func.count()).select_from(ITEM),
+            "vendors_count": select(func.count()).select_from(USER).where(USER.role == UserRole.VENDOR),
+        }
+        counts = {}
+        for key, name in counter_names.items():
+            if name in counters:
+                counts[key] = counters[name]
+            elif key == "vendors_count" and counter_name("user") in counters:
+                # Role counters only exist once a row with that role has been written.
+                counts[key] = 0
+            else:
+                counts[key] = (await db_pool.exec(fallback_queries[key])).one() or 0
 
         return {
             "cities_count": cities_count,
-            "shops_count": shops_count,
-            "users_count": users_count,
-            "items_count": items_count,
-            "vendors_count": vendors_count,
+            **counts,
             "success": True,
         }
 
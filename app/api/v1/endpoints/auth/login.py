@@ -4,8 +4,9 @@ import traceback
 import uuid
 from fastapi import Request, status
 from fastapi.encoders import jsonable_encoder
-from sqlmodel import Session
-from app.db.models.user import ReasonEnum, UserTableEnum
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.audit import audit_writer
+from app.db.models.user import ReasonEnum
 from app.db.schemas.user import Login_User
 from app.db.session import DB
 from app.helpers import variables
@@ -16,7 +17,7 @@ uDB = DB()
 
 from app.db.models.user import UserRole
 
-async def login(request: Request, data: Login_User, db_pool: Session):
+async def login(request: Request, data: Login_User, db_pool: AsyncSession):
     try:
         apiData = await get_fastApi_req_data(request)
         if not data.email:
@@ -35,7 +36,7 @@ async def login(request: Request, data: Login_User, db_pool: Session):
                 body={}
             )
 
-        if not security().verify_password(user.password, data.password):
+        if not await security().verify_password_async(user.password, data.password):
             return send_json_response(
                 message="Invalid credentials",
                 status=status.HTTP_401_UNAUTHORIZED,
@@ -64,7 +65,7 @@ async def login(request: Request, data: Login_User, db_pool: Session):
         }
         print("Login: session role =", session_data["role"])
 
-        session, ok = await uDB.insert(dbClassNam=UserTableEnum.USER_SESSION, data=session_data, db_pool=db_pool)
+        session, ok = await uDB.create_session(session_data, db_pool)
 
         USER_META = {
             "email": user.email,
@@ -74,8 +75,8 @@ async def login(request: Request, data: Login_User, db_pool: Session):
             "browser": apiData.browser,
             "os": apiData.os
         }
-        await uDB.insert(dbClassNam=UserTableEnum.USER_META, data=USER_META, db_pool=db_pool)
-        db_pool.commit()
+        await db_pool.commit()
+        audit_writer.record(USER_META)
 
         response = send_json_response(
             message="User logged in successfully",
@@ -84,7 +85,7 @@ async def login(request: Request, data: Login_User, db_pool: Session):
         )
         response.set_cookie(
             key=variables.COOKIE_KEY,
-            value=token,
+            value=session.pk,
             max_age=max_age,
             httponly=True,
             secure=variables.COOKIE_SECURE,
@@ -101,7 +102,7 @@ async def login(request: Request, data: Login_User, db_pool: Session):
         )
 
 
-async def check_auth_status(request: Request, db_pool: Session):
+async def check_auth_status(request: Request, db_pool: AsyncSession):
     try:
         user = request.state.emp
         
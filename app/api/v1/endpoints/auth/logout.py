@@ -1,18 +1,19 @@
 from typing import cast, Literal
 import traceback
 from fastapi import Request,status
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.db.session import DB
 from app.helpers import variables
 from app.helpers.helpers import send_json_response
 
 uDB = DB()
 
-async def logout(request:Request, db_pool: Session):
+async def logout(request:Request, db_pool: AsyncSession):
     try:
-        await uDB.delete(request.state.emp, db_pool)
-
-        db_pool.commit()
+        # request.state.emp may come from a cache or Redis (not attached to
+        # db_pool), so revoke by token rather than by instance.
+        session_token = request.state.emp.pk
+        await uDB.revoke_session(db_pool, session_token)
 
         response = send_json_response(message="Logged out successfully",status=status.HTTP_200_OK,body={})
         response.delete_cookie(
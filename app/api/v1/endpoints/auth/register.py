@@ -4,7 +4,8 @@ import time
 import uuid
 from fastapi import Request, status
 from fastapi.encoders import jsonable_encoder
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.audit import audit_writer
 from app.db.models.user import ReasonEnum, UserTableEnum, UserRole
 from app.db.schemas.user import (
     Register_STATE_CONTRIBUTER,
@@ -19,12 +20,12 @@ from app.helpers import variables
 uDB = DB()
 
 
-async def user_signup(request: Request, data: Register_User, db_pool: Session):
+async def user_signup(request: Request, data: Register_User, db_pool: AsyncSession):
     try:
         fullName = data.fullName.strip()
         email = data.email.lower()
 
-        password = security().hash_password(data.password)
+        password = await security().hash_password_async(data.password)
 
         if len(fullName) == 0:
             return send_json_response(
@@ -85,10 +86,6 @@ async def user_signup(request: Request, data: Register_User, db_pool: Session):
             "os": apiData.os,
         }
 
-        await uDB.insert(
-            dbClassNam=UserTableEnum.USER_META, data=USER_META_DATA, db_pool=db_pool
-        )
-
         serialized_inserted_user.pop("id", None)
 
         # Create session and auto-login
@@ -109,11 +106,11 @@ async def user_signup(request: Request, data: Register_User, db_pool: Session):
             "role": role_value,
         }
 
-        await uDB.insert(
-            dbClassNam=UserTableEnum.USER_SESSION, data=session_data, db_pool=db_pool
-        )
+        session, _ = await uDB.create_session(session_data, db_pool)
 
-        db_pool.commit()
+        await db_pool.commit()
+        # Only once the account exists: a failed commit must not leave an audit row.
+        audit_writer.record(USER_META_DATA)
 
         response = send_json_response(
             message="User registered successfully",
@@ -122,7 +119,7 @@ async def user_signup(request: Request, data: Register_User, db_pool: Session):
         )
         response.set_cookie(
             key=variables.COOKIE_KEY,
-            value=token,
+            value=session.pk,
             max_age=max_age,
             httponly=True,
             secure=variables.COOKIE_SECURE,
@@ -140,12 +137,12 @@ async def user_signup(request: Request, data: Register_User, db_pool: Session):
         )
 
 
-async def vendor_signup(request: Request, data: Register_Vendor, db_pool: Session):
+async def vendor_signup(request: Request, data: Register_Vendor, db_pool: AsyncSession):
     try:
         fullName = data.fullName.strip()
         email = data.email.lower()
 
-        password = security().hash_password(data.password)
+        password = await security().hash_password_async(data.password)
 
         if len(fullName) == 0:
             return send_json_response(
@@ -206,10 +203,6 @@ async def vendor_signup(request: Request, data: Register_Vendor, db_pool: Sessio
             "os": apiData.os,
         }
 
-        await uDB.insert(
-            dbClassNam=UserTableEnum.USER_META, data=VENDOR_META_DATA, db_pool=db_pool
-        )
-
         serialized_inserted_vendor.pop("id", None)
 
         # Create session and auto-login
@@ -230,11 +223,10 @@ async def vendor_signup(request: Request, data: Register_Vendor, db_pool: Sessio
             "role": role_value,
         }
 
-        await uDB.insert(
-            dbClassNam=UserTableEnum.USER_SESSION, data=session_data, db_pool=db_pool
-        )
+        session, _ = await uDB.create_session(session_data, db_pool)
 
-        db_pool.commit()
+        await db_pool.commit()
+        audit_writer.record(VENDOR_META_DATA)
 
         response = send_json_response(
             message="Vendor registered successfully",
@@ -243,7 +235,7 @@ async def vendor_signup(request: Request, data: Register_Vendor, db_pool: Sessio
         )
         response.set_cookie(
             key=variables.COOKIE_KEY,
-            value=token,
+            value=session.pk,
             max_age=max_age,
             httponly=True,
             secure=variables.COOKIE_SECURE,
@@ -262,13 +254,13 @@ async def vendor_signup(request: Request, data: Register_Vendor, db_pool: Sessio
 
 
 async def contributor_signup(
-    request: Request, data: Register_STATE_CONTRIBUTER, db_pool: Session
+    request: Request, data: Register_STATE_CONTRIBUTER, db_pool: AsyncSession
 ):
     try:
         fullName = data.fullName.strip()
         email = data.email.lower()
 
-        password = security().hash_password(data.password)
+        password = await security().hash_password_async(data.password)
 
         if len(fullName) == 0:
             return send_json_response(
@@ -329,15 +321,10 @@ async def contributor_signup(
             "os": apiData.os,
         }
 
-        await uDB.insert(
-            dbClassNam=UserTableEnum.USER_META,
-            data=CONTRIBUTOR_META_DATA,
-            db_pool=db_pool,
-        )
-
         serialized_inserted_contributor.pop("id", None)
 
-        db_pool.commit()
+        await db_pool.commit()
+        audit_writer.record(CONTRIBUTOR_META_DATA)
         return send_json_response(
             message="Contributor registered successfully",
             status=status.HTTP_201_CREATED,
@@ -1,12 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from sqlmodel import Session, select, func, create_engine
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.db.models.shop import SHOP
+from app.db.session import DataBasePool
 from typing import Optional, TypedDict
-from app.helpers.variables import DATABASE_URL
-
-engine = create_engine(DATABASE_URL)
 
 limiter = Limiter(key_func=get_remote_address)
 categories_router = APIRouter()
@@ -54,11 +53,10 @@ def categorize_shop(shop_name: str, description: str = "") -> str:
 
 @categories_router.get("", description="Get all available categories with shop counts")
 @limiter.limit("30/minute")
-def get_categories(request: Request):
+async def get_categories(request: Request, db_pool: AsyncSession = Depends(DataBasePool.get_read_pool)):
     try:
         # Get all shops
-        with Session(engine) as session:
-            shops = session.exec(select(SHOP)).all()
+        shops = (await db_pool.exec(select(SHOP))).all()
         
         # Count shops by category
         category_counts: dict[str, int] = {}
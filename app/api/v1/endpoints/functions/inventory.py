@@ -1,14 +1,16 @@
+import asyncio
 import time
 import traceback
 import uuid
 from fastapi import Request,status
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.db.models.inventory import InventoryTableEnum
 from app.db.models.item import ItemTableEnum
 from app.db.models.shop import ShopTableEnum
 from app.db.models.user import UserRole, UserTableEnum
 from app.db.schemas.inventory import InventoryBase, InventoryUpdate
-from app.db.session import DB
+from app.db.session import DB, NOT_FOUND_MESSAGE
+from app.helpers.ids import uuid7
 from app.helpers.helpers import extract_model, get_fastApi_req_data, recursive_to_str, send_json_response
 
 
@@ -19,7 +21,7 @@ class INDB:
         pass
 
     @staticmethod
-    async def add_inventory(request: Request, data: InventoryBase, db_pool: Session):
+    async def add_inventory(request: Request, data: InventoryBase, db_pool: AsyncSession):
         try:
             apiData = await get_fastApi_req_data(request)
             if not apiData:
@@ -38,16 +40,20 @@ class INDB:
             if not current_user or getattr(current_user, "role", None) not in [UserRole.VENDOR, UserRole.ADMIN]:
                 return send_json_response(message="Only vendors can add inventory.", status=status.HTTP_403_FORBIDDEN, body={})
             
-            shop = await db.get_attr_all(dbClassNam=ShopTableEnum.SHOP, db_pool=db_pool, filters={"shop_id": shop_id_val}, all=False)
+            shop, user, item = await asyncio.gather(
+                db.load_one(dbClassNam=ShopTableEnum.SHOP, db_pool=db_pool, column="shop_id", value=shop_id_val),
+                db.load_one(dbClassNam=UserTableEnum.USER, db_pool=db_pool, column="email", value=current_user.email),
+                db.load_one(dbClassNam=ItemTableEnum.ITEM, db_pool=db_pool, column="id", value=item_id_val),
+            )
             if not shop:
                 return send_json_response(message="Shop not found.", status=status.HTTP_404_NOT_FOUND, body={})
-            user = await db.get_attr_all(dbClassNam=UserTableEnum.USER, db_pool=db_pool, filters={"email": current_user.email}, all=False)
             if not user or str(shop.owner_id) != str(user.id):
                 return send_json_response(message="You can only add inventory to your own shop.", status=status.HTTP_403_FORBIDDEN, body={})
             
-            item = await db.get_attr_all(dbClassNam=ItemTableEnum.ITEM, db_pool=db_pool, filters={"id": item_id_val}, all=False)
             if not item:
                 return send_json_response(message="Item not found.", status=status.HTTP_404_NOT_FOUND, body={})
+            if str(item.shop_id) != str(shop_id_val):
+                return send_json_response(message="Item does not belong to this shop.", status=status.HTTP_400_BAD_REQUEST, body={})
             
             if data.quantity is None or data.quantity < 0:
                 return send_json_response(message="Quantity must be zero or positive.", status=status.HTTP_400_BAD_REQUEST, body={})
@@ -66,7 +72,7 @@ class INDB:
                 return send_json_response(message="Inventory already exists for this item and shop", status=status.HTTP_409_CONFLICT, body={})
             
             inventory_data = data.model_dump(exclude_unset=True, exclude_none=True)
-            inventory_data["inventory_id"] = str(uuid.uuid4())
+            inventory_data["inventory_id"] = str(uuid7())
             inventory_data["shop_id"] = shop_id_val
             inventory_data["item_id"] = item_id_val
 
@@ -76,7 +82,7 @@ class INDB:
             
             res = inserted.model_dump(); res.pop("inventory_id", None); res.pop("shop_id", None)
 
-            db_pool.commit()
+            await db_pool.commit()
 
             return send_json_response(message="Inventory added", status=status.HTTP_201_CREATED, body=res)
         
@@ -86,7 +92,7 @@ class INDB:
 
 
     @staticmethod
-    async def update_inventory(request: Request, data: InventoryUpdate, db_pool: Session):
+    async def update_inventory(request: Request, data: InventoryUpdate, db_pool: AsyncSession):
         import uuid, time
         try:
             identifier = {}
@@ -111,12 +117,14 @@ class INDB:
             if not old_record:
                 return send_json_response(message="Inventory record not found", status=status.HTTP_404_NOT_FOUND, body={})
 
-            shop = await db.get_attr_all(dbClassNam=ShopTableEnum.SHOP, db_pool=db_pool, filters={"shop_id": old_record.shop_id}, all=False)
             current_user = getattr(request.state, "emp", None)
             if not current_user or getattr(current_user, "role", None) not in [UserRole.VENDOR, UserRole.ADMIN]:
                 return send_json_response(message="Only vendors can update inventory.", status=status.HTTP_403_FORBIDDEN, body={})
             
-            user = await db.get_attr_all(dbClassNam=UserTableEnum.USER, db_pool=db_pool,filters={"email": current_user.email}, all=False)
+            shop, user = await asyncio.gather(
+                db.load_one(dbClassNam=ShopTableEnum.SHOP, db_pool=db_pool, column="shop_id", value=old_record.shop_id),
+                db.load_one(dbClassNam=UserTableEnum.USER, db_pool=db_pool, column="email", value=current_user.email),
+            )
             if not shop or not user or str(shop.owner_id) != str(user.id):
                 return send_json_response(message="You can only update inventory for your own shop.", status=status.HTTP_403_FORBIDDEN, body={})
 
@@ -158,11 +166,10 @@ class INDB:
                     body=serial
                 )
 
-            message, success = await db.update_attr_all(dbClassNam=InventoryTableEnum.INVENTORY, data=update_data, db_pool=db_pool, identifier=identifier)
+            updated, success = await db.update_attr_all(dbClassNam=InventoryTableEnum.INVENTORY, data=update_data, db_pool=db_pool, identifier=identifier, returning=True)
             if not success:
-                return send_json_response(message=message, status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={})
+                return send_json_response(message=updated, status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={})
 
-            updated = await db.get_attr_all(dbClassNam=InventoryTableEnum.INVENTORY, db_pool=db_pool, filters=identifier, all=False)
             updated = extract_model(updated)
             serial = recursive_to_str(updated.model_dump())
             serial.pop("inventory_id", None)
@@ -212,25 +219,18 @@ class INDB:
     @staticmethod
     async def delete_inventory(request, inventory_id, db_pool):
         try:
-            record = await db.get_attr_all(
-                dbClassNam="INVENTORY", 
-                db_pool=db_pool, 
-                filters={"inventory_id": inventory_id}, 
-                all=False
-            )
-            record = extract_model(record)
-            if not record:
-                return send_json_response(message="Not found", status=status.HTTP_404_NOT_FOUND, body={})
-
-            record_dict = recursive_to_str(record.model_dump())
-
-            message, success = await db.delete_attr(
+            record, success = await db.delete_attr(
                 dbClassNam="INVENTORY", 
                 db_pool=db_pool,
-                identifier={"inventory_id": inventory_id}
+                identifier={"inventory_id": inventory_id},
+                returning=True
             )
             if not success:
-                return send_json_response(message=message, status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={})
+                if record == NOT_FOUND_MESSAGE:
+                    return send_json_response(message="Not found", status=status.HTTP_404_NOT_FOUND, body={})
+                return send_json_response(message=record, status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={})
+
+            record_dict = recursive_to_str(extract_model(record).model_dump())
 
             return send_json_response(message="Inventory deleted", status=status.HTTP_200_OK, body=record_dict)
         except Exception as e:
@@ -1,16 +1,20 @@
+import asyncio
 import json
 import traceback
+from typing import Optional
 import uuid
 from fastapi import Request,status
 from fastapi.encoders import jsonable_encoder
 import redis
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 import typesense
+from app.db.cache_bus import ALL_ITEMS, ITEM, cache_set, invalidate
 from app.db.models.item import ItemTableEnum
 from app.db.models.shop import ShopTableEnum
 from app.db.models.user import UserRole, UserTableEnum
+from app.db.pagination import CountMode, InvalidCursorError
 from app.db.schemas.item import ItemCreate, ItemUpdate
-from app.db.session import DB
+from app.db.session import DB, NOT_FOUND_MESSAGE
 from app.db.table_map import TABLE_CLASS_MAP
 from app.helpers.helpers import get_fastApi_req_data, send_json_response
 
@@ -22,7 +26,7 @@ class IDB:
         pass
 
     @staticmethod
-    async def add_item(request: Request, data: ItemCreate, db_pool: Session, ts_client: typesense.Client, redis_client: redis.Redis):
+    async def add_item(request: Request, data: ItemCreate, db_pool: AsyncSession, ts_client: typesense.Client, redis_client: redis.Redis):
         try:
             apiData = await get_fastApi_req_data(request)
             if not apiData:
@@ -44,11 +48,12 @@ class IDB:
             except Exception:
                 return send_json_response(message="Invalid shop_id. Must be UUID.", status=status.HTTP_400_BAD_REQUEST, body={})
             
-            shop = await DB.get_attr_all(dbClassNam=ShopTableEnum.SHOP, db_pool=db_pool, filters={"shop_id": shop_id_val}, all=False)
+            shop, user = await asyncio.gather(
+                DB.load_one(dbClassNam=ShopTableEnum.SHOP, db_pool=db_pool, column="shop_id", value=shop_id_val),
+                DB.load_one(dbClassNam=UserTableEnum.USER, db_pool=db_pool, column="email", value=current_user.email),
+            )
             if not shop:
                 return send_json_response(message="Shop not found.", status=status.HTTP_404_NOT_FOUND, body={})
-            
-            user = await DB.get_attr_all(dbClassNam=UserTableEnum.USER, db_pool=db_pool, filters={"email": current_user.email}, all=False)
             if not user or shop.owner_id != user.id:
                 return send_json_response(message="You can only add items to your own shop.", status=status.HTTP_403_FORBIDDEN, body={})
             
@@ -67,8 +72,10 @@ class IDB:
             if not ok or not inserted_item:
                 return send_json_response(message="Could not create item", status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={})
             
-            db_pool.commit()
-            db_pool.refresh(inserted_item)
+            await db_pool.commit()
+            await db_pool.refresh(inserted_item)
+            # Other workers hear about it through the cache bus; our next read must not wait for that.
+            await invalidate("item", [{"itemName": inserted_item.itemName}])
 
             # --- TYPESENSE INDEXING ---
             try:
@@ -85,17 +92,12 @@ class IDB:
                 print(f"Error indexing item {inserted_item.id} in Typesense: {e}")
             # --- END TYPESENSE ---
 
-            # --- CACHE INVALIDATION ---
-            # redis_client.delete("all_items_cache")
-            for key in redis_client.keys("all_items:*"):
-                redis_client.delete(key)
-
             serialized_item = jsonable_encoder(inserted_item)
             # serialized_item.pop("id", None)  <-- We need the ID for the frontend to add inventory immediately
             return send_json_response(message="Item added successfully", status=status.HTTP_201_CREATED, body=serialized_item)
         
         except Exception as e:
-            db_pool.rollback()
+            await db_pool.rollback()
             print("Exception caught at add_item: ", str(e))
             traceback.print_exc()
             return send_json_response(message="Error adding item", status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={})
@@ -108,8 +110,16 @@ class IDB:
 
 
     @staticmethod
-    async def get_all_items(request: Request, db_pool: Session, page: int, page_size: int, redis_client: redis.Redis):
-        cache_key = f"all_items:page_{page}:size_{page_size}"
+    async def get_all_items(request: Request, db_pool: AsyncSession, page: int, page_size: int, redis_client: redis.Redis,
+                            mode: str = "offset", cursor: Optional[str] = None, count: Optional[CountMode] = None):
+        keyset = mode == "keyset" or cursor is not None
+        count = CountMode(count) if count else (CountMode.ESTIMATE if keyset else CountMode.EXACT)
+        if keyset:
+            cache_key = f"all_items:cursor_{cursor or 'start'}:size_{page_size}:count_{count.value}"
+        else:
+            cache_key = f"all_items:page_{page}:size_{page_size}"
+            if count != CountMode.EXACT:
+                cache_key += f":count_{count.value}"
         try:
             cached_items = redis_client.get(cache_key)
             if cached_items:
@@ -117,7 +127,13 @@ class IDB:
             
             offset = (page - 1) * page_size
             model_class = TABLE_CLASS_MAP[ItemTableEnum.ITEM]
-            items, total_count = await db.get_attr_all_paginated(dbClassNam=model_class,db_pool=db_pool,offset=offset,limit=page_size)
+            try:
+                items, total_count, next_cursor = await db.get_attr_all_paginated(
+                    dbClassNam=model_class, db_pool=db_pool, offset=offset, limit=page_size,
+                    cursor=cursor, keyset=keyset, count=count,
+                )
+            except InvalidCursorError as e:
+                return send_json_response(message=e.message, status=status.HTTP_400_BAD_REQUEST, body={})
 
             if items is None:
                 return send_json_response(message="Error retrieving items",status=status.HTTP_500_INTERNAL_SERVER_ERROR,body={})
@@ -127,16 +143,25 @@ class IDB:
                 for item in jsonable_encoder(items)
             ] if items else []
 
-            response_body = {
-                "data": serialized_items,
-                "pagination": {
+            if keyset:
+                pagination = {
+                    "page_size": page_size,
+                    "next_cursor": next_cursor,
+                    "total": total_count,
+                    "total_is_estimate": count in (CountMode.ESTIMATE, CountMode.CACHED),
+                }
+            else:
+                pagination = {
                     "page": page,
                     "page_size": page_size,
                     "total": total_count,
-                    "pages": (total_count + page_size - 1) // page_size
+                    "pages": (total_count + page_size - 1) // page_size if total_count is not None else None
                 }
+            response_body = {
+                "data": serialized_items,
+                "pagination": pagination
             }
-            redis_client.set(cache_key, json.dumps(response_body), ex=3600)
+            cache_set(redis_client, ALL_ITEMS, cache_key, json.dumps(response_body))
             
             return send_json_response(message="Items retrieved successfully",status=status.HTTP_200_OK,body=response_body)
         
@@ -146,7 +171,7 @@ class IDB:
             return send_json_response(message="Error retrieving items",status=status.HTTP_500_INTERNAL_SERVER_ERROR,body={})
 
     @staticmethod
-    async def get_item(request: Request, itemName: str, db_pool: Session, redis_client: redis.Redis):
+    async def get_item(request: Request, itemName: str, db_pool: AsyncSession, redis_client: redis.Redis):
         cache_key = f"item:{itemName}"
         try:
             cached_item = redis_client.get(cache_key)
@@ -161,7 +186,7 @@ class IDB:
             # serialized_item = jsonable_encoder(item)
             serialized_item = {k: v for k, v in jsonable_encoder(item).items() if k != 'id'}
 
-            redis_client.set(cache_key, json.dumps(serialized_item), ex=3600)
+            cache_set(redis_client, ITEM, cache_key, json.dumps(serialized_item))
 
             return send_json_response(message="Item retrieved successfully", status=status.HTTP_200_OK, body=serialized_item)
             
@@ -171,7 +196,7 @@ class IDB:
             return send_json_response(message="Error retrieving item", status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={})
 
     @staticmethod
-    async def update_item(request: Request, data: ItemUpdate, db_pool: Session, ts_client: typesense.Client, redis_client: redis.Redis):
+    async def update_item(request: Request, data: ItemUpdate, db_pool: AsyncSession, ts_client: typesense.Client, redis_client: redis.Redis):
         try:
             if not data.itemName or not data.shop_id:
                 return send_json_response(message="Both item name and shop ID are required for update.", status=status.HTTP_403_FORBIDDEN, body={})
@@ -181,15 +206,6 @@ class IDB:
             except Exception:
                 return send_json_response(message="Invalid shop_id format. Must be a valid UUID.", status=status.HTTP_400_BAD_REQUEST, body={})
 
-            existing_item = await DB.get_attr_all(
-                dbClassNam=ItemTableEnum.ITEM,
-                db_pool=db_pool,
-                filters={"itemName": data.itemName, "shop_id": shop_id_val},
-                all=False
-            )
-            if not existing_item:
-                return send_json_response(message="Item not found in the specified shop.", status=status.HTTP_404_NOT_FOUND, body={})
-
             # ... (rest of your validation logic for shop ownership)
 
             update_data = data.model_dump(exclude_unset=True, exclude_none=True)
@@ -200,16 +216,13 @@ class IDB:
                 return send_json_response(message="No data to update", status=status.HTTP_400_BAD_REQUEST, body={})
 
             identifier = {"itemName": data.itemName, "shop_id": shop_id_val}
-            message, success = await DB.update_attr_all(dbClassNam=ItemTableEnum.ITEM, data=update_data, db_pool=db_pool, identifier=identifier)
+            updated_item, success = await DB.update_attr_all(dbClassNam=ItemTableEnum.ITEM, data=update_data, db_pool=db_pool, identifier=identifier, returning=True)
             if not success:
-                return send_json_response(message=message, status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={})
+                if updated_item == NOT_FOUND_MESSAGE:
+                    return send_json_response(message="Item not found in the specified shop.", status=status.HTTP_404_NOT_FOUND, body={})
+                return send_json_response(message=updated_item, status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={})
 
-            db_pool.commit()
-            # --- CACHE INVALIDATION ---
-            redis_client.delete(f"item:{data.itemName}")
-            # redis_client.delete("all_items_cache")
-            for key in redis_client.keys("all_items:*"):
-                redis_client.delete(key)
+            await invalidate("item", [{"itemName": updated_item.itemName}])
 
             # --- TYPESENSE UPDATE ---
             try:
@@ -219,62 +232,52 @@ class IDB:
                 # Add other updatable fields here if necessary
                 
                 if ts_document_update:
-                    ts_client.collections['items'].documents[str(existing_item.id)].update(ts_document_update)
+                    ts_client.collections['items'].documents[str(updated_item.id)].update(ts_document_update)
             except Exception as e:
-                print(f"Error updating item {existing_item.id} in Typesense: {e}")
+                print(f"Error updating item {updated_item.id} in Typesense: {e}")
             # --- END TYPESENSE ---
 
-            updated_item = await DB.get_attr_all(dbClassNam=ItemTableEnum.ITEM, db_pool=db_pool, filters={"itemName": data.itemName, "shop_id": shop_id_val}, all=False)
             serialized_item = jsonable_encoder(updated_item)
             serialized_item.pop("id", None)
 
             return send_json_response(message="Item updated successfully", status=status.HTTP_200_OK, body=serialized_item)
         except Exception as e:
-            db_pool.rollback()
+            await db_pool.rollback()
             print("Exception caught at update_item: ", str(e))
             traceback.print_exc()
             return send_json_response(message="Error updating item", status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={})
 
 
     @staticmethod
-    async def delete_item(request: Request, itemName: str, db_pool: Session, ts_client: typesense.Client, redis_client: redis.Redis):
+    async def delete_item(request: Request, itemName: str, db_pool: AsyncSession, ts_client: typesense.Client, redis_client: redis.Redis):
         try:
             # Note: Deleting just by name can be ambiguous if multiple shops have the same item name.
             # A better approach would be to require shop_id for deletion.
             # For now, we'll proceed with the current itemName logic.
-            item_to_delete = await DB.get_attr_all(dbClassNam=ItemTableEnum.ITEM, db_pool=db_pool, filters={"itemName": itemName}, all=False)
-            if not item_to_delete:
-                return send_json_response(message="Item not found", status=status.HTTP_404_NOT_FOUND, body={})
-            
-            item_id_to_delete = str(item_to_delete.id)
-            serialized_item = jsonable_encoder(item_to_delete)
-            serialized_item.pop("id", None)
-            
             identifier = {"itemName": itemName}
-            message, success = await DB.delete_attr(dbClassNam=ItemTableEnum.ITEM, db_pool=db_pool, identifier=identifier)
+            deleted_item, success = await DB.delete_attr(dbClassNam=ItemTableEnum.ITEM, db_pool=db_pool, identifier=identifier, returning=True)
             
             if not success:
-                return send_json_response(message=message, status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={})
-            
-            db_pool.commit()
+                if deleted_item == NOT_FOUND_MESSAGE:
+                    return send_json_response(message="Item not found", status=status.HTTP_404_NOT_FOUND, body={})
+                return send_json_response(message=deleted_item, status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={})
 
-            # --- CACHE INVALIDATION ---
-            redis_client.delete(f"item:{itemName}")
-            # redis_client.delete("all_items_cache")
-            for key in redis_client.keys("all_items:*"):
-                redis_client.delete(key)
+            await invalidate("item", [{"itemName": deleted_item.itemName}])
+
+            serialized_item = jsonable_encoder(deleted_item)
+            serialized_item.pop("id", None)
 
             # --- TYPESENSE DELETE ---
             try:
-                ts_client.collections['items'].documents[item_id_to_delete].delete()
+                ts_client.collections['items'].documents[str(deleted_item.id)].delete()
             except Exception as e:
-                print(f"Error deleting item {item_id_to_delete} from Typesense: {e}")
+                print(f"Error deleting item {deleted_item.id} from Typesense: {e}")
             # --- END TYPESENSE ---
             
             return send_json_response(message="Item deleted successfully", status=status.HTTP_200_OK, body=serialized_item)
             
         except Exception as e:
-            db_pool.rollback()
+            await db_pool.rollback()
             print("Exception caught at delete_item: ", str(e))
             traceback.print_exc()
             return send_json_response(message="Error deleting item", status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={})
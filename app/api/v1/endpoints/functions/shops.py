@@ -3,11 +3,12 @@ import traceback
 from fastapi import Request,status
 from fastapi.encoders import jsonable_encoder
 import redis
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.cache_bus import SHOP, cache_set, invalidate
 from app.db.models.shop import ShopTableEnum
 from app.db.models.user import UserTableEnum
 from app.db.schemas.shop import ShopCreate, ShopUpdate
-from app.db.session import DB
+from app.db.session import DB, NOT_FOUND_MESSAGE
 from app.helpers.helpers import get_fastApi_req_data, recursive_to_str, send_json_response
 from app.helpers.geo import create_point_geometry, geometry_to_latlon
 import warnings
@@ -24,7 +25,7 @@ class SDB:
         pass
 
     @staticmethod
-    async def create_shop(request: Request, data: ShopCreate, db_pool: Session, ts_client: typesense.Client):
+    async def create_shop(request: Request, data: ShopCreate, db_pool: AsyncSession, ts_client: typesense.Client):
         try:
             # if not data.owner_id != request.state.emp:
             #     return send_json_response(
@@ -59,8 +60,9 @@ class SDB:
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 )
 
-            db_pool.commit()
-            db_pool.refresh(inserted_shop)
+            await db_pool.commit()
+            await db_pool.refresh(inserted_shop)
+            await invalidate("shop", [{"shop_id": inserted_shop.shop_id, "owner_id": inserted_shop.owner_id}])
 
             try:
                 shop_document = {
@@ -81,26 +83,15 @@ class SDB:
 
             return send_json_response(message="Shop created successfully", status=status.HTTP_201_CREATED, body={"shop_id": str(inserted_shop.shop_id)},)
         except Exception as e:
-            db_pool.rollback()
+            await db_pool.rollback()
             traceback.print_exc()
             return send_json_response(message="Error creating shop", status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={})
 
     @staticmethod
     async def update_shop(
-        request: Request, data: ShopUpdate, db_pool: Session, ts_client: typesense.Client, redis_client: redis.Redis
+        request: Request, data: ShopUpdate, db_pool: AsyncSession, ts_client: typesense.Client, redis_client: redis.Redis
     ):
         try:
-            shop_obj = await DB.get_attr_all(
-                dbClassNam=ShopTableEnum.SHOP,
-                db_pool=db_pool,
-                filters={"shop_id": data.shop_id},
-                all=False,
-            )
-            if not shop_obj:
-                return send_json_response(
-                    message="Shop not found", status=status.HTTP_404_NOT_FOUND
-                )
-
             update_data = data.model_dump(exclude_unset=True)
             ts_update_doc = {}
 
@@ -120,17 +111,21 @@ class SDB:
             if not update_data:
                 return send_json_response(message="No new data provided.")
 
-            _, success = await DB.update_attr_all(
+            shop_obj, success = await DB.update_attr_all(
                 dbClassNam=ShopTableEnum.SHOP,
                 data=update_data,
                 db_pool=db_pool,
                 identifier={"shop_id": data.shop_id},
+                returning=True,
             )
 
+            if shop_obj == NOT_FOUND_MESSAGE:
+                return send_json_response(
+                    message="Shop not found", status=status.HTTP_404_NOT_FOUND
+                )
+
             if success:
-                db_pool.commit()
-                redis_client.delete(f"shop:{data.shop_id}")
-                redis_client.delete(f"shops_by_owner:{shop_obj.owner_id}")
+                await invalidate("shop", [{"shop_id": data.shop_id, "owner_id": shop_obj.owner_id}])
                 if ts_update_doc:
                     try:
                         ts_client.collections["shops"].documents[str(data.shop_id)].update(ts_update_doc)
@@ -143,7 +138,7 @@ class SDB:
                     status=status.HTTP_400_BAD_REQUEST,
                 )
         except Exception as e:
-            db_pool.rollback()
+            await db_pool.rollback()
             traceback.print_exc()
             return send_json_response(
                 message="An error occurred",
@@ -176,7 +171,7 @@ class SDB:
                 result.append(shop_dict)
 
             result_str = recursive_to_str(result)
-            redis_client.set(cache_key, json.dumps(result_str), ex=3600) # Cache for 1 hour
+            cache_set(redis_client, SHOP, cache_key, json.dumps(result_str)) # Cache for 1 hour
             
             return send_json_response(message="Shops retrieved from DATABASE", status=status.HTTP_200_OK, body=result)
         except Exception as e:
@@ -184,7 +179,7 @@ class SDB:
             return send_json_response(message="Error retrieving shops", status=status.HTTP_500_INTERNAL_SERVER_ERROR, body=[])
 
     @staticmethod
-    async def get_shop(request: Request, shop_id: str, db_pool: Session,redis_client: redis.Redis):
+    async def get_shop(request: Request, shop_id: str, db_pool: AsyncSession,redis_client: redis.Redis):
         cache_key = f"shop:{shop_id}"
         try:
             cached_shop = redis_client.get(cache_key)
@@ -208,7 +203,7 @@ class SDB:
             shop_dict.pop("owner_id", None)
 
             shop_dict = recursive_to_str(shop_dict)
-            redis_client.set(cache_key, json.dumps(shop_dict), ex=3600)
+            cache_set(redis_client, SHOP, cache_key, json.dumps(shop_dict))
 
 
             return send_json_response(message="Shop retrieved",status=status.HTTP_200_OK,body=shop_dict)
@@ -222,18 +217,14 @@ class SDB:
 
 
     @staticmethod
-    async def delete_shop(request: Request, shop_id: str, db_pool: Session, ts_client: typesense.Client, redis_client: redis.Redis):
+    async def delete_shop(request: Request, shop_id: str, db_pool: AsyncSession, ts_client: typesense.Client, redis_client: redis.Redis):
         try:
-            shop = await DB.get_attr_all(dbClassNam=ShopTableEnum.SHOP, db_pool=db_pool, filters={"shop_id": shop_id}, all=False)
-            if not shop:
+            shop, success = await DB.delete_attr(dbClassNam=ShopTableEnum.SHOP, db_pool=db_pool, identifier={"shop_id": shop_id}, returning=True)
+            if shop == NOT_FOUND_MESSAGE:
                 return send_json_response(message="Shop not found", status=status.HTTP_404_NOT_FOUND)
-            
-            _, success = await DB.delete_attr(dbClassNam=ShopTableEnum.SHOP, db_pool=db_pool, identifier={"shop_id": shop_id})
 
             if success:
-                db_pool.commit()
-                redis_client.delete(f"shop:{shop_id}")
-                redis_client.delete(f"shops_by_owner:{shop.owner_id}")
+                await invalidate("shop", [{"shop_id": shop_id, "owner_id": shop.owner_id}])
                 try:
                     ts_client.collections['shops'].documents[str(shop_id)].delete()
                 except Exception as e:
@@ -243,7 +234,7 @@ class SDB:
                  return send_json_response(message="Failed to delete shop", status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         except Exception as e:
-            db_pool.rollback()
+            await db_pool.rollback()
             traceback.print_exc()
             return send_json_response(message="An error occurred", status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -1,7 +1,8 @@
 import traceback
 from fastapi import Request, status
 import typesense
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.cache_bus import invalidate
 from app.db.models.shop import ShopTableEnum
 from app.db.models.user import UserTableEnum
 from app.db.schemas.shop import VendorShopCreate
@@ -16,12 +17,12 @@ class VDB:
         pass
 
     @staticmethod
-    async def create_vendor_shop(request: Request, data: VendorShopCreate, db_pool: Session, ts_client: typesense.Client):
+    async def create_vendor_shop(request: Request, data: VendorShopCreate, db_pool: AsyncSession, ts_client: typesense.Client):
         try:
             current_user_session = request.state.emp
             
             # 1. Automatic Owner Linking
-            owner = await db.get_attr_all(dbClassNam=UserTableEnum.USER, db_pool=db_pool, filters={"email": current_user_session.email}, all=False)
+            owner = await db.load_one(dbClassNam=UserTableEnum.USER, db_pool=db_pool, column="email", value=current_user_session.email)
             if not owner:
                 return send_json_response(message="Authenticated user not found.",status=status.HTTP_404_NOT_FOUND,)
             
@@ -50,8 +51,9 @@ class VDB:
             if not ok or not inserted_shop:
                 return send_json_response(message="Could not create shop",status=status.HTTP_500_INTERNAL_SERVER_ERROR,)
 
-            db_pool.commit()
-            db_pool.refresh(inserted_shop)
+            await db_pool.commit()
+            await db_pool.refresh(inserted_shop)
+            await invalidate("shop", [{"shop_id": inserted_shop.shop_id, "owner_id": inserted_shop.owner_id}])
 
             try:
                 shop_document = {
@@ -72,6 +74,6 @@ class VDB:
             return send_json_response(message="Shop created successfully",status=status.HTTP_201_CREATED,body={"shop_id": str(inserted_shop.shop_id)},)
             
         except Exception as e:
-            db_pool.rollback()
+            await db_pool.rollback()
             traceback.print_exc()
             return send_json_response(message="An error occurred while creating the shop.", status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
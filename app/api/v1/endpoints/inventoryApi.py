@@ -26,7 +26,7 @@ async def get_inventory_by_id_endpoint(request: Request, inventory_id: str, db_p
 
 @inventory_router.get("/shop/{shop_id}", description="vendor and admin ep")
 @authentication_required([UserRole.USER, UserRole.VENDOR, UserRole.ADMIN])
-async def get_inventory_for_shop_endpoint(request: Request, shop_id: str, db_pool=Depends(DataBasePool.get_pool)):
+async def get_inventory_for_shop_endpoint(request: Request, shop_id: str, db_pool=Depends(DataBasePool.get_read_pool)):
     return await idb.get_inventory_for_shop(request, shop_id, db_pool)
 
 @inventory_router.delete("/{inventory_id}", description="vendor and admin ep")
@@ -1,9 +1,11 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, Query, Request
 import redis
 import typesense
 from RDB.redis_client import get_redis_client
 from app.api.v1.endpoints.functions.items import IDB
 from app.db.models.user import UserRole
+from app.db.pagination import CountMode
 from app.db.schemas.item import ItemCreate, ItemUpdate
 from app.db.session import DataBasePool, authentication_required
 from typesense_helper.typesense_client import get_typesense_client
@@ -19,8 +21,17 @@ async def add_item_endpoint(request: Request, data: ItemCreate, db_pool=Depends(
 
 @item_router.get("/get_all_items", description="vendor , admin , user and state contributor ep")
 @authentication_required([UserRole.VENDOR, UserRole.ADMIN, UserRole.USER, UserRole.STATE_CONTRIBUTER])
-async def get_all_items_endpoint(request: Request,db_pool=Depends(DataBasePool.get_pool),page: int = Query(1, gt=0),page_size: int = Query(20, gt=0, le=100), redis_client: redis.Redis = Depends(get_redis_client)):
-    return await idb.get_all_items(request, db_pool, page, page_size, redis_client)
+async def get_all_items_endpoint(
+    request: Request,
+    db_pool=Depends(DataBasePool.get_read_pool),
+    page: int = Query(1, gt=0),
+    page_size: int = Query(20, gt=0, le=100),
+    mode: str = Query("offset", pattern="^(offset|keyset)$", description="keyset pages with cursor instead of page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous keyset page"),
+    count: Optional[CountMode] = Query(None, description="exact (offset default), estimate (keyset default), cached or none"),
+    redis_client: redis.Redis = Depends(get_redis_client),
+):
+    return await idb.get_all_items(request, db_pool, page, page_size, redis_client, mode=mode, cursor=cursor, count=count)
 
 @item_router.get("/get_item/{itemName}", description="vendor , admin , user and state contributor ep")
 @authentication_required([UserRole.VENDOR, UserRole.ADMIN, UserRole.USER, UserRole.STATE_CONTRIBUTER])
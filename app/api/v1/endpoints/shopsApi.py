@@ -29,7 +29,7 @@ async def view_shop_endpoint(request: Request, owner_id: str, db_pool=Depends(Da
 
 @shop_router.get("/{shop_id}", description="user , state contributor , vendor and admin ep")
 @authentication_required([UserRole.USER,UserRole.VENDOR,UserRole.ADMIN,UserRole.STATE_CONTRIBUTER])
-async def get_shop_endpoint(request: Request, shop_id: str, db_pool=Depends(DataBasePool.get_pool),redis_client: redis.Redis = Depends(get_redis_client)):
+async def get_shop_endpoint(request: Request, shop_id: str, db_pool=Depends(DataBasePool.get_read_pool),redis_client: redis.Redis = Depends(get_redis_client)):
     return await sdb.get_shop(request, shop_id, db_pool, redis_client)
 
 @shop_router.delete("/{shop_id}", description="admin ep (private)")
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends, Request, Query
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from sqlmodel import Session, select, create_engine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.db.models.shop import SHOP
+from app.db.budget import query_budget
+from app.db.session import DataBasePool
 from typing import Optional
-from app.helpers.variables import DATABASE_URL
 
-engine = create_engine(DATABASE_URL)
 limiter = Limiter(key_func=get_remote_address)
 shops_list_router = APIRouter()
 
@@ -42,18 +43,19 @@ def extract_city(address: str) -> str:
 
 @shops_list_router.get("", description="Get all shops with optional filters")
 @limiter.limit("30/minute")
-def get_shops_list(
+@query_budget(max_queries=5)
+async def get_shops_list(
     request: Request,
     category: Optional[str] = Query(None, description="Filter by category"),
     city: Optional[str] = Query(None, description="Filter by city"),
     is_open: Optional[bool] = Query(None, description="Filter by open status"),
     limit: int = Query(50, ge=1, le=100, description="Number of shops to return"),
-    offset: int = Query(0, ge=0, description="Offset for pagination")
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    db_pool: AsyncSession = Depends(DataBasePool.get_read_pool)
 ):
     try:
-        with Session(engine) as session:
-            query = select(SHOP)
-            all_shops = session.exec(query).all()
+        query = select(SHOP)
+        all_shops = (await db_pool.exec(query)).all()
         
         filtered_shops = []
         for shop in all_shops:
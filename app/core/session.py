@@ -0,0 +1,298 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import time
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import text
+from app.core.metrics import metrics
+from app.db.models.user import USER_SESSION, UserRole
+from app.helpers import variables
+from RDB.redis_client import get_async_redis_client
+
+# Same channel as the row-change notifications in app/db/cache_bus.py.
+REVOCATION_CHANNEL = "nearbuy_cache"
+
+
+def token_hash(session_token: str) -> str:
+    # Tokens are bearer secrets: neither Redis keys nor NOTIFY payloads carry them raw.
+    return hashlib.sha256(session_token.encode()).hexdigest()
+
+
+class SessionCache:
+    """Two-tier cache of USER_SESSION rows, keyed by the hash of the session token.
+
+    Tier one is a small per-worker LRU with a short TTL, tier two is Redis
+    (SESSION_CACHE_TTL_SECONDS, never past the session's own expiry). Entries
+    hold the row's columns, not ORM objects; every hit builds a fresh
+    USER_SESSION. Logout revokes an entry everywhere: Redis directly, other
+    workers' memory through a NOTIFY that app/db/cache_bus.py applies.
+    """
+
+    def __init__(self):
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return variables.SESSION_CACHE_TTL_SECONDS > 0
+
+    @staticmethod
+    def _redis_key(hashed: str) -> str:
+        return f"session:{hashed}"
+
+    def _remember(self, hashed: str, data: dict):
+        ttl = min(variables.SESSION_CACHE_LOCAL_TTL_SECONDS, data["expired_at"] - time.time())
+        self._local[hashed] = (time.monotonic() + ttl, data)
+        self._local.move_to_end(hashed)
+        while len(self._local) > variables.SESSION_CACHE_LOCAL_SIZE:
+            self._local.popitem(last=False)
+
+    @staticmethod
+    def _build(session_token: str, data: dict) -> USER_SESSION:
+        return USER_SESSION(pk=session_token, **{**data, "role": UserRole(data["role"])})
+
+    async def get(self, session_token: str) -> Optional[USER_SESSION]:
+        if not self.enabled:
+            return None
+        hashed = token_hash(session_token)
+        entry = self._local.get(hashed)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._local.move_to_end(hashed)
+                metrics.incr("session_cache.hit", tier="local")
+                return self._build(session_token, entry[1])
+            del self._local[hashed]
+
+        try:
+            cached = await get_async_redis_client().get(self._redis_key(hashed))
+        except Exception as e:
+            print(f"Could not read session cache: {e}")
+            cached = None
+        if cached is None:
+            metrics.incr("session_cache.miss")
+            return None
+        data = json.loads(cached)
+        self._remember(hashed, data)
+        metrics.incr("session_cache.hit", tier="redis")
+        return self._build(session_token, data)
+
+    async def put(self, user_session: USER_SESSION):
+        if not self.enabled:
+            return
+        ttl = min(variables.SESSION_CACHE_TTL_SECONDS, int(user_session.expired_at - time.time()))
+        if ttl <= 0:
+            return
+        data = {
+            "email": user_session.email,
+            "role": getattr(user_session.role, "value", user_session.role),
+            "ip": user_session.ip,
+            "browser": user_session.browser,
+            "os": user_session.os,
+            "created_at": user_session.created_at,
+            "expired_at": user_session.expired_at,
+        }
+        hashed = token_hash(user_session.pk)
+        self._remember(hashed, data)
+        try:
+            await get_async_redis_client().set(self._redis_key(hashed), json.dumps(data), ex=ttl)
+        except Exception as e:
+            print(f"Could not write session cache: {e}")
+
+    def discard_local(self, hashed: str):
+        self._local.pop(hashed, None)
+
+    def clear_local(self):
+        self._local.clear()
+
+    async def invalidate(self, session_token: str):
+        hashed = token_hash(session_token)
+        self.discard_local(hashed)
+        try:
+            await get_async_redis_client().delete(self._redis_key(hashed))
+        except Exception as e:
+            print(f"Could not invalidate session cache: {e}")
+
+    @staticmethod
+    async def publish_revocation(db_pool, session_token: str):
+        """Queue a NOTIFY telling every worker to drop the token; sent when db_pool commits."""
+        payload = json.dumps({"table": "user_session", "keys": [{"token_hash": token_hash(session_token)}]})
+        await db_pool.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": REVOCATION_CHANNEL, "payload": payload},
+        )
+
+
+class RedisSessionStore:
+    """Sessions as Redis hashes that expire with the session (SESSION_BACKEND=redis).
+
+    Nothing touches USER_SESSION in this mode: Redis' own TTL removes expired
+    sessions, and a revoked session disappears everywhere at once, so there
+    is nothing for SessionCache to do.
+    """
+
+    FIELDS = ("email", "role", "ip", "browser", "os", "created_at", "expired_at")
+
+    @staticmethod
+    def _key(session_token: str) -> str:
+        return f"user_session:{token_hash(session_token)}"
+
+    async def create(self, session_data: dict) -> USER_SESSION:
+        user_session = USER_SESSION(**session_data)
+        mapping = {}
+        for field in self.FIELDS:
+            value = getattr(user_session, field)
+            if value is not None:
+                # Redis hash fields are strings; enums are stored by value.
+                mapping[field] = str(getattr(value, "value", value))
+        key = self._key(user_session.pk)
+        pipe = get_async_redis_client().pipeline()
+        pipe.hset(key, mapping=mapping)
+        pipe.expireat(key, int(user_session.expired_at))
+        await pipe.execute()
+        return user_session
+
+    async def get(self, session_token: str) -> Optional[USER_SESSION]:
+        data = await get_async_redis_client().hgetall(self._key(session_token))
+        if not data:
+            return None
+        return USER_SESSION(
+            pk=session_token,
+            email=data["email"],
+            role=UserRole(data["role"]),
+            ip=data.get("ip"),
+            browser=data.get("browser"),
+            os=data.get("os"),
+            created_at=int(data["created_at"]),
+            expired_at=int(data["expired_at"]),
+        )
+
+    async def delete(self, session_token: str):
+        await get_async_redis_client().delete(self._key(session_token))
+
+
+class SignedSessionTokens:
+    """Self-contained session tokens (SESSION_BACKEND=signed).
+
+    A token is ``v1.<claims>.<HMAC-SHA256>``, both parts base64url, signed
+    with the first of SESSION_SIGNING_KEYS (the others still verify, for
+    rotation). The claims are fixed at login, so a role change applies from
+    the next login.
+
+    Logout adds the token's id to a Redis sorted set scored by its expiry,
+    so the set only holds tokens that would otherwise still be valid. Each
+    worker checks tokens against its own copy of the set, so ``verify`` is a
+    hash, a JSON parse and a set lookup. Once the copy is older than
+    SESSION_REVOCATION_REFRESH_SECONDS, ``verify`` starts a background
+    reload and answers from the current copy meanwhile. A logout on another
+    worker therefore takes effect here within about that interval.
+    """
+
+    VERSION = "v1"
+    REVOKED_KEY = "revoked_sessions"
+
+    def __init__(self):
+        self._revoked: set = set()
+        # This worker's own revocations (jti -> exp), kept across reloads that raced them.
+        self._revoked_here: dict = {}
+        self._refreshed_at = float("-inf")
+        self._refreshing: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _encode(raw: bytes) -> str:
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def _decode(text: str) -> bytes:
+        return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+    def _signature(self, key: str, body: str) -> str:
+        digest = hmac.new(key.encode(), f"{self.VERSION}.{body}".encode(), hashlib.sha256).digest()
+        return self._encode(digest)
+
+    def create(self, session_data: dict) -> USER_SESSION:
+        """Sign ``session_data``; its pk becomes the token id and the new pk is the token."""
+        user_session = USER_SESSION(**session_data)
+        claims = {
+            "jti": user_session.pk,
+            "email": user_session.email,
+            "role": getattr(user_session.role, "value", user_session.role),
+            "ip": user_session.ip,
+            "browser": user_session.browser,
+            "os": user_session.os,
+            "iat": user_session.created_at,
+            "exp": user_session.expired_at,
+        }
+        body = self._encode(json.dumps(claims, separators=(",", ":")).encode())
+        user_session.pk = f"{self.VERSION}.{body}.{self._signature(variables.SESSION_SIGNING_KEYS[0], body)}"
+        return user_session
+
+    def _claims(self, session_token: str) -> Optional[dict]:
+        """Claims of a correctly signed token, expired or not; None for anything else."""
+        parts = session_token.split(".")
+        if len(parts) != 3 or parts[0] != self.VERSION:
+            return None
+        _, body, signature = parts
+        if not any(
+            hmac.compare_digest(signature, self._signature(key, body))
+            for key in variables.SESSION_SIGNING_KEYS
+        ):
+            return None
+        try:
+            return json.loads(self._decode(body))
+        except ValueError:
+            return None
+
+    async def refresh(self):
+        """Reload the revocation set from Redis (startup awaits this once)."""
+        # Set before the read: with Redis down, retry after the interval, not per request.
+        self._refreshed_at = time.monotonic()
+        try:
+            revoked = await get_async_redis_client().zrangebyscore(self.REVOKED_KEY, time.time(), "+inf")
+        except Exception as e:
+            print(f"Could not refresh revoked sessions: {e}")
+            return
+        now = time.time()
+        self._revoked_here = {jti: exp for jti, exp in self._revoked_here.items() if exp > now}
+        self._revoked = set(revoked) | set(self._revoked_here)
+
+    def _is_revoked(self, jti: str) -> bool:
+        if (
+            time.monotonic() - self._refreshed_at >= variables.SESSION_REVOCATION_REFRESH_SECONDS
+            and (self._refreshing is None or self._refreshing.done())
+        ):
+            self._refreshing = asyncio.get_running_loop().create_task(self.refresh())
+        return jti in self._revoked
+
+    def verify(self, session_token: str) -> Optional[USER_SESSION]:
+        claims = self._claims(session_token)
+        if claims is None or claims["exp"] <= time.time() or self._is_revoked(claims["jti"]):
+            return None
+        return USER_SESSION(
+            pk=session_token,
+            email=claims["email"],
+            role=UserRole(claims["role"]),
+            ip=claims.get("ip"),
+            browser=claims.get("browser"),
+            os=claims.get("os"),
+            created_at=claims["iat"],
+            expired_at=claims["exp"],
+        )
+
+    async def revoke(self, session_token: str):
+        claims = self._claims(session_token)
+        if claims is None or claims["exp"] <= time.time():
+            return
+        pipe = get_async_redis_client().pipeline()
+        pipe.zadd(self.REVOKED_KEY, {claims["jti"]: claims["exp"]})
+        # Keep the set compact: tokens past their expiry are rejected anyway.
+        pipe.zremrangebyscore(self.REVOKED_KEY, "-inf", time.time())
+        await pipe.execute()
+        self._revoked_here[claims["jti"]] = claims["exp"]
+        self._revoked.add(claims["jti"])
+
+
+session_cache = SessionCache()
+redis_sessions = RedisSessionStore()
+signed_sessions = SignedSessionTokens()
@@ -0,0 +1,135 @@
+import asyncio
+from collections import deque
+import json
+import time
+import traceback
+from typing import Deque, List, Optional, Tuple
+from app.core.metrics import metrics
+from app.db.engines import EngineRegistry, Workload
+from app.db.models.user import UserTableEnum
+from app.db.session import DB
+from app.helpers import variables
+
+
+class AuditWriter:
+    """Buffers USER_META audit rows and writes them in multi-row INSERTs.
+
+    ``record`` only appends to an in-memory buffer, so the request never
+    waits on the audit write. A background task flushes every
+    AUDIT_FLUSH_INTERVAL_MS, or as soon as AUDIT_BATCH_SIZE rows are waiting,
+    on its own SYNC-pool session. Past AUDIT_QUEUE_SIZE rows new events are
+    dropped and counted in ``audit.dropped``. A failed batch goes back to the
+    front of the buffer; each row gets AUDIT_MAX_ATTEMPTS writes, the last
+    one on its own, so a single bad row cannot hold up the rest. A row that
+    still fails is logged and counted in ``audit.dead_lettered``.
+    ``stop`` flushes what is left when AUDIT_FLUSH_ON_SHUTDOWN is set, with
+    up to AUDIT_MAX_ATTEMPTS passes, and logs how many rows it had to drop;
+    rows still buffered when a worker crashes are lost.
+    """
+
+    def __init__(self):
+        # (row, failed attempts so far)
+        self._buffer: Deque[Tuple[dict, int]] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Task] = None
+
+    def record(self, event: dict):
+        if len(self._buffer) >= variables.AUDIT_QUEUE_SIZE:
+            metrics.incr("audit.dropped")
+            return
+        # Stamp the event now, not when the batch happens to be written.
+        self._buffer.append(({"ts": int(time.time()), **event}, 0))
+        metrics.set_gauge("audit.queue_depth", len(self._buffer))
+        self._ensure_running()
+        if len(self._buffer) >= variables.AUDIT_BATCH_SIZE and (
+            self._flushing is None or self._flushing.done()
+        ):
+            self._flushing = asyncio.get_running_loop().create_task(self.flush())
+
+    def _ensure_running(self):
+        # Started lazily so it lives on whichever loop is serving requests.
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+            self._flushing = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(variables.AUDIT_FLUSH_INTERVAL_MS / 1000)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                traceback.print_exc()
+                print(f"Error flushing audit events.")
+
+    async def _write(self, rows: List[dict]) -> bool:
+        started = time.perf_counter()
+        try:
+            async with EngineRegistry.session(Workload.SYNC) as session:
+                written, ok = await DB.insert_many(
+                    dbClassNam=UserTableEnum.USER_META, rows=rows, db_pool=session, commit=True
+                )
+        except Exception as e:
+            print(f"Exception writing audit events: {str(e)}")
+            traceback.print_exc()
+            ok = False
+        metrics.observe("audit.flush", time.perf_counter() - started)
+        if ok:
+            metrics.incr("audit.written", len(rows))
+        return ok
+
+    async def flush(self):
+        """Write everything buffered so far, AUDIT_BATCH_SIZE rows per INSERT."""
+        while self._buffer:
+            batch: List[Tuple[dict, int]] = []
+            while self._buffer and len(batch) < variables.AUDIT_BATCH_SIZE:
+                batch.append(self._buffer.popleft())
+            metrics.set_gauge("audit.queue_depth", len(self._buffer))
+            try:
+                if await self._write([row for row, _ in batch]):
+                    continue
+
+                metrics.incr("audit.failed_flushes")
+                retry = []
+                for row, attempts in batch:
+                    if attempts + 1 < variables.AUDIT_MAX_ATTEMPTS:
+                        retry.append((row, attempts + 1))
+                    elif not await self._write([row]):
+                        metrics.incr("audit.dead_lettered")
+                        print(f"Dropping audit event after {attempts + 1} failed writes: {json.dumps(row, default=str)}")
+            except asyncio.CancelledError:
+                # Cancelled mid-write (shutdown): put the batch back so stop() can
+                # write it. A row the cancelled INSERT did commit is written twice.
+                self._buffer.extendleft(reversed(batch))
+                raise
+            # Retry on the next tick, ahead of newer events (room permitting).
+            room = max(0, variables.AUDIT_QUEUE_SIZE - len(self._buffer))
+            self._buffer.extendleft(reversed(retry[:room]))
+            if len(retry) > room:
+                metrics.incr("audit.dropped", len(retry) - room)
+            return
+
+    async def stop(self):
+        loop = asyncio.get_running_loop()
+        tasks = [t for t in (self._task, self._flushing) if t is not None and t.get_loop() is loop]
+        self._task = self._flushing = None
+        for task in tasks:
+            task.cancel()
+        # Wait for them: a cancelled flush returns its batch to the buffer on the way out.
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        if variables.AUDIT_FLUSH_ON_SHUTDOWN:
+            # Each pass stops at the first failed batch; failed rows count an attempt.
+            for _ in range(variables.AUDIT_MAX_ATTEMPTS):
+                if not self._buffer:
+                    break
+                await self.flush()
+        if self._buffer:
+            metrics.incr("audit.dropped", len(self._buffer))
+            print(f"Dropping {len(self._buffer)} audit events still buffered at shutdown.")
+            self._buffer.clear()
+
+
+audit_writer = AuditWriter()
@@ -0,0 +1,149 @@
+from contextvars import ContextVar
+from functools import wraps
+import time
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.metrics import metrics
+from app.helpers import variables
+from app.helpers.helpers import send_json_response
+
+# Postgres SQLSTATE for "canceling statement due to statement timeout".
+QUERY_CANCELED = "57014"
+BUDGET_EXCEEDED_MESSAGE = "The request took too long to query the database. Please try again later."
+
+
+class QueryBudgetExceeded(Exception):
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
+
+class QueryBudget:
+    """Database allowance of one request: per-statement timeout, total statements and time."""
+
+    def __init__(
+        self,
+        route: str,
+        statement_timeout_ms: int,
+        max_queries: int,
+        max_db_seconds: float,
+    ):
+        self.route = route
+        self.statement_timeout_ms = statement_timeout_ms
+        self.max_queries = max_queries
+        self.max_db_seconds = max_db_seconds
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.exceeded: Optional[str] = None
+
+    def mark_exceeded(self, reason: str):
+        if self.exceeded is None:
+            self.exceeded = reason
+            metrics.incr("db.budget.exceeded", route=self.route, reason=reason)
+
+    def exceed(self, reason: str):
+        self.mark_exceeded(reason)
+        raise QueryBudgetExceeded(f"{self.route} exceeded its {reason} budget")
+
+
+# Budget of the request currently running, set by the query_budget decorator.
+_budget: ContextVar[Optional[QueryBudget]] = ContextVar("db_query_budget", default=None)
+
+
+def current_budget() -> Optional[QueryBudget]:
+    return _budget.get()
+
+
+def query_budget(
+    statement_timeout_ms: Optional[int] = None,
+    max_queries: Optional[int] = None,
+    max_db_seconds: Optional[float] = None,
+):
+    """Cap the database work an endpoint may do per request.
+
+    Every transaction the request opens gets ``SET LOCAL statement_timeout``,
+    and the request is cut off once it has issued ``max_queries`` statements or
+    spent ``max_db_seconds`` waiting on them. Either way the client gets a 503
+    instead of the endpoint's own error handling. Unset limits fall back to the
+    DB_BUDGET_* settings; 0 disables a limit.
+    """
+
+    def decorator(func):
+        route = func.__name__
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            budget = QueryBudget(
+                route,
+                statement_timeout_ms if statement_timeout_ms is not None else variables.DB_BUDGET_STATEMENT_TIMEOUT_MS,
+                max_queries if max_queries is not None else variables.DB_BUDGET_MAX_QUERIES,
+                max_db_seconds if max_db_seconds is not None else variables.DB_BUDGET_MAX_SECONDS,
+            )
+            token = _budget.set(budget)
+            try:
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception:
+                    if budget.exceeded is None:
+                        raise
+                    result = None
+                if budget.exceeded is not None:
+                    print(f"Query budget exceeded on {route}: {budget.exceeded} "
+                          f"({budget.queries} queries, {budget.db_seconds:.3f}s)")
+                    return send_json_response(message=BUDGET_EXCEEDED_MESSAGE, status=503)
+                return result
+            finally:
+                _budget.reset(token)
+
+        return wrapper
+
+    return decorator
+
+
+def apply_statement_timeout(connection):
+    """Called when a session begins a transaction on ``connection``."""
+    budget = _budget.get()
+    if budget is None or not budget.statement_timeout_ms:
+        return
+    connection.exec_driver_sql(
+        f"SET LOCAL statement_timeout = {int(budget.statement_timeout_ms)}",
+        execution_options={"budget_exempt": True},
+    )
+
+
+def enforce_budgets(engine: AsyncEngine):
+    """Count statements and DB time against the running request's budget."""
+    sync_engine = engine.sync_engine
+
+    # insert=True: runs ahead of the timing listeners, so a refused statement
+    # never leaves a start time behind on the connection.
+    @event.listens_for(sync_engine, "before_cursor_execute", insert=True)
+    def _charge(conn, cursor, statement, parameters, context, executemany):
+        budget = _budget.get()
+        if budget is None or (context is not None and context.execution_options.get("budget_exempt")):
+            return
+        if budget.max_db_seconds and budget.db_seconds >= budget.max_db_seconds:
+            budget.exceed("db_time")
+        budget.queries += 1
+        if budget.max_queries and budget.queries > budget.max_queries:
+            budget.exceed("query_count")
+        conn.info.setdefault("budget_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("budget_started_at")
+        budget = _budget.get()
+        if not started or budget is None:
+            return
+        budget.db_seconds += time.perf_counter() - started.pop()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(exception_context):
+        started = exception_context.connection.info.get("budget_started_at") if exception_context.connection else None
+        budget = _budget.get()
+        if started and budget is not None:
+            budget.db_seconds += time.perf_counter() - started.pop()
+        original = exception_context.original_exception
+        if budget is not None and getattr(original, "sqlstate", None) == QUERY_CANCELED:
+            budget.mark_exceeded("statement_timeout")
@@ -0,0 +1,244 @@
+import asyncio
+import json
+from typing import Dict, List
+import asyncpg
+from sqlalchemy import DDL, event
+from sqlalchemy.engine import make_url
+from sqlmodel import SQLModel
+from app.core.metrics import metrics
+from app.core.session import session_cache
+from app.helpers import variables
+from RDB.redis_client import get_async_redis_client
+
+CHANNEL = "nearbuy_cache"
+# Columns each notification carries per table: enough to rebuild every cache key.
+KEY_COLUMNS: Dict[str, List[str]] = {
+    "shop": ["shop_id", "owner_id"],
+    "item": ["id", "shop_id", "itemName"],
+    "inventory": ["inventory_id", "shop_id", "item_id"],
+}
+# Cache families; every cached key is also recorded in its family's index set
+# so a family can be dropped without scanning the keyspace.
+SHOP = "shop"
+ITEM = "item"
+ALL_ITEMS = "all_items"
+FAMILIES = [SHOP, ITEM, ALL_ITEMS]
+RECONNECT_SECONDS = 5
+# Held by the one listener (across all workers) that evicts Redis; any constant
+# works, it only has to be the same for every worker.
+LISTENER_LOCK_KEY = 727_004
+
+# One statement-level trigger per table and operation; the transition tables
+# let a bulk write send a single notification with the distinct keys it touched.
+# NOTIFY payloads are capped at 8000 bytes, past that the whole table is flagged.
+NOTIFY_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION nearbuy_notify_cache() RETURNS trigger AS $$
+DECLARE
+    keys jsonb := '[]'::jsonb;
+    changed jsonb;
+    payload text;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT coalesce(jsonb_agg(DISTINCT picked.obj), '[]'::jsonb) INTO changed
+        FROM new_rows r
+        CROSS JOIN LATERAL (
+            SELECT jsonb_object_agg(k, to_jsonb(r) -> k) AS obj FROM unnest(TG_ARGV) AS k
+        ) picked;
+        keys := keys || changed;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT coalesce(jsonb_agg(DISTINCT picked.obj), '[]'::jsonb) INTO changed
+        FROM old_rows r
+        CROSS JOIN LATERAL (
+            SELECT jsonb_object_agg(k, to_jsonb(r) -> k) AS obj FROM unnest(TG_ARGV) AS k
+        ) picked;
+        keys := keys || changed;
+    END IF;
+    IF keys = '[]'::jsonb THEN
+        RETURN NULL;
+    END IF;
+    payload := jsonb_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'keys', keys)::text;
+    IF octet_length(payload) > 7900 THEN
+        payload := jsonb_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'all', true)::text;
+    END IF;
+    PERFORM pg_notify('{CHANNEL}', payload);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+_TRANSITIONS = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "UPDATE": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def trigger_statements(table: str) -> List[str]:
+    args = ", ".join(f"'{c}'" for c in KEY_COLUMNS[table])
+    statements = []
+    for op, referencing in _TRANSITIONS.items():
+        name = f"{table}_notify_cache_{op.lower()}"
+        statements.append(f'DROP TRIGGER IF EXISTS {name} ON "{table}"')
+        statements.append(
+            f'CREATE TRIGGER {name} AFTER {op} ON "{table}" {referencing} '
+            f"FOR EACH STATEMENT EXECUTE FUNCTION nearbuy_notify_cache({args})"
+        )
+    return statements
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def _install_triggers(target, connection, **kw):
+    # Databases bootstrapped from the models; migrated ones get the same DDL
+    # from the 0a6e3d8f7c15 revision.
+    connection.execute(DDL(NOTIFY_FUNCTION))
+    for table in KEY_COLUMNS:
+        if table in target.tables:
+            for statement in trigger_statements(table):
+                connection.execute(DDL(statement))
+
+
+def _index_key(family: str) -> str:
+    return f"cache_index:{family}"
+
+
+def cache_set(client, family: str, key: str, value: str, ex: int = 3600):
+    """SET ``key`` and record it in ``family`` so invalidations can find it."""
+    pipe = client.pipeline()
+    pipe.set(key, value, ex=ex)
+    pipe.sadd(_index_key(family), key)
+    # The index only has to outlive the newest key it lists.
+    pipe.expire(_index_key(family), ex)
+    pipe.execute()
+
+
+async def flush_family(family: str, client=None):
+    client = client or get_async_redis_client()
+    index = _index_key(family)
+    keys = await client.smembers(index)
+    pipe = client.pipeline()
+    if keys:
+        pipe.delete(*keys)
+    pipe.delete(index)
+    await pipe.execute()
+
+
+def keys_for(table: str, row: dict) -> List[str]:
+    if table == "shop":
+        return [f"shop:{row.get('shop_id')}", f"shops_by_owner:{row.get('owner_id')}"]
+    if table == "item":
+        return [f"item:{row.get('itemName')}"]
+    # No inventory data is cached yet.
+    return []
+
+
+async def evict(message: dict):
+    """Drop every Redis entry a change notification can have made stale."""
+    table = message.get("table")
+    if message.get("all"):
+        families = {"shop": [SHOP], "item": [ITEM, ALL_ITEMS]}.get(table, [])
+        for family in families:
+            await flush_family(family)
+        return
+
+    keys = {key for row in message.get("keys", []) for key in keys_for(table, row)}
+    if keys:
+        await get_async_redis_client().delete(*keys)
+    if table == "item":
+        # Any item change can move rows between list pages.
+        await flush_family(ALL_ITEMS)
+
+
+async def invalidate(table: str, rows: List[dict]):
+    """Evict the Redis entries cached for ``rows`` of ``table``.
+
+    Write handlers await this after their commit, so the writer's own next
+    read is fresh; the trigger notification still covers every other writer.
+    """
+    try:
+        await evict({"table": table, "keys": rows})
+    except Exception as e:
+        print(f"Could not invalidate {table} cache: {e}")
+
+
+def evict_local(message: dict):
+    """Drop this worker's in-memory copies; Redis is shared and evicted once."""
+    if message.get("table") == "user_session":
+        for row in message.get("keys", []):
+            session_cache.discard_local(row.get("token_hash"))
+
+
+_leading = False
+
+
+async def _evict_logged(message: dict):
+    try:
+        await evict(message)
+    except Exception as e:
+        metrics.incr("cache.invalidation_errors")
+        print(f"Could not apply cache invalidation for {message.get('table')}: {e}")
+
+
+def _on_notify(connection, pid, channel, payload):
+    try:
+        message = json.loads(payload)
+        evict_local(message)
+        if _leading:
+            asyncio.get_running_loop().create_task(_evict_logged(message))
+        metrics.incr("cache.invalidations", table=message.get("table"))
+    except Exception as e:
+        metrics.incr("cache.invalidation_errors")
+        print(f"Could not apply cache invalidation {payload[:200]}: {e}")
+
+
+def _listener_dsn() -> str:
+    return make_url(variables.DATABASE_URL).set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
+
+
+async def listen_for_invalidations():
+    """Apply change notifications from Postgres until cancelled.
+
+    Runs on its own connection (LISTEN pins a session, so it stays out of the
+    pools) and reconnects after failures. Every worker evicts its own
+    in-memory caches; only the listener holding LISTENER_LOCK_KEY evicts
+    Redis, so Redis work does not grow with the number of workers. The lock
+    is retried every RECONNECT_SECONDS and goes with the connection, so
+    another worker takes over when the holder dies. Notifications sent while
+    nobody held it are lost: the new holder flushes every family, and a
+    worker that reconnects clears its local caches.
+    """
+    global _leading
+    first = True
+    while True:
+        connection = None
+        try:
+            connection = await asyncpg.connect(_listener_dsn())
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+            await connection.add_listener(CHANNEL, _on_notify)
+            if not first:
+                session_cache.clear_local()
+            first = False
+            while not closed.is_set():
+                if not _leading and await connection.fetchval(
+                    "SELECT pg_try_advisory_lock($1)", LISTENER_LOCK_KEY
+                ):
+                    for family in FAMILIES:
+                        await flush_family(family)
+                    _leading = True
+                try:
+                    await asyncio.wait_for(closed.wait(), RECONNECT_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            print("Cache invalidation listener disconnected")
+        except asyncio.CancelledError:
+            _leading = False
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+            raise
+        except Exception as e:
+            print(f"Cache invalidation listener failed: {e}")
+        _leading = False
+        await asyncio.sleep(RECONNECT_SECONDS)
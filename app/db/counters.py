@@ -0,0 +1,159 @@
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import DDL, bindparam, event, text
+from sqlmodel import SQLModel
+
+COUNTER_TABLE = "row_counter"
+# Each counter is spread over this many rows and summed on read. A write
+# statement bumps one shard picked at random, so concurrent inserts into the
+# same table (vendors adding items, signups) only queue behind each other's
+# counter row lock 1 time in COUNTER_SHARDS instead of always. Changing it
+# needs a migration: the trigger function has the value baked in.
+COUNTER_SHARDS = 16
+# Counted tables and the column whose values get their own counter (None: total only).
+COUNTED_TABLES: Dict[str, Optional[str]] = {
+    "shop": None,
+    "item": None,
+    "user": "role",
+}
+
+# ORDER BY gives every writer the same lock order on the counter rows: no deadlocks.
+_UPSERT = f"""
+        INSERT INTO {COUNTER_TABLE} (name, shard, value)
+        SELECT name, pick, sum(delta) FROM changed
+        GROUP BY name HAVING sum(delta) <> 0
+        ORDER BY name
+        ON CONFLICT (name, shard) DO UPDATE SET value = {COUNTER_TABLE}.value + excluded.value;"""
+_GROUP = "TG_TABLE_NAME || ':' || group_column || ':' || coalesce(to_jsonb(r) ->> group_column, '')"
+
+# Statement-level triggers: a bulk write updates each counter shard once, with
+# the number of rows in its transition table. Counters change inside the
+# writing transaction, so readers see exactly the rows their snapshot sees;
+# the price is that the shard's row stays locked until that transaction ends.
+#
+# To switch the counters off (e.g. for a write-heavy import), drop the
+# *_count_rows_* triggers and DELETE FROM row_counter: readers fall back to
+# COUNT(*) for counters that have no rows. Recreate them with
+# trigger_statements() and seed_statements() to switch back on.
+COUNT_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION nearbuy_count_rows() RETURNS trigger AS $$
+DECLARE
+    group_column text := TG_ARGV[0];
+    pick smallint := floor(random() * {COUNTER_SHARDS})::smallint;
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE {COUNTER_TABLE} SET value = 0
+        WHERE name = TG_TABLE_NAME OR starts_with(name, TG_TABLE_NAME || ':');
+    ELSIF TG_OP = 'INSERT' THEN
+        WITH changed(name, delta) AS (
+            SELECT TG_TABLE_NAME, 1 FROM new_rows
+            UNION ALL
+            SELECT {_GROUP}, 1 FROM new_rows r WHERE group_column IS NOT NULL
+        ){_UPSERT}
+    ELSIF TG_OP = 'DELETE' THEN
+        WITH changed(name, delta) AS (
+            SELECT TG_TABLE_NAME, -1 FROM old_rows
+            UNION ALL
+            SELECT {_GROUP}, -1 FROM old_rows r WHERE group_column IS NOT NULL
+        ){_UPSERT}
+    ELSE
+        -- UPDATE: the total is unchanged, only rows moving between groups count.
+        WITH changed(name, delta) AS (
+            SELECT {_GROUP}, 1 FROM new_rows r
+            UNION ALL
+            SELECT {_GROUP}, -1 FROM old_rows r
+        ){_UPSERT}
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def counter_name(table: str, column: Optional[str] = None, value=None) -> str:
+    if column is None:
+        return table
+    value = getattr(value, "value", value)
+    return f"{table}:{column}:{value}"
+
+
+def trigger_statements(table: str) -> List[str]:
+    """DDL for ``table``'s counter triggers (UPDATE only when it has a group column)."""
+    column = COUNTED_TABLES[table]
+    args = f"'{column}'" if column else ""
+    statements = [
+        f'DROP TRIGGER IF EXISTS {table}_count_rows_{op} ON "{table}"'
+        for op in ("insert", "update", "delete", "truncate")
+    ]
+    transitions = {
+        "INSERT": "REFERENCING NEW TABLE AS new_rows",
+        "DELETE": "REFERENCING OLD TABLE AS old_rows",
+    }
+    if column:
+        transitions["UPDATE"] = "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows"
+    for op, referencing in transitions.items():
+        statements.append(
+            f'CREATE TRIGGER {table}_count_rows_{op.lower()} AFTER {op} ON "{table}" {referencing} '
+            f"FOR EACH STATEMENT EXECUTE FUNCTION nearbuy_count_rows({args})"
+        )
+    statements.append(
+        f'CREATE TRIGGER {table}_count_rows_truncate AFTER TRUNCATE ON "{table}" '
+        f"FOR EACH STATEMENT EXECUTE FUNCTION nearbuy_count_rows()"
+    )
+    return statements
+
+
+def seed_statements(table: str) -> List[str]:
+    """Recount ``table`` into the counters; run with the table locked against writes."""
+    column = COUNTED_TABLES[table]
+    statements = [
+        f"DELETE FROM {COUNTER_TABLE} WHERE name = '{table}' OR starts_with(name, '{table}:')",
+        f"INSERT INTO {COUNTER_TABLE} (name, shard, value) SELECT '{table}', 0, count(*) FROM \"{table}\"",
+    ]
+    if column:
+        statements.append(
+            f"INSERT INTO {COUNTER_TABLE} (name, shard, value) "
+            f"SELECT '{table}:{column}:' || coalesce(\"{column}\"::text, ''), 0, count(*) "
+            f'FROM "{table}" GROUP BY "{column}"'
+        )
+    return statements
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def _install_triggers(target, connection, **kw):
+    # Databases bootstrapped from the models; migrated ones get the same DDL
+    # from the 6c2b9e4f1a87 revision. Tables that already had rows before
+    # their counter existed are counted once, with writes blocked meanwhile.
+    if COUNTER_TABLE not in target.tables:
+        return
+    connection.execute(DDL(COUNT_FUNCTION))
+    for table in COUNTED_TABLES:
+        if table not in target.tables:
+            continue
+        for statement in trigger_statements(table):
+            connection.execute(DDL(statement))
+        seeded = connection.execute(
+            text(f"SELECT 1 FROM {COUNTER_TABLE} WHERE name = :name"), {"name": table}
+        ).first()
+        if seeded is None:
+            connection.execute(text(f'LOCK TABLE "{table}" IN SHARE MODE'))
+            for statement in seed_statements(table):
+                connection.execute(text(statement))
+
+
+async def read_counters(session, names: Iterable[str]) -> Dict[str, int]:
+    """Current values of the named counters (their shards summed); names without a row are left out."""
+    query = text(
+        f"SELECT name, sum(value) FROM {COUNTER_TABLE} WHERE name IN :names GROUP BY name"
+    ).bindparams(
+        bindparam("names", expanding=True)
+    )
+    result = await session.execute(query, {"names": list(names)})
+    return {name: int(value) for name, value in result.all()}
+
+
+async def table_count(session, table) -> Optional[int]:
+    """Exact row count of a counted table from one counter row; None when it is not counted."""
+    name = table.__table__.name
+    if name not in COUNTED_TABLES:
+        return None
+    return (await read_counters(session, [name])).get(name)
@@ -0,0 +1,291 @@
+from contextvars import ContextVar
+from enum import Enum
+from functools import wraps
+import random
+from typing import Dict, List, Optional
+from sqlalchemy import Select, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from RDB.redis_client import get_async_redis_client
+from app.db.budget import apply_statement_timeout, enforce_budgets
+from app.db.instrumentation import InstrumentedQueuePool, instrument_engine
+from app.db.query_counter import count_queries
+from app.db.slow_queries import log_slow_queries
+from app.helpers import variables
+
+
+class Workload(str, Enum):
+    API = "API"  # request handlers
+    SYNC = "SYNC"  # background sync jobs (typesense indexing)
+    ADMIN = "ADMIN"  # admin jobs and one-off scripts (seeding, fake data)
+
+
+# Upper bound of connections one worker can hold is the sum of
+# pool_size + max_overflow over every workload that has been used
+# (times one more for each replica in DATABASE_REPLICA_URLS).
+POOL_SETTINGS: Dict[Workload, dict] = {
+    Workload.API: {
+        "pool_size": variables.DB_API_POOL_SIZE,
+        "max_overflow": variables.DB_API_MAX_OVERFLOW,
+    },
+    Workload.SYNC: {
+        "pool_size": variables.DB_SYNC_POOL_SIZE,
+        "max_overflow": variables.DB_SYNC_MAX_OVERFLOW,
+    },
+    Workload.ADMIN: {
+        "pool_size": variables.DB_ADMIN_POOL_SIZE,
+        "max_overflow": variables.DB_ADMIN_MAX_OVERFLOW,
+    },
+}
+
+PRIMARY = "PRIMARY"
+REPLICA = "REPLICA"
+
+# Set by the read_only / primary_only decorators for the duration of a DB call.
+_route: ContextVar[Optional[str]] = ContextVar("db_route", default=None)
+
+
+def async_database_url(url: str) -> str:
+    """Point a plain postgresql:// URL at the asyncpg driver."""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(
+        hide_password=False
+    )
+
+
+def _routed(target: str):
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            token = _route.set(target)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _route.reset(token)
+
+        return wrapper
+
+    return decorator
+
+
+# Mark a DB method as safe to serve from a replica (until the session writes).
+read_only = _routed(REPLICA)
+# Pin a DB method to the primary even inside a read-only session.
+primary_only = _routed(PRIMARY)
+
+
+def _ryw_key(key: str) -> str:
+    return f"ryw:{key}"
+
+
+async def mark_recent_write(key: str):
+    try:
+        await get_async_redis_client().set(_ryw_key(key), 1, ex=variables.READ_YOUR_WRITES_SECONDS)
+    except Exception as e:
+        print(f"Could not record read-your-writes marker: {e}")
+
+
+async def has_recent_write(key: str) -> bool:
+    try:
+        return bool(await get_async_redis_client().exists(_ryw_key(key)))
+    except Exception as e:
+        # Without the marker we cannot prove the replica is safe; stay on the primary.
+        print(f"Could not read read-your-writes marker: {e}")
+        return True
+
+
+class RoutingSession(Session):
+    """Session that picks the primary or a replica per statement.
+
+    SELECTs go to a replica when the session was opened read-only or the
+    calling DB method is marked ``read_only``, as long as this session has
+    not written anything and the caller is not inside its read-your-writes
+    window. Everything else (flushes, UPDATE/DELETE, ``primary_only``
+    methods) goes to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        workload = self.info.get("workload", Workload.API)
+        primary = EngineRegistry.get_engine(workload).sync_engine
+        replicas = EngineRegistry.get_replica_engines(workload)
+        if not replicas or self._flushing or not isinstance(clause, Select):
+            return primary
+
+        route = _route.get()
+        if (
+            route == PRIMARY
+            or self.info.get("has_writes")
+            or self.info.get("recent_write")
+        ):
+            return primary
+        if route == REPLICA or self.info.get("read_only"):
+            return random.choice(replicas).sync_engine
+        return primary
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _flag_flush_write(session, flush_context):
+    session.info["has_writes"] = True
+    # Rows memoized by app/db/loader.py may be stale now.
+    session.info.pop("loader_memo", None)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _flag_statement_write(orm_execute_state):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info["has_writes"] = True
+        orm_execute_state.session.info.pop("loader_memo", None)
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def _apply_budget(session, transaction, connection):
+    apply_statement_timeout(connection)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_write(session):
+    # Runs inside the sync commit; RoutingAsyncSession.commit writes the marker.
+    key = session.info.get("ryw_key")
+    if key and session.info.get("has_writes") and variables.READ_YOUR_WRITES_SECONDS:
+        session.info["ryw_pending"] = key
+
+
+class RoutingAsyncSession(AsyncSession):
+    """AsyncSession that records the read-your-writes marker after a commit that wrote."""
+
+    async def commit(self):
+        await super().commit()
+        key = self.info.pop("ryw_pending", None)
+        if key:
+            await mark_recent_write(key)
+
+
+class EngineRegistry:
+    """Single owner of every engine (and therefore every pool) in a worker.
+
+    Engines are created lazily on first use, one per workload class, so a
+    script that only seeds data never opens the API pool and vice versa.
+    """
+
+    _engines: Dict[Workload, AsyncEngine] = {}
+    _replica_engines: Dict[Workload, List[AsyncEngine]] = {}
+    _session_makers: Dict[Workload, async_sessionmaker] = {}
+
+    @classmethod
+    def _connect_args(cls, workload: Workload) -> dict:
+        # Server-side default for every API statement; query_budget routes tighten it per transaction.
+        if workload == Workload.API and variables.DB_STATEMENT_TIMEOUT_MS:
+            return {"server_settings": {"statement_timeout": str(variables.DB_STATEMENT_TIMEOUT_MS)}}
+        return {}
+
+    @classmethod
+    def _create_engine(cls, url: str, workload: Workload, label: str) -> AsyncEngine:
+        engine = create_async_engine(
+            async_database_url(url),
+            poolclass=InstrumentedQueuePool,
+            pool_logging_name=label,
+            pool_pre_ping=True,
+            pool_recycle=variables.DB_POOL_RECYCLE,
+            pool_timeout=variables.DB_POOL_TIMEOUT,
+            connect_args=cls._connect_args(workload),
+            **POOL_SETTINGS[workload],
+        )
+        instrument_engine(engine)
+        enforce_budgets(engine)
+        count_queries(engine)
+        log_slow_queries(engine)
+        return engine
+
+    @classmethod
+    def get_engine(cls, workload: Workload = Workload.API) -> AsyncEngine:
+        engine = cls._engines.get(workload)
+        if engine is None:
+            engine = cls._create_engine(variables.DATABASE_URL, workload, workload.value)
+            cls._engines[workload] = engine
+            # expire_on_commit=False: handlers read attributes after commit and
+            # an expired attribute would need an implicit (sync) refresh.
+            cls._session_makers[workload] = async_sessionmaker(
+                engine,
+                class_=RoutingAsyncSession,
+                sync_session_class=RoutingSession,
+                expire_on_commit=False,
+                info={"workload": workload},
+            )
+        return engine
+
+    @classmethod
+    def get_replica_engines(cls, workload: Workload = Workload.API) -> List[AsyncEngine]:
+        engines = cls._replica_engines.get(workload)
+        if engines is None:
+            engines = [
+                cls._create_engine(url, workload, f"{workload.value}-replica-{i}")
+                for i, url in enumerate(variables.DATABASE_REPLICA_URLS)
+            ]
+            cls._replica_engines[workload] = engines
+        return engines
+
+    @classmethod
+    async def recent_write(cls, workload: Workload, ryw_key: Optional[str]) -> bool:
+        """Whether ``ryw_key`` wrote within READ_YOUR_WRITES_SECONDS (pass to ``session``)."""
+        if (
+            ryw_key
+            and variables.READ_YOUR_WRITES_SECONDS
+            and cls.get_replica_engines(workload)
+        ):
+            return await has_recent_write(ryw_key)
+        return False
+
+    @classmethod
+    def session(
+        cls,
+        workload: Workload = Workload.API,
+        read_only: bool = False,
+        ryw_key: Optional[str] = None,
+        recent_write: bool = False,
+    ) -> AsyncSession:
+        """New AsyncSession bound to the workload's pool (use as ``async with``).
+
+        ``ryw_key`` identifies the caller (e.g. their session token) for the
+        read-your-writes window; see READ_YOUR_WRITES_SECONDS. ``recent_write``
+        comes from ``recent_write()``, checked before the session is built,
+        and keeps its SELECTs on the primary.
+        """
+        cls.get_engine(workload)
+        info = {"read_only": read_only, "ryw_key": ryw_key, "recent_write": recent_write}
+        return cls._session_makers[workload](info=info)
+
+    @classmethod
+    def pool_status(cls) -> Dict[str, dict]:
+        """Live size / in-use / overflow of every pool opened so far."""
+        status = {}
+        for workload, engine in cls._engines.items():
+            for e in [engine] + cls._replica_engines.get(workload, []):
+                pool = e.sync_engine.pool
+                status[pool.logging_name] = {
+                    "size": pool.size(),
+                    "max_overflow": POOL_SETTINGS[workload]["max_overflow"],
+                    "checked_in": pool.checkedin(),
+                    "checked_out": pool.checkedout(),
+                    "overflow": max(pool.overflow(), 0),
+                }
+        return status
+
+    @classmethod
+    def is_initialized(cls, workload: Workload = Workload.API) -> bool:
+        return workload in cls._engines
+
+    @classmethod
+    async def dispose(cls, workload: Optional[Workload] = None):
+        workloads = [workload] if workload else list(cls._engines)
+        for w in workloads:
+            engine = cls._engines.pop(w, None)
+            cls._session_makers.pop(w, None)
+            if engine is not None:
+                await engine.dispose()
+            for replica in cls._replica_engines.pop(w, []):
+                await replica.dispose()
@@ -0,0 +1,53 @@
+import json
+import time
+from typing import Callable, Dict, List
+import uuid
+from sqlalchemy import text
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.models.inventory import INVENTORY
+from app.db.models.item import ITEM
+from app.db.models.shop import SHOP
+from app.db.models.user import USER, USER_META, USER_SESSION
+
+# Lookups on request paths that must stay index-backed. Add an entry here when a
+# new hot filter lands; app/tests/test_query_plans.py checks every one of them.
+HOT_QUERIES: Dict[str, Callable] = {
+    "item_by_shop_and_name": lambda: select(ITEM).where(ITEM.shop_id == uuid.uuid4(), ITEM.itemName == "hot-query"),
+    "shops_by_owner": lambda: select(SHOP).where(SHOP.owner_id == uuid.uuid4()),
+    "shop_by_name": lambda: select(SHOP).where(SHOP.shopName == "hot-query"),
+    "inventory_by_shop": lambda: select(INVENTORY).where(INVENTORY.shop_id == uuid.uuid4()),
+    "inventory_by_item": lambda: select(INVENTORY).where(INVENTORY.item_id == uuid.uuid4()),
+    "expired_sessions": lambda: select(USER_SESSION.pk).where(USER_SESSION.expired_at < int(time.time())),
+    "session_by_token": lambda: select(USER_SESSION).where(USER_SESSION.pk == "hot-query"),
+    "user_by_email": lambda: select(USER).where(USER.email == "hot-query@example.com"),
+    "recent_user_meta": lambda: select(USER_META).where(USER_META.ts >= int(time.time()) - 86400),
+}
+
+
+async def explain(session: AsyncSession, statement) -> dict:
+    """EXPLAIN (FORMAT JSON) of ``statement`` with sequential scans discouraged.
+
+    With enable_seqscan off the planner only falls back to a Seq Scan when no
+    usable index exists, which is exactly what the plan check looks for.
+    """
+    sql = str(statement.compile(
+        dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+    ))
+    await session.exec(text("SET LOCAL enable_seqscan = off"))
+    result = await session.exec(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    await session.rollback()
+    return plan[0]["Plan"]
+
+
+def seq_scans(plan: dict) -> List[str]:
+    """Relations read with a Seq Scan anywhere in the plan tree."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name", "?"))
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
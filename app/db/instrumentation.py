@@ -0,0 +1,138 @@
+from contextvars import ContextVar
+from functools import wraps
+import inspect
+import time
+from typing import Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.metrics import metrics
+
+UNTAGGED = "untagged"
+
+# (DB method, table) of the DB call currently running, used to label statements.
+_query_tag: ContextVar[Optional[Tuple[str, str]]] = ContextVar("db_query_tag", default=None)
+
+
+def _pool_label(pool) -> str:
+    return pool.logging_name or UNTAGGED
+
+
+def _table_label(table) -> str:
+    if table is None:
+        return UNTAGGED
+    if hasattr(table, "value"):
+        return str(table.value)
+    if isinstance(table, type):
+        return table.__name__
+    return str(table)
+
+
+def current_tag() -> Tuple[str, str]:
+    return _query_tag.get() or (UNTAGGED, UNTAGGED)
+
+
+def instrument(table=None):
+    """Tag statements issued inside a DB method with its name and table.
+
+    The table is taken from ``table`` when given, else from the call's
+    ``dbClassNam`` argument.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            target = table
+            if target is None:
+                try:
+                    target = signature.bind_partial(*args, **kwargs).arguments.get("dbClassNam")
+                except TypeError:
+                    target = None
+            token = _query_tag.set((func.__qualname__, _table_label(target)))
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _query_tag.reset(token)
+
+        return wrapper
+
+    return decorator
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def _do_get(self):
+        label = _pool_label(self)
+        if self.checkedin() == 0 and self.overflow() >= self._max_overflow:
+            # Every connection (overflow included) is checked out: this caller queues.
+            metrics.incr("db.pool.exhausted", pool=label)
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.observe("db.pool.checkout_wait", time.perf_counter() - start, pool=label)
+
+
+def _record_pool_usage(pool):
+    label = _pool_label(pool)
+    metrics.set_gauge("db.pool.in_use", pool.checkedout(), pool=label)
+    metrics.set_gauge("db.pool.overflow", max(pool.overflow(), 0), pool=label)
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Attach pool and statement timing listeners to an engine."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.incr("db.pool.connect", pool=_pool_label(sync_engine.pool))
+
+    @event.listens_for(sync_engine, "close")
+    def _on_close(dbapi_connection, connection_record):
+        # Includes pool_recycle reconnects, so connect/close rates show churn.
+        metrics.incr("db.pool.close", pool=_pool_label(sync_engine.pool))
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.incr("db.pool.invalidate", pool=_pool_label(sync_engine.pool))
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        _record_pool_usage(sync_engine.pool)
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None:
+            metrics.observe(
+                "db.pool.hold", time.perf_counter() - started,
+                pool=_pool_label(sync_engine.pool),
+            )
+        _record_pool_usage(sync_engine.pool)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("query_started_at")
+        if not started:
+            return
+        method, table = current_tag()
+        metrics.observe(
+            "db.query", time.perf_counter() - started.pop(),
+            method=method, table=table, pool=_pool_label(conn.engine.pool),
+        )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(exception_context):
+        started = exception_context.connection.info.get("query_started_at") if exception_context.connection else None
+        if started:
+            started.pop()
+        method, table = current_tag()
+        metrics.incr("db.query.errors", method=method, table=table)
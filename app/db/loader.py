@@ -0,0 +1,109 @@
+import asyncio
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+import uuid
+from sqlalchemy import ARRAY, any_, bindparam
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+MEMO_KEY = "loader_memo"
+LOADER_KEY = "loader"
+
+
+def normalize_key(table, column: str, value) -> Hashable:
+    """Coerce ``value`` to the column's Python type so "abc..." and UUID("abc...") share a slot."""
+    try:
+        python_type = table.__table__.c[column].type.python_type
+    except (KeyError, NotImplementedError):
+        return value
+    if python_type is uuid.UUID and isinstance(value, str):
+        return uuid.UUID(value)
+    return value
+
+
+def _by_column(table, column: str, values) -> Any:
+    col = getattr(table, column)
+    return select(table).where(col == any_(bindparam("values", list(values), type_=ARRAY(col.type))))
+
+
+class BatchLoader:
+    """Coalesces the lookups one session makes in the same event-loop tick.
+
+    Lookups of one (table, unique column) issued together, by ``load_many``
+    or by ``load_one`` calls a handler gathers, are answered by a single
+    ``WHERE column = ANY(:values)`` on that session. The batch shares the
+    request's connection, transaction and identity map, and costs no extra
+    wait: it is sent on the next loop iteration.
+
+    A single drain task per session sends the batches one after another,
+    since an AsyncSession must never run two statements at once.
+    """
+
+    def __init__(self, db_pool: AsyncSession):
+        self._db_pool = db_pool
+        self._pending: Dict[Tuple[type, str], Dict[Hashable, asyncio.Future]] = {}
+        self._draining: Optional[asyncio.Task] = None
+
+    @classmethod
+    def for_session(cls, db_pool: AsyncSession) -> "BatchLoader":
+        loader = db_pool.info.get(LOADER_KEY)
+        if loader is None:
+            loader = db_pool.info[LOADER_KEY] = cls(db_pool)
+        return loader
+
+    async def load(self, table, column: str, key: Hashable):
+        loop = asyncio.get_running_loop()
+        batch_key = (table, column)
+        batch = self._pending.setdefault(batch_key, {})
+        future = batch.get(key)
+        if future is None:
+            future = batch[key] = loop.create_future()
+        if self._draining is None:
+            # Scheduled behind the lookups already queued this tick, so they join the batch.
+            self._draining = loop.create_task(self._drain())
+        # shield: one caller being cancelled must not cancel the others' result.
+        return await asyncio.shield(future)
+
+    async def _drain(self):
+        try:
+            while self._pending:
+                batch_key = next(iter(self._pending))
+                await self._run(batch_key, self._pending.pop(batch_key))
+        finally:
+            self._draining = None
+
+    async def _run(self, batch_key, batch: Dict[Hashable, asyncio.Future]):
+        table, column = batch_key
+        try:
+            rows = (await self._db_pool.exec(_by_column(table, column, batch))).all()
+            found = {getattr(row, column): row for row in rows}
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(found.get(key))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+
+
+async def load_many(table, column: str, values: Iterable, db_pool: AsyncSession) -> Dict[Hashable, Any]:
+    """Rows of ``table`` whose unique ``column`` is in ``values``, keyed by that value.
+
+    Results are memoized on the request's session (cleared whenever it
+    writes); misses are batched with the session's other pending lookups.
+    """
+    memo: Dict[Tuple[str, str, Hashable], Optional[Any]] = db_pool.info.setdefault(MEMO_KEY, {})
+    name = table.__tablename__
+    keys = list(dict.fromkeys(normalize_key(table, column, v) for v in values))
+    missing = [k for k in keys if (name, column, k) not in memo]
+
+    if missing:
+        loader = BatchLoader.for_session(db_pool)
+        rows = await asyncio.gather(*(loader.load(table, column, k) for k in missing))
+        for key, row in zip(missing, rows):
+            memo[(name, column, key)] = row
+
+    return {k: memo[(name, column, k)] for k in keys}
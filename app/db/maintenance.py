@@ -0,0 +1,230 @@
+import asyncio
+from datetime import datetime, timezone
+import re
+import traceback
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.metrics import metrics
+from app.db.engines import EngineRegistry, Workload
+from app.db.models.user import USER_META
+from app.helpers import variables
+
+USER_META_TABLE = "user_meta"
+# Catch-all for rows whose month has no partition (maintenance fell behind),
+# so USER_META inserts never fail for want of one.
+USER_META_DEFAULT_PARTITION = f"{USER_META_TABLE}_default"
+HASH_PARTITIONED_TABLES = ["item", "inventory"]
+_PARTITION_NAME = re.compile(rf"^{USER_META_TABLE}_p(\d{{4}})(\d{{2}})$")
+# Any constant works, it only has to be the same for every worker.
+MAINTENANCE_LOCK_KEY = 727_002
+SESSION_SWEEP_LOCK_KEY = 727_003
+
+
+def add_months(year: int, month: int, months: int) -> Tuple[int, int]:
+    index = year * 12 + (month - 1) + months
+    return index // 12, index % 12 + 1
+
+
+def month_start(year: int, month: int) -> int:
+    """Epoch seconds of the first instant of the month (UTC), the unit of USER_META.ts."""
+    return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp())
+
+
+def partition_name(year: int, month: int) -> str:
+    return f"{USER_META_TABLE}_p{year:04d}{month:02d}"
+
+
+async def user_meta_partitions(conn: AsyncConnection) -> List[Tuple[str, int, int]]:
+    """(name, year, month) of every monthly USER_META partition."""
+    result = await conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :parent"
+    ), {"parent": USER_META_TABLE})
+    partitions = []
+    for name in result.scalars():
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, int(match.group(1)), int(match.group(2))))
+    return sorted(partitions, key=lambda p: (p[1], p[2]))
+
+
+async def ensure_user_meta_default_partition(conn: AsyncConnection) -> List[str]:
+    found = (await conn.execute(
+        text("SELECT to_regclass(:name)"), {"name": USER_META_DEFAULT_PARTITION}
+    )).scalar()
+    if found is not None:
+        return []
+    await conn.execute(text(
+        f"CREATE TABLE {USER_META_DEFAULT_PARTITION} PARTITION OF {USER_META_TABLE} DEFAULT"
+    ))
+    return [USER_META_DEFAULT_PARTITION]
+
+
+async def _create_month_partition(conn: AsyncConnection, name: str, start: int, end: int):
+    stranded = (await conn.execute(text(
+        f"SELECT count(*) FROM {USER_META_DEFAULT_PARTITION} WHERE ts >= :start AND ts < :end"
+    ), {"start": start, "end": end})).scalar()
+    if not stranded:
+        await conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {USER_META_TABLE} "
+            f"FOR VALUES FROM ({start}) TO ({end})"
+        ))
+        return
+    # PARTITION OF refuses a range the default partition holds rows for:
+    # build the partition beside the table, move the rows, then attach it.
+    print(f"Warning: moving {stranded} USER_META rows from the default partition into {name}")
+    columns = ", ".join(c.name for c in USER_META.__table__.columns)
+    await conn.execute(text(f"CREATE TABLE {name} (LIKE {USER_META_TABLE} INCLUDING DEFAULTS)"))
+    await conn.execute(text(
+        f"WITH moved AS (DELETE FROM {USER_META_DEFAULT_PARTITION} "
+        f"WHERE ts >= {start} AND ts < {end} RETURNING {columns}) "
+        f"INSERT INTO {name} ({columns}) SELECT {columns} FROM moved"
+    ))
+    await conn.execute(text(
+        f"ALTER TABLE {USER_META_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ({start}) TO ({end})"
+    ))
+
+
+async def ensure_user_meta_partitions(
+    conn: AsyncConnection, months_ahead: Optional[int] = None, now: Optional[datetime] = None
+) -> List[str]:
+    """Create the default partition, the current month's and the next ``months_ahead`` ones."""
+    months_ahead = variables.USER_META_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+    now = now or datetime.now(timezone.utc)
+    created = await ensure_user_meta_default_partition(conn)
+    existing = {name for name, _, _ in await user_meta_partitions(conn)}
+    for offset in range(months_ahead + 1):
+        year, month = add_months(now.year, now.month, offset)
+        name = partition_name(year, month)
+        if name in existing:
+            continue
+        next_year, next_month = add_months(year, month, 1)
+        await _create_month_partition(
+            conn, name, month_start(year, month), month_start(next_year, next_month)
+        )
+        created.append(name)
+    return created
+
+
+async def drop_expired_user_meta_partitions(
+    conn: AsyncConnection, retention_months: Optional[int] = None, now: Optional[datetime] = None
+) -> List[str]:
+    """Drop partitions that end before the retention window (0 keeps everything)."""
+    retention_months = (
+        variables.USER_META_RETENTION_MONTHS if retention_months is None else retention_months
+    )
+    if not retention_months:
+        return []
+    now = now or datetime.now(timezone.utc)
+    cutoff = add_months(now.year, now.month, -retention_months)
+    dropped = []
+    for name, year, month in await user_meta_partitions(conn):
+        if (year, month) >= cutoff:
+            break
+        # Dropping a whole partition: no row-by-row DELETE, no dead tuples to vacuum.
+        await conn.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    return dropped
+
+
+async def ensure_hash_partitions(conn: AsyncConnection, partitions: Optional[int] = None) -> List[str]:
+    """Create the SHOP_HASH_PARTITIONS partitions of item/inventory when a table has none yet.
+
+    Only matters for a database bootstrapped from the models; the migration
+    creates them itself. The modulus of an existing set is never changed here.
+    """
+    partitions = variables.SHOP_HASH_PARTITIONS if partitions is None else partitions
+    if not partitions:
+        return []
+    created = []
+    for table in HASH_PARTITIONED_TABLES:
+        row = (await conn.execute(text(
+            "SELECT c.relkind = 'p', (SELECT count(*) FROM pg_inherits i WHERE i.inhparent = c.oid) "
+            "FROM pg_class c WHERE c.oid = to_regclass(:table)"
+        ), {"table": table})).first()
+        if row is None or not row[0] or row[1]:
+            continue
+        for remainder in range(partitions):
+            name = f"{table}_h{remainder}"
+            await conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+            ))
+            created.append(name)
+    return created
+
+
+async def run_maintenance():
+    """One maintenance pass on the ADMIN pool; a no-op in workers that lose the lock."""
+    async with EngineRegistry.get_engine(Workload.ADMIN).begin() as conn:
+        locked = (await conn.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}
+        )).scalar()
+        if not locked:
+            return
+        created = await ensure_hash_partitions(conn)
+        created += await ensure_user_meta_partitions(conn)
+        dropped = await drop_expired_user_meta_partitions(conn)
+    if created or dropped:
+        print(f"DB maintenance: created {created or 'no'} partitions, dropped {dropped or 'no'} partitions")
+
+
+async def maintenance_loop(interval: Optional[int] = None):
+    """Run maintenance every ``interval`` seconds until cancelled (startup runs the first pass)."""
+    interval = interval or variables.DB_MAINTENANCE_INTERVAL_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_maintenance()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            traceback.print_exc()
+            print(f"Error in DB maintenance.")
+
+
+async def sweep_expired_sessions(batch_size: Optional[int] = None, now: Optional[int] = None) -> int:
+    """Delete expired USER_SESSION rows, ``batch_size`` at a time; returns how many went.
+
+    Each batch is its own short transaction walking the expired_at index, so
+    row locks are held briefly and logins are never queued behind one big
+    DELETE. A worker that loses the lock leaves the sweep to the one holding it.
+    """
+    batch_size = batch_size or variables.SESSION_SWEEP_BATCH_SIZE
+    now = now or int(datetime.now(timezone.utc).timestamp())
+    swept = 0
+    while True:
+        async with EngineRegistry.get_engine(Workload.ADMIN).begin() as conn:
+            locked = (await conn.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": SESSION_SWEEP_LOCK_KEY}
+            )).scalar()
+            if not locked:
+                break
+            result = await conn.execute(text(
+                "DELETE FROM user_session WHERE pk IN ("
+                "SELECT pk FROM user_session WHERE expired_at < :now "
+                "ORDER BY expired_at LIMIT :batch FOR UPDATE SKIP LOCKED)"
+            ), {"now": now, "batch": batch_size})
+        swept += result.rowcount
+        if result.rowcount < batch_size:
+            break
+    if swept:
+        metrics.incr("sessions.swept", swept)
+    return swept
+
+
+async def session_sweeper_loop(interval: Optional[int] = None):
+    """Sweep expired sessions every ``interval`` seconds until cancelled."""
+    interval = interval or variables.SESSION_SWEEP_INTERVAL_SECONDS
+    while True:
+        try:
+            await sweep_expired_sessions()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            traceback.print_exc()
+            print(f"Error sweeping expired sessions.")
+        await asyncio.sleep(interval)
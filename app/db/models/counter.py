@@ -0,0 +1,16 @@
+from enum import Enum
+from sqlalchemy import BigInteger, SmallInteger
+from sqlmodel import Column, Field, SQLModel
+
+
+class CounterTableEnum(str, Enum):
+    ROW_COUNTER = "ROW_COUNTER"
+
+
+class ROW_COUNTER(SQLModel, table=True):
+    # Kept by the triggers in app/db/counters.py; never written by the app.
+    # name is "<table>" for the whole table or "<table>:<column>:<value>" per group.
+    name: str = Field(primary_key=True)
+    # One of COUNTER_SHARDS rows per counter; the counter's value is their sum.
+    shard: int = Field(default=0, sa_column=Column(SmallInteger, primary_key=True, server_default="0"))
+    value: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, server_default="0"))
@@ -1,8 +1,10 @@
 import time
 from enum import Enum
 import uuid
+from sqlalchemy import ForeignKeyConstraint
 from sqlmodel import Column, Integer, SQLModel, Field, func
 from typing import Optional
+from app.helpers import variables
 
 class InventoryTableEnum(str, Enum):
     INVENTORY = "INVENTORY"
@@ -12,9 +14,23 @@ class StockStatus(str, Enum):
     OUT_OF_STOCK = "OUT_OF_STOCK"
 
 class INVENTORY(SQLModel, table=True):
+    # With SHOP_HASH_PARTITIONS set, both tables are HASH (shop_id) partitioned
+    # and item's key becomes (id, shop_id), so the item reference includes shop_id.
+    __table_args__ = (
+        (
+            ForeignKeyConstraint(["item_id", "shop_id"], ["item.id", "item.shop_id"]),
+            {"postgresql_partition_by": "HASH (shop_id)"},
+        )
+        if variables.SHOP_HASH_PARTITIONS
+        else ()
+    )
     inventory_id: str = Field(default=None, primary_key=True)
-    shop_id: uuid.UUID = Field(foreign_key="shop.shop_id", primary_key=True)
-    item_id: uuid.UUID = Field(foreign_key="item.id", primary_key=True)
+    shop_id: uuid.UUID = Field(foreign_key="shop.shop_id", primary_key=True, index=True)
+    item_id: uuid.UUID = Field(
+        foreign_key=None if variables.SHOP_HASH_PARTITIONS else "item.id",
+        primary_key=True,
+        index=True,
+    )
     quantity: int = Field(default=0)
     price_at_entry: Optional[float] = Field(default=None)
     last_restocked_at: Optional[int] = Field(default_factory=lambda: int(time.time()))
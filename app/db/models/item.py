@@ -1,17 +1,28 @@
 from enum import Enum
 import uuid
-from sqlmodel import UUID, Column, SQLModel, Field
+from sqlmodel import UUID, Column, Index, SQLModel, Field
 from typing import Optional
+from app.helpers import variables
+from app.helpers.ids import uuid7
 
 class ItemTableEnum(str, Enum):
     ITEM = "ITEM"
 class ITEM(SQLModel, table=True):
     __tablename__ = "item"
+    __table_args__ = (
+        # One row per item name within a shop (add_item duplicate check).
+        Index("uq_item_shop_id_itemName", "shop_id", "itemName", unique=True),
+        # Optional HASH (shop_id) partitioning, see SHOP_HASH_PARTITIONS.
+        {"postgresql_partition_by": "HASH (shop_id)"} if variables.SHOP_HASH_PARTITIONS else {},
+    )
     id: uuid.UUID = Field(
-        default_factory=uuid.uuid4,
+        default_factory=uuid7,
         sa_column=Column(UUID(as_uuid=True), primary_key=True, index=True)
     )
-    shop_id: uuid.UUID  = Field(foreign_key="shop.shop_id")
+    # A partitioned table's primary key has to contain the partition key.
+    shop_id: uuid.UUID  = Field(
+        foreign_key="shop.shop_id", primary_key=bool(variables.SHOP_HASH_PARTITIONS)
+    )
     itemName: str = Field(index=True)
     price: float
     description: Optional[str] = Field(default=None)
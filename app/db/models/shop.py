@@ -5,6 +5,7 @@ from sqlmodel import Integer, SQLModel, Field, func
 from typing import Optional
 from uuid import UUID
 from sqlalchemy import Column
+from app.helpers.ids import uuid7
 
 class ShopTableEnum(str, Enum):
     SHOP = "SHOP"
@@ -12,13 +13,13 @@ class ShopTableEnum(str, Enum):
 class SHOP(SQLModel, table=True):
     __tablename__ = "shop"
     shop_id: Optional[uuid.UUID] = Field(
-        default_factory=uuid.uuid4,
+        default_factory=uuid7,
         primary_key=True,
         index=True
     ) 
-    owner_id: UUID = Field(foreign_key="user.id")
+    owner_id: UUID = Field(foreign_key="user.id", index=True)
     fullName: str
-    shopName: str
+    shopName: str = Field(index=True)
     address: str
     contact: Optional[str] = Field(default=None)
     description: Optional[str] = Field(default=None)
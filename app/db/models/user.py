@@ -1,8 +1,9 @@
 import time
-from sqlmodel import UUID, Column, Integer, SQLModel, Field, func
+from sqlmodel import UUID, Column, Index, Integer, SQLModel, Field, func
 from typing import Optional
 import uuid
 from enum import Enum
+from app.helpers.ids import uuid7
 
 class UserTableEnum(str, Enum):
     USER = "USER"
@@ -26,7 +27,7 @@ class ReasonEnum(str, Enum):
 
 class USER(SQLModel, table=True):
     id: uuid.UUID = Field(
-        default_factory=uuid.uuid4,
+        default_factory=uuid7,
         sa_column=Column(UUID(as_uuid=True), primary_key=True, index=True)
     )
     email: str = Field(index=True, nullable=False, unique=True)
@@ -46,15 +47,27 @@ class USER_SESSION(SQLModel, table=True):
     browser: Optional[str]
     os: Optional[str]
     created_at: int = Field(default_factory=lambda: int(time.time()))
-    expired_at: int
+    expired_at: int = Field(index=True)
 
 class USER_META(SQLModel, table=True):
-    pk: int = Field(primary_key=True)
+    # Range partitioned by month on ts; partitions are created and dropped by
+    # app/db/maintenance.py. The partition key has to be part of the primary key.
+    __table_args__ = (
+        Index("ix_user_meta_ts", "ts"),
+        {"postgresql_partition_by": "RANGE (ts)"},
+    )
+    pk: Optional[int] = Field(
+        default=None,
+        sa_column=Column(Integer, primary_key=True, autoincrement=True)
+    )
     email: str
     reason: ReasonEnum  # signup, login, resetPassword, changePassword, set2fa, remove2fa, change2fa, confirmEmail, resetApikey
     ip: Optional[str]
     role : UserRole
     browser: Optional[str]
     os: Optional[str]
-    ts: Optional[int] = Field(default_factory=lambda: int(time.time()))
+    ts: int = Field(
+        default_factory=lambda: int(time.time()),
+        sa_column=Column(Integer, primary_key=True)
+    )
 
@@ -0,0 +1,87 @@
+import base64
+from enum import Enum
+import hashlib
+import json
+from typing import Any, List
+import uuid
+from sqlalchemy import text
+from RDB.redis_client import redis_client
+from app.helpers import variables
+
+
+class CountMode(str, Enum):
+    EXACT = "exact"  # COUNT(*) on every call
+    ESTIMATE = "estimate"  # planner estimate (pg_class.reltuples); cached count when filtered
+    CACHED = "cached"  # COUNT(*) cached in redis for COUNT_CACHE_SECONDS
+    NONE = "none"  # no total at all
+
+
+class InvalidCursorError(ValueError):
+    def __init__(self, message="Invalid pagination cursor."):
+        self.message = message
+        super().__init__(self.message)
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque, url-safe cursor for the key values of the last row on a page."""
+    raw = json.dumps([str(v) if isinstance(v, uuid.UUID) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise InvalidCursorError()
+        return [_coerce(column, value) for column, value in zip(columns, values)]
+    except InvalidCursorError:
+        raise
+    except Exception:
+        raise InvalidCursorError()
+
+
+def _coerce(column, value):
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if value is None or isinstance(value, python_type):
+        return value
+    return python_type(value)
+
+
+def _count_cache_key(table, filters) -> str:
+    parts = []
+    for f in filters or []:
+        compiled = f.compile()
+        parts.append(f"{compiled}|{sorted((k, str(v)) for k, v in compiled.params.items())}")
+    digest = hashlib.sha1("&".join(parts).encode()).hexdigest()
+    return f"count:{table.__table__.name}:{digest}"
+
+
+async def estimated_count(session, table) -> int:
+    """Planner row estimate for the whole table; -1 when never analyzed."""
+    result = await session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": table.__table__.name},
+    )
+    estimate = result.scalar_one_or_none()
+    return int(estimate) if estimate is not None else -1
+
+
+async def cached_count(session, table, filters, count_query) -> int:
+    key = _count_cache_key(table, filters)
+    try:
+        cached = redis_client.get(key)
+        if cached is not None:
+            return int(cached)
+    except Exception as e:
+        print(f"Could not read cached count {key}: {e}")
+
+    total = (await session.execute(count_query)).scalar_one()
+    try:
+        redis_client.set(key, total, ex=variables.COUNT_CACHE_SECONDS)
+    except Exception as e:
+        print(f"Could not cache count {key}: {e}")
+    return total
@@ -0,0 +1,139 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+import json
+from pathlib import Path
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.metrics import metrics
+from app.helpers import variables
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|\?")
+_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_LIST = re.compile(r"(VALUES\s*\(\?\))(?:\s*,\s*\(\?\))+", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """SQL with bind parameters, IN lists and multi-row VALUES collapsed.
+
+    Two statements with the same shape differ only in their parameters, so
+    the same shape running many times in one request is an N+1 candidate.
+    """
+    shape = _PARAM.sub("?", statement)
+    shape = _PARAM_LIST.sub("(?)", shape)
+    shape = _VALUES_LIST.sub(r"\1", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+class QueryLog:
+    """Statements issued while a track_queries block is active."""
+
+    def __init__(self):
+        self.shapes: Counter = Counter()
+
+    @property
+    def count(self) -> int:
+        return sum(self.shapes.values())
+
+    def repeated(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Shapes run at least ``threshold`` times (DB_N_PLUS_ONE_THRESHOLD by default)."""
+        threshold = threshold or variables.DB_N_PLUS_ONE_THRESHOLD
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+_query_log: ContextVar[Optional[QueryLog]] = ContextVar("db_query_log", default=None)
+# ASGI scope of the request being served, for labelling statements with their endpoint.
+_request_scope: ContextVar[Optional[dict]] = ContextVar("db_request_scope", default=None)
+
+# Highest statement count seen per endpoint ("METHOD /route/{template}") in this process.
+QUERY_COUNTS: Dict[str, int] = {}
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryLog]:
+    log = QueryLog()
+    token = _query_log.set(log)
+    try:
+        yield log
+    finally:
+        _query_log.reset(token)
+
+
+def count_queries(engine: AsyncEngine):
+    """Record every statement on ``engine`` into the active QueryLog, if any."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        log = _query_log.get()
+        # Bookkeeping such as the query budget's SET LOCAL is not the endpoint's doing.
+        if log is None or (context is not None and context.execution_options.get("budget_exempt")):
+            return
+        log.shapes[statement_shape(statement)] += 1
+
+
+def endpoint_key(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}"
+
+
+def current_endpoint() -> Optional[str]:
+    scope = _request_scope.get()
+    return endpoint_key(scope) if scope is not None else None
+
+
+def write_baseline(path: Path, counts: Dict[str, int]):
+    """Merge ``counts`` into the JSON baseline at ``path`` (sorted, one endpoint per line)."""
+    baseline = json.loads(path.read_text()) if path.exists() else {}
+    baseline.update(counts)
+    path.write_text(json.dumps(dict(sorted(baseline.items())), indent=2) + "\n")
+
+
+class QueryCountMiddleware:
+    """Dev/test aid: count statements per request and warn about N+1 patterns.
+
+    Outside of remembering which endpoint is running (see current_endpoint)
+    it does nothing unless DB_QUERY_COUNTER is on. When it is, every response
+    carries an X-DB-Query-Count header, the per-endpoint maximum is kept in
+    QUERY_COUNTS, and a statement shape repeated DB_N_PLUS_ONE_THRESHOLD
+    times within one request is printed and counted as db.n_plus_one.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        scope_token = _request_scope.set(scope)
+        try:
+            if variables.DB_QUERY_COUNTER:
+                await self._counted(scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+        finally:
+            _request_scope.reset(scope_token)
+
+    async def _counted(self, scope, receive, send):
+        with track_queries() as log:
+
+            async def send_with_count(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER.lower().encode(), str(log.count).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
+
+        key = endpoint_key(scope)
+        QUERY_COUNTS[key] = max(QUERY_COUNTS.get(key, 0), log.count)
+        for shape, n in log.repeated():
+            metrics.incr("db.n_plus_one", endpoint=key)
+            print(f"Possible N+1 on {key}: {n}x {shape}")
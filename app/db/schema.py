@@ -0,0 +1,130 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Tuple
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlmodel import SQLModel
+# Register the cache-invalidation and row-counter triggers with create_all.
+import app.db.cache_bus  # noqa: F401
+import app.db.counters  # noqa: F401
+from app.helpers import variables
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+# Any constant works, it only has to be the same for every worker.
+BOOTSTRAP_LOCK_KEY = 727_001
+# The schema the old create_all startup produced. Stamping an unversioned
+# database at head instead would skip every migration after this one.
+INITIAL_REVISION = "6fa6a760f6b1"
+
+
+class SchemaVersionError(Exception):
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
+
+@lru_cache(maxsize=1)
+def expected_heads() -> Tuple[str, ...]:
+    """Alembic head revision(s) this build of the code was written against."""
+    script = ScriptDirectory.from_config(Config(str(ALEMBIC_INI)))
+    return tuple(sorted(script.get_heads()))
+
+
+async def stored_heads(conn: AsyncConnection) -> Tuple[str, ...] | None:
+    """Revision(s) recorded in alembic_version, or None when the table does not exist."""
+    found = (await conn.execute(text("SELECT to_regclass('alembic_version')"))).scalar()
+    if found is None:
+        return None
+    rows = (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalars()
+    return tuple(sorted(rows))
+
+
+async def missing_tables(conn: AsyncConnection) -> Tuple[str, ...]:
+    """Model tables that do not exist in the database, in one round trip."""
+    names = [table.name for table in SQLModel.metadata.sorted_tables]
+    rows = await conn.execute(
+        text(
+            "SELECT name FROM unnest(CAST(:names AS text[])) AS name "
+            "WHERE to_regclass(quote_ident(name)) IS NULL"
+        ),
+        {"names": names},
+    )
+    return tuple(rows.scalars())
+
+
+def _has_app_tables(sync_conn) -> bool:
+    inspector = inspect(sync_conn)
+    return any(inspector.has_table(table.name) for table in SQLModel.metadata.sorted_tables)
+
+
+async def _bootstrap(conn: AsyncConnection, heads: Tuple[str, ...]):
+    await conn.run_sync(SQLModel.metadata.create_all)
+    await conn.execute(text(
+        "CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL, "
+        "CONSTRAINT alembic_version_pkc PRIMARY KEY (version_num))"
+    ))
+    for head in heads:
+        await conn.execute(
+            text("INSERT INTO alembic_version (version_num) VALUES (:head)"), {"head": head}
+        )
+
+
+async def ensure_schema(engine: AsyncEngine):
+    """Check the database schema version against the migrations shipped with the code.
+
+    A matching alembic_version costs three small queries. An empty database is
+    created from the models and stamped at head, under an advisory lock so
+    workers booting together do not race. A database stamped at head with
+    model tables missing (``alembic upgrade head`` on an empty database: the
+    initial revision creates nothing) gets them created the same way. Anything
+    else is reported according to SCHEMA_CHECK_MODE ("fail" raises
+    SchemaVersionError, "warn" prints, "off" skips the check entirely).
+    """
+    mode = variables.SCHEMA_CHECK_MODE
+    if mode == "off":
+        return
+    heads = expected_heads()
+
+    async with engine.connect() as conn:
+        current = await stored_heads(conn)
+        missing = await missing_tables(conn) if current == heads else ()
+    if current == heads:
+        if missing:
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text("SELECT pg_advisory_xact_lock(:key)"), {"key": BOOTSTRAP_LOCK_KEY}
+                )
+                # checkfirst: only tables still missing once the lock is held are created.
+                await conn.run_sync(SQLModel.metadata.create_all)
+            print(f"Created missing tables {', '.join(missing)} at revision {', '.join(heads)}")
+        return
+
+    if current is None:
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"), {"key": BOOTSTRAP_LOCK_KEY}
+            )
+            current = await stored_heads(conn)
+            if current is None and not await conn.run_sync(_has_app_tables):
+                await _bootstrap(conn, heads)
+                print(f"Created database schema at revision {', '.join(heads)}")
+                return
+        if current == heads:
+            return
+
+    if current:
+        message = (
+            f"Database schema is at {', '.join(current)} but the code expects {', '.join(heads)}. "
+            f"Run `alembic upgrade head`."
+        )
+    else:
+        message = (
+            f"Database has an unversioned schema (created by create_all) but the code expects "
+            f"{', '.join(heads)}. Run `alembic stamp {INITIAL_REVISION} && alembic upgrade head`; "
+            f"do not stamp it at head, that skips the migrations it is missing."
+        )
+    if mode == "fail":
+        raise SchemaVersionError(message)
+    print(f"Warning: {message}")
@@ -1,17 +1,35 @@
 from functools import wraps
 import time
 import traceback
-from typing import List, Optional, Tuple
+from typing import AsyncIterator, List, Optional, Tuple
 from fastapi import Request, status
 from fastapi.encoders import jsonable_encoder
-from sqlmodel import SQLModel, Session, create_engine, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy import exists, or_, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import SQLModel, delete, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.session import redis_sessions, session_cache, signed_sessions
+from app.db.counters import table_count
+from app.db.engines import EngineRegistry, Workload, primary_only, read_only
+from app.db.instrumentation import instrument
+from app.db.loader import load_many
+from app.db.maintenance import run_maintenance
+from app.db.pagination import (
+    CountMode,
+    cached_count,
+    decode_cursor,
+    encode_cursor,
+    estimated_count,
+)
 from app.db.models.inventory import INVENTORY, InventoryTableEnum
 from app.db.models.item import ITEM, ItemTableEnum
 from app.db.models.shop import SHOP, ShopTableEnum
 from app.db.models.user import USER, USER_META, USER_SESSION, UserRole, UserTableEnum
+from app.db.schema import ensure_schema
+from app.db.table_map import TABLE_CLASS_MAP
 from app.helpers import variables
 from app.helpers.helpers import send_json_response
-from app.helpers.variables import DATABASE_URL
 
 
 class UninitializedDatabasePoolError(Exception):
@@ -23,57 +41,90 @@ class UninitializedDatabasePoolError(Exception):
         super().__init__(self.message)
 
 
+NOT_FOUND_MESSAGE = "Not found."
+NO_CHANGE_MESSAGE = "All values are the same, no update needed."
+
+
 class DataBasePool:
-    _db_pool: Session = None
-    _engine = None
+    """API-workload view of the EngineRegistry used by request handlers."""
+
+    _schema_checked = False
 
     @classmethod
     async def initDB(cls):
-        # print(f"init database............ {cls._engine}")
-        initDB(cls._engine)
+        """Verify the schema version once per process (see app/db/schema.py).
+
+        Also runs the first maintenance pass so the current month's USER_META
+        partition exists; until it does, rows go to the default partition.
+        """
+        if cls._schema_checked:
+            return
+        await ensure_schema(await cls.getEngine())
+        cls._schema_checked = True
+        try:
+            await run_maintenance()
+        except Exception as e:
+            print(f"Warning: DB maintenance failed at startup: {e}")
 
     @classmethod
-    async def getEngine(cls):
-        return cls._engine
+    async def getEngine(cls) -> AsyncEngine:
+        return EngineRegistry.get_engine(Workload.API)
 
     @classmethod
     async def setup(cls, timeout: Optional[float] = None):
-        if cls._engine != None:
-            print(f"Droping engine")
-            # cls._engine.dispose()
-            # cls._db_pool.close()
-            initDB(cls._engine)
-        else:
-            # print(f"Settingup database............")
-            cls._engine = create_engine(
-                DATABASE_URL, pool_size=20, pool_pre_ping=True, pool_recycle=60
-            )
-            initDB(cls._engine)
-            cls._timeout = timeout
-            with Session(cls._engine) as session:
-                cls._db_pool = session
-            # print(f"db setup done")
+        cls._timeout = timeout
+        await cls.initDB()
 
     @classmethod
-    async def get_pool(cls) -> Session:
-        if not cls._db_pool:
+    def session(
+        cls,
+        read_only: bool = False,
+        ryw_key: Optional[str] = None,
+        recent_write: bool = False,
+    ) -> AsyncSession:
+        """New API AsyncSession for code running outside a request (use as ``async with``)."""
+        if not EngineRegistry.is_initialized(Workload.API):
             raise UninitializedDatabasePoolError()
-        return cls._db_pool
+        return EngineRegistry.session(
+            Workload.API, read_only=read_only, ryw_key=ryw_key, recent_write=recent_write
+        )
+
+    @classmethod
+    async def get_pool(cls, request: Request) -> AsyncIterator[AsyncSession]:
+        """FastAPI dependency: one AsyncSession per request, closed afterwards."""
+        ryw_key = request.cookies.get(variables.COOKIE_KEY)
+        recent_write = await EngineRegistry.recent_write(Workload.API, ryw_key)
+        async with cls.session(ryw_key=ryw_key, recent_write=recent_write) as session:
+            yield session
+
+    @classmethod
+    async def get_read_pool(cls, request: Request) -> AsyncIterator[AsyncSession]:
+        """Like get_pool, but SELECTs are served by a replica when one is configured.
+
+        Falls back to the primary once the request writes, and for the caller's
+        own reads within READ_YOUR_WRITES_SECONDS of their last write.
+        """
+        ryw_key = request.cookies.get(variables.COOKIE_KEY)
+        recent_write = await EngineRegistry.recent_write(Workload.API, ryw_key)
+        async with cls.session(
+            read_only=True, ryw_key=ryw_key, recent_write=recent_write
+        ) as session:
+            yield session
 
     @classmethod
     async def teardown(cls):
         print(f"Closing db_pool")
-        if not cls._db_pool:
+        if not EngineRegistry.is_initialized(Workload.API):
             raise UninitializedDatabasePoolError()
-        cls._db_pool.close()
+        await EngineRegistry.dispose()
         print(f"db_pool closed")
 
 
-def initDB(_engine):
+async def initDB(_engine: AsyncEngine):
+    """Create any missing tables from the models. Startup uses ensure_schema instead."""
     try:
-        # print(f"_engine {_engine} capsonic")
-        SQLModel.metadata.create_all(_engine)
-        pass
+        async with _engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
     except:
         traceback.print_exc()
         print(f"Error in creating init tables.")
@@ -84,39 +135,92 @@ class DB:
         pass
 
     @classmethod
-    async def get_user(cls, data: int | str, db_pool: Session):
+    @instrument(UserTableEnum.USER)
+    async def get_user(cls, data: int | str, db_pool: AsyncSession):
         try:
             if isinstance(data, int):
                 statement = select(USER).where(USER.id == data)
             else:
                 statement = select(USER).where(USER.email == data)
 
-            user = db_pool.exec(statement).first()
+            user = (await db_pool.exec(statement)).first()
             return user
 
         except Exception as e:
             print(f"Exception in get_user: {str(e)}")
             traceback.print_exc()
-            db_pool.rollback()
+            await db_pool.rollback()
             return None
 
     @classmethod
+    @instrument(UserTableEnum.USER_SESSION)
+    @primary_only
     async def getUserSession(self, db_pool, session_token):
         try:
+            if variables.SESSION_BACKEND == "signed":
+                return signed_sessions.verify(session_token)
+            if variables.SESSION_BACKEND == "redis":
+                return await redis_sessions.get(session_token)
+            cached = await session_cache.get(session_token)
+            if cached is not None:
+                return cached
             statement = select(USER_SESSION).where(USER_SESSION.pk == session_token)
-            user_session = db_pool.exec(statement).first()
+            user_session = (await db_pool.exec(statement)).first()
             # print(f"user {USER_SESSION}")
             if user_session:
+                await session_cache.put(user_session)
                 return user_session
         except Exception as e:
             print(f"Exception in getUserSession: {str(e)}")
             traceback.print_exc()
-            db_pool.rollback()
+            await db_pool.rollback()
             return None
 
     @classmethod
+    @instrument(UserTableEnum.USER_SESSION)
+    async def create_session(cls, session_data: dict, db_pool):
+        """Store a new login session in the SESSION_BACKEND, returns ``(session, ok)``.
+
+        ``session.pk`` is the cookie value (a signed token replaces the
+        generated one). With the postgres backend the row is only added to
+        ``db_pool``; the caller commits it together with the rest of its writes.
+        """
+        if variables.SESSION_BACKEND in ("redis", "signed"):
+            try:
+                if variables.SESSION_BACKEND == "redis":
+                    return await redis_sessions.create(session_data), True
+                return signed_sessions.create(session_data), True
+            except Exception as e:
+                print(f"Exception in create_session: {str(e)}")
+                traceback.print_exc()
+                return None, False
+        return await cls.insert(dbClassNam=UserTableEnum.USER_SESSION, data=session_data, db_pool=db_pool)
+
+    @classmethod
+    @instrument(UserTableEnum.USER_SESSION)
+    async def revoke_session(cls, db_pool, session_token: str):
+        """End a session in the SESSION_BACKEND and drop every cached copy of it."""
+        if variables.SESSION_BACKEND in ("redis", "signed"):
+            try:
+                if variables.SESSION_BACKEND == "redis":
+                    await redis_sessions.delete(session_token)
+                else:
+                    await signed_sessions.revoke(session_token)
+                return True
+            except Exception as e:
+                print(f"Exception in revoke_session: {str(e)}")
+                traceback.print_exc()
+                return False
+        # Queued first so the NOTIFY goes out with the DELETE's commit.
+        await session_cache.publish_revocation(db_pool, session_token)
+        ok = await cls.delete_session_by_token(db_pool, session_token)
+        await session_cache.invalidate(session_token)
+        return ok
+
+    @classmethod
+    @instrument()
     async def insert(
-        self, dbClassNam: str, data: dict, db_pool: Session, commit: bool = False
+        self, dbClassNam: str, data: dict, db_pool: AsyncSession, commit: bool = False
     ):
         try:
             if dbClassNam == UserTableEnum.USER:
@@ -136,35 +240,170 @@ class DB:
 
             db_pool.add(data)
             if commit:
-                db_pool.commit()
-                db_pool.refresh(data)
+                await db_pool.commit()
+                await db_pool.refresh(data)
 
             return data, True
         except:
-            db_pool.rollback()
+            await db_pool.rollback()
             traceback.print_exc()
             return None, False
 
     @classmethod
+    def _bulk_rows(cls, table, rows: List[dict]) -> List[dict]:
+        """Fill model defaults (ids, timestamps) that only exist on the Python side.
+
+        Columns the caller left out and the model has no value for are not
+        sent at all, so server defaults (USER_META.pk, uuid_generate_v7())
+        apply instead of an explicit NULL.
+        """
+        prepared = []
+        for row in rows:
+            values = table.model_validate(row).model_dump()
+            for key in [k for k, v in values.items() if v is None and k not in row]:
+                values.pop(key)
+            prepared.append(values)
+        return prepared
+
+    @classmethod
+    async def _bulk_write(cls, table, rows, db_pool, build, returning, chunk_size):
+        columns = len(table.__table__.columns)
+        # Postgres caps a statement at 32767 bind parameters.
+        chunk_size = max(1, min(chunk_size, 32000 // columns))
+        # A multi-row VALUES needs the same columns in every row, so rows are
+        # written in groups of identical key sets (in order within a group).
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(row), []).append(row)
+        written = []
+        count = 0
+        for group in groups.values():
+            for start in range(0, len(group), chunk_size):
+                statement = build(pg_insert(table.__table__).values(group[start:start + chunk_size]))
+                if returning:
+                    statement = statement.returning(*table.__table__.columns)
+                result = await db_pool.execute(statement)
+                if returning:
+                    written.extend(table.model_validate(dict(r._mapping)) for r in result)
+                else:
+                    count += max(result.rowcount, 0)
+        return written if returning else count
+
+    @classmethod
+    @instrument()
+    async def insert_many(
+        cls,
+        dbClassNam: str,
+        rows: List[dict],
+        db_pool: AsyncSession,
+        returning: bool = False,
+        ignore_conflicts: bool = False,
+        chunk_size: int = variables.BULK_CHUNK_SIZE,
+        commit: bool = False,
+    ):
+        """Insert many rows with one multi-row INSERT per chunk.
+
+        Returns ``(inserted, ok)`` where ``inserted`` is the list of written
+        rows when ``returning`` is set, else the number of rows inserted.
+        With ``ignore_conflicts`` rows hitting a unique constraint are skipped
+        (ON CONFLICT DO NOTHING) and left out of the result.
+        """
+        try:
+            table = TABLE_CLASS_MAP.get(dbClassNam)
+            if not table:
+                return None, False
+            if not rows:
+                return ([] if returning else 0), True
+
+            def build(statement):
+                return statement.on_conflict_do_nothing() if ignore_conflicts else statement
+
+            inserted = await cls._bulk_write(
+                table, cls._bulk_rows(table, rows), db_pool, build, returning, chunk_size
+            )
+            if commit:
+                await db_pool.commit()
+            return inserted, True
+        except Exception:
+            await db_pool.rollback()
+            traceback.print_exc()
+            return None, False
+
+    @classmethod
+    @instrument()
+    async def upsert_many(
+        cls,
+        dbClassNam: str,
+        rows: List[dict],
+        db_pool: AsyncSession,
+        conflict_columns: Optional[List[str]] = None,
+        update_columns: Optional[List[str]] = None,
+        returning: bool = False,
+        chunk_size: int = variables.BULK_CHUNK_SIZE,
+        commit: bool = False,
+    ):
+        """INSERT ... ON CONFLICT DO UPDATE for many rows.
+
+        ``conflict_columns`` defaults to the primary key and must match a
+        unique index. Only ``update_columns`` (default: the keys given in the
+        first row, minus the conflict columns) are overwritten on conflict, so
+        defaults such as ``created_at`` are not reset for existing rows.
+        Returns ``(rows or count, ok)`` like insert_many.
+        """
+        try:
+            table = TABLE_CLASS_MAP.get(dbClassNam)
+            if not table:
+                return None, False
+            if not rows:
+                return ([] if returning else 0), True
+
+            conflict_columns = conflict_columns or [
+                c.key for c in table.__table__.primary_key.columns
+            ]
+            if update_columns is None:
+                update_columns = [k for k in rows[0] if k not in conflict_columns]
+
+            def build(statement):
+                if not update_columns:
+                    return statement.on_conflict_do_nothing(index_elements=conflict_columns)
+                return statement.on_conflict_do_update(
+                    index_elements=conflict_columns,
+                    set_={c: statement.excluded[c] for c in update_columns},
+                )
+
+            written = await cls._bulk_write(
+                table, cls._bulk_rows(table, rows), db_pool, build, returning, chunk_size
+            )
+            if commit:
+                await db_pool.commit()
+            return written, True
+        except Exception:
+            await db_pool.rollback()
+            traceback.print_exc()
+            return None, False
+
+    @classmethod
+    @instrument()
     async def delete(self, data, db_pool):
         try:
-            db_pool.delete(data)
+            await db_pool.delete(data)
             # db_pool.commit()
             return True
         except:
-            db_pool.rollback()
+            await db_pool.rollback()
             traceback.print_exc()
             return False
 
     @classmethod
+    @instrument(UserTableEnum.USER_SESSION)
     async def delete_session_by_token(cls, db_pool, session_token: str):
         try:
             stmt = delete(USER_SESSION).where(USER_SESSION.pk == session_token)
-            db_pool.exec(stmt)
-            db_pool.commit()
+            await db_pool.exec(stmt)
+            await db_pool.commit()
             return True
         except Exception:
-            db_pool.rollback()
+            await db_pool.rollback()
             traceback.print_exc()
             return False
 
@@ -180,8 +419,42 @@ class DB:
     #         return None
 
     @classmethod
+    @instrument()
+    async def load_one(cls, dbClassNam: str, db_pool: AsyncSession, column: str, value):
+        """Row of ``dbClassNam`` whose unique ``column`` equals ``value``, or None.
+
+        Memoized for the request and batched with the same session's
+        concurrent lookups of the same column (see app/db/loader.py); use it
+        for repeated entity lookups such as the shop / owner checks on write paths.
+        """
+        try:
+            table = TABLE_CLASS_MAP.get(dbClassNam)
+            if table is None or value is None:
+                return None
+            return (await load_many(table, column, [value], db_pool)).popitem()[1]
+        except Exception as e:
+            print(f"Exception in load_one: {str(e)}")
+            traceback.print_exc()
+            return None
+
+    @classmethod
+    @instrument()
+    async def load_many(cls, dbClassNam: str, db_pool: AsyncSession, column: str, values: List):
+        """``{value: row or None}`` for each of ``values``; see load_one."""
+        try:
+            table = TABLE_CLASS_MAP.get(dbClassNam)
+            if table is None:
+                return {}
+            return await load_many(table, column, values, db_pool)
+        except Exception as e:
+            print(f"Exception in load_many: {str(e)}")
+            traceback.print_exc()
+            return {}
+
+    @classmethod
+    @instrument()
     async def get_attr_all(
-        self, dbClassNam: str, db_pool: Session, filters: dict = None, all=True
+        self, dbClassNam: str, db_pool: AsyncSession, filters: dict = None, all=True
     ):
         try:
             models = {
@@ -210,111 +483,139 @@ class DB:
                         else:
                             statement = statement.where(column_attr == value)
             if all:
-                result = db_pool.exec(statement).all()
+                result = (await db_pool.exec(statement)).all()
             else:
-                result = db_pool.exec(statement).first()
+                result = (await db_pool.exec(statement)).first()
             return result
 
         except Exception as e:
             traceback.print_exc()
-            if isinstance(db_pool, Session):
-                db_pool.rollback()
+            if isinstance(db_pool, AsyncSession):
+                await db_pool.rollback()
             return None
 
     @classmethod
+    def _first_match(cls, table_class, conditions):
+        """Primary key of the first row matching ``conditions``, as a WHERE clause."""
+        key = list(table_class.__table__.primary_key.columns)
+        return tuple_(*key).in_(select(*key).where(*conditions).limit(1))
+
+    @classmethod
+    @instrument()
     async def update_attr_all(
-        cls, dbClassNam: str, data: dict, db_pool: Session, identifier: dict
+        cls,
+        dbClassNam: str,
+        data: dict,
+        db_pool: AsyncSession,
+        identifier: dict,
+        returning: bool = False,
     ):
+        """Single ``UPDATE ... WHERE <identifier> RETURNING *`` (then commit).
+
+        Only the first row matching ``identifier`` is updated, and it is
+        skipped in SQL when its values already equal ``data`` (IS
+        DISTINCT FROM), so a no-op update writes nothing. Returns
+        ``(message, success)``, or ``(updated_row, True)`` with ``returning``;
+        failures carry NOT_FOUND_MESSAGE / NO_CHANGE_MESSAGE.
+        """
         try:
-            table_map = {
-                ItemTableEnum.ITEM: ITEM,
-                UserTableEnum.USER: USER,
-                UserTableEnum.USER_META: USER_META,
-                UserTableEnum.USER_SESSION: USER_SESSION,
-                ShopTableEnum.SHOP: SHOP,
-                InventoryTableEnum.INVENTORY: INVENTORY,
-            }
-
-            table_class = table_map.get(dbClassNam)
+            table_class = TABLE_CLASS_MAP.get(dbClassNam)
             if not table_class:
                 message = "Invalid table class name provided."
                 return message, False
 
-            statement = select(table_class)
-            for key, value in identifier.items():
-                if hasattr(table_class, key):
-                    statement = statement.where(getattr(table_class, key) == value)
-
-            record = db_pool.exec(statement).first()
+            conditions = [
+                getattr(table_class, key) == value
+                for key, value in identifier.items()
+                if hasattr(table_class, key)
+            ]
+            if not conditions:
+                # Never let an empty identifier turn into an unfiltered UPDATE.
+                return NOT_FOUND_MESSAGE, False
+            values = {key: value for key, value in data.items() if hasattr(table_class, key)}
+            if not values:
+                return NO_CHANGE_MESSAGE, False
+
+            statement = (
+                update(table_class)
+                .where(cls._first_match(table_class, conditions))
+                .where(or_(*[getattr(table_class, key).is_distinct_from(value) for key, value in values.items()]))
+                .values(**values)
+                .returning(table_class)
+                .execution_options(synchronize_session="fetch")
+            )
+            record = (await db_pool.exec(statement)).scalars().first()
             if not record:
-                message = "Not found."
-                return message, False
-
-            # Check if all values are the same
-            all_same = True
-            for key, value in data.items():
-                if hasattr(record, key):
-                    if getattr(record, key) != value:
-                        all_same = False
-                        break
-
-            if all_same:
-                message = "All values are the same, no update needed."
-                return message, False
-
-            for key, value in data.items():
-                if hasattr(record, key):
-                    setattr(record, key, value)
+                # Only the miss path pays a second query, to tell the two cases apart.
+                found = (await db_pool.exec(select(exists().where(*conditions)))).first()
+                return (NO_CHANGE_MESSAGE if found else NOT_FOUND_MESSAGE), False
 
-            db_pool.commit()
+            await db_pool.commit()
+            if returning:
+                return record, True
             message = "Updated successfully."
             return message, True
 
         except Exception:
-            db_pool.rollback()
+            await db_pool.rollback()
             traceback.print_exc()
             message = "Error updating."
             return message, False
 
     @classmethod
-    async def delete_attr(cls, dbClassNam: str, db_pool: Session, identifier: dict):
-        try:
-            table_map = {
-                ItemTableEnum.ITEM: ITEM,
-                UserTableEnum.USER: USER,
-                UserTableEnum.USER_META: USER_META,
-                UserTableEnum.USER_SESSION: USER_SESSION,
-                ShopTableEnum.SHOP: SHOP,
-                InventoryTableEnum.INVENTORY: INVENTORY,
-            }
+    @instrument()
+    async def delete_attr(
+        cls,
+        dbClassNam: str,
+        db_pool: AsyncSession,
+        identifier: dict,
+        returning: bool = False,
+    ):
+        """Single ``DELETE ... WHERE <identifier> RETURNING *`` (then commit).
 
-            table_class = table_map.get(dbClassNam)
+        Like before, only the first row matching ``identifier`` is deleted.
+        Returns ``(message, success)``, or ``(deleted_row, True)`` with
+        ``returning``; deleting nothing fails with NOT_FOUND_MESSAGE.
+        """
+        try:
+            table_class = TABLE_CLASS_MAP.get(dbClassNam)
             if not table_class:
                 message = "Invalid table class name provided."
                 return message, False
 
-            statement = select(table_class)
-            for key, value in identifier.items():
-                if hasattr(table_class, key):
-                    statement = statement.where(getattr(table_class, key) == value)
-
-            record = db_pool.exec(statement).first()
+            conditions = [
+                getattr(table_class, key) == value
+                for key, value in identifier.items()
+                if hasattr(table_class, key)
+            ]
+            if not conditions:
+                return NOT_FOUND_MESSAGE, False
+
+            statement = (
+                delete(table_class)
+                .where(cls._first_match(table_class, conditions))
+                .returning(table_class)
+                .execution_options(synchronize_session="fetch")
+            )
+            record = (await db_pool.exec(statement)).scalars().first()
             if not record:
-                message = "Not found."
-                return message, False
+                return NOT_FOUND_MESSAGE, False
 
-            db_pool.delete(record)
-            db_pool.commit()
+            await db_pool.commit()
+            if returning:
+                return record, True
             message = "Deleted successfully."
             return message, True
 
         except Exception:
-            db_pool.rollback()
+            await db_pool.rollback()
             traceback.print_exc()
             message = "Error deleting."
             return message, False
 
     @classmethod
+    @instrument()
+    @read_only
     async def get_attr_all_paginated(
         cls,
         dbClassNam,
@@ -323,7 +624,24 @@ class DB:
         limit: int = 20,
         filters: Optional[List] = None,
         order_by: Optional[List] = None,
-    ) -> Tuple[List[dict], int]:
+        cursor: Optional[str] = None,
+        keyset: bool = False,
+        count: CountMode = CountMode.EXACT,
+    ) -> Tuple[List[dict], Optional[int], Optional[str]]:
+        """Page through a table, returning ``(rows, total, next_cursor)``.
+
+        Offset mode (default) uses ``offset``/``limit``/``order_by``. Keyset
+        mode (``keyset=True`` or a ``cursor``) orders on the primary key and
+        continues after ``cursor``, so every page costs the same as the first;
+        ``next_cursor`` is None on the last page. ``count`` picks how ``total``
+        is computed (see CountMode); it is None for CountMode.NONE. Unfiltered
+        totals of tables in COUNTED_TABLES come from their row counter.
+        """
+        if cursor is not None:
+            keyset = True
+        key_columns = list(dbClassNam.__table__.primary_key.columns)
+        # Raises InvalidCursorError for the caller to turn into a 400.
+        after = decode_cursor(cursor, key_columns) if cursor else None
         try:
             session = db_pool
             query = select(dbClassNam)
@@ -334,21 +652,43 @@ class DB:
                     query = query.where(f)
                     count_query = count_query.where(f)
 
-            if order_by:
-                query = query.order_by(*order_by)
+            if keyset:
+                if after is not None:
+                    query = query.where(tuple_(*key_columns) > tuple_(*after))
+                query = query.order_by(*key_columns).limit(limit + 1)
+            else:
+                if order_by:
+                    query = query.order_by(*order_by)
+                query = query.offset(offset).limit(limit)
 
-            query = query.offset(offset).limit(limit)
-            result = session.execute(query)
+            result = await session.execute(query)
             rows = result.scalars().all()
 
-            count_result = session.execute(count_query)
-            total_count = count_result.scalar_one()
-
-            return [jsonable_encoder(row) for row in rows], total_count
+            next_cursor = None
+            if keyset and len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                next_cursor = encode_cursor([getattr(last, c.key) for c in key_columns])
+
+            count = CountMode(count)
+            total_count = None
+            if count != CountMode.NONE and not filters:
+                # Exact and O(1) for tables with a row counter, whatever the mode.
+                total_count = await table_count(session, dbClassNam)
+            if total_count is None:
+                if count == CountMode.EXACT:
+                    total_count = (await session.execute(count_query)).scalar_one()
+                elif count == CountMode.ESTIMATE and not filters:
+                    total_count = await estimated_count(session, dbClassNam)
+                if (count == CountMode.CACHED
+                        or (count == CountMode.ESTIMATE and (total_count is None or total_count < 0))):
+                    total_count = await cached_count(session, dbClassNam, filters, count_query)
+
+            return [jsonable_encoder(row) for row in rows], total_count, next_cursor
         except Exception as e:
             print("Exception in get_attr_all_paginated:", str(e))
             traceback.print_exc()
-            return [], 0
+            return [], 0, None
 
 
 # def authentication_required(func):
@@ -389,7 +729,7 @@ def authentication_required(allowed_roles: List[UserRole]):
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            db_pool: Optional[Session] = kwargs.get("db_pool", None)
+            db_pool: Optional[AsyncSession] = kwargs.get("db_pool", None)
             request: Request = kwargs.get("request")
             try:
                 if not request:
@@ -419,14 +759,8 @@ def authentication_required(allowed_roles: List[UserRole]):
                             body={},
                         )
 
+                    # Reject only: the session sweeper (app/db/maintenance.py) deletes expired rows.
                     if int(time.time()) > user_session.expired_at:
-                        from sqlalchemy import delete
-
-                        statement = delete(USER_SESSION).where(
-                            USER_SESSION.pk == session_token
-                        )
-                        db_pool.exec(statement)
-                        db_pool.commit()
                         return send_json_response(
                             message="Session expired. Please login again.",
                             status=status.HTTP_401_UNAUTHORIZED,
@@ -468,7 +802,7 @@ def authentication_required(allowed_roles: List[UserRole]):
             except Exception as e:
                 # print("Exception caught at authentication wrapper: ", str(e))
                 if db_pool:
-                    db_pool.rollback()
+                    await db_pool.rollback()
                 traceback.print_exc()
                 return send_json_response(
                     message="Error during authentication.",
@@ -486,7 +820,7 @@ def ADMIN_AUTHENTICATION_ONLY(func):
     @wraps(func)
     async def wrapper(*args, **kwargs):
         try:
-            db_pool: Optional[Session] = kwargs.get("db_pool", None)
+            db_pool: Optional[AsyncSession] = kwargs.get("db_pool", None)
             request: Request = kwargs.get("request")
             if not request:
                 return send_json_response(
@@ -514,11 +848,6 @@ def ADMIN_AUTHENTICATION_ONLY(func):
                         body={},
                     )
                 if int(time.time()) > user_session.expired_at:
-                    statement = delete(USER_SESSION).where(
-                        USER_SESSION.pk == session_token
-                    )
-                    db_pool.exec(statement)
-                    db_pool.commit()
                     return send_json_response(
                         message="Session expired. Please login again.",
                         status=status.HTTP_401_UNAUTHORIZED,
@@ -534,7 +863,7 @@ def ADMIN_AUTHENTICATION_ONLY(func):
         except Exception as e:
             print("Exception caught at admin authentication wrapper: ", str(e))
             if db_pool:
-                db_pool.rollback()
+                await db_pool.rollback()
             traceback.print_exc()
             return send_json_response(
                 message="Error during authentication.",
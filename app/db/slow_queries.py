@@ -0,0 +1,198 @@
+import asyncio
+from collections import OrderedDict
+import contextvars
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import List, Optional
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.metrics import metrics
+from app.db.instrumentation import current_tag
+from app.db.query_counter import current_endpoint, statement_shape
+from app.helpers import variables
+
+# Execution option that keeps a statement (the EXPLAIN itself) out of the log.
+EXEMPT = "slow_log_exempt"
+
+
+def fingerprint(shape: str) -> str:
+    return hashlib.sha1(shape.encode()).hexdigest()[:16]
+
+
+def bind_shape(parameters, executemany: bool) -> str:
+    """Parameter types without their values, e.g. ``(UUID, str, int)``."""
+    if executemany and parameters:
+        return f"{len(parameters)} x {bind_shape(parameters[0], False)}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+class SlowQueryLog:
+    """Statements over DB_SLOW_QUERY_MS, one entry per statement shape.
+
+    Each entry keeps the normalized SQL, the bind types, the endpoints and DB
+    methods it was issued from, timings and (when sampled) an
+    ``EXPLAIN (ANALYZE, BUFFERS)`` plan. The oldest shapes are dropped past
+    DB_SLOW_QUERY_MAX_ENTRIES.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+
+    def record(self, shape: str, binds: str, seconds: float) -> dict:
+        key = fingerprint(shape)
+        method, table = current_tag()
+        endpoint = current_endpoint() or "background"
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                entry = {
+                    "fingerprint": key,
+                    "sql": shape,
+                    "bind_shape": binds,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "endpoints": {},
+                    "methods": {},
+                    "plan": None,
+                    "plan_captured_at": None,
+                }
+            ms = seconds * 1000
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["last_seen"] = int(time.time())
+            entry["endpoints"][endpoint] = entry["endpoints"].get(endpoint, 0) + 1
+            caller = f"{method}:{table}"
+            entry["methods"][caller] = entry["methods"].get(caller, 0) + 1
+            self._entries[key] = entry
+            while len(self._entries) > variables.DB_SLOW_QUERY_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+            return entry
+
+    def set_plan(self, key: str, plan):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["plan"] = plan
+                entry["plan_captured_at"] = int(time.time()) if plan is not None else None
+
+    def snapshot(self) -> List[dict]:
+        """Entries, slowest total time first."""
+        with self._lock:
+            entries = [
+                {**e, "endpoints": dict(e["endpoints"]), "methods": dict(e["methods"])}
+                for e in self._entries.values()
+            ]
+        for e in entries:
+            e["avg_ms"] = round(e["total_ms"] / e["count"], 3)
+            e["total_ms"] = round(e["total_ms"], 3)
+            e["max_ms"] = round(e["max_ms"], 3)
+        return sorted(entries, key=lambda e: e["total_ms"], reverse=True)
+
+    def get(self, key: str) -> Optional[dict]:
+        return next((e for e in self.snapshot() if e["fingerprint"] == key), None)
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_queries = SlowQueryLog()
+# Keeps EXPLAIN tasks referenced until they finish.
+_explain_tasks = set()
+
+
+async def _capture_plan(key: str, statement: str, parameters):
+    # Imported here: app.db.engines registers this module's listeners.
+    from app.db.engines import EngineRegistry, Workload
+
+    try:
+        engine = EngineRegistry.get_engine(Workload.ADMIN)
+        async with engine.connect() as conn:
+            await conn.execute(
+                text(f"SET LOCAL statement_timeout = {int(variables.DB_SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}"),
+                execution_options={EXEMPT: True},
+            )
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}",
+                tuple(parameters) if isinstance(parameters, list) else parameters,
+                execution_options={EXEMPT: True},
+            )
+            plan = result.scalar()
+            # ANALYZE runs the statement; roll back so nothing it did sticks.
+            await conn.rollback()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        slow_queries.set_plan(key, plan[0] if isinstance(plan, list) else plan)
+    except Exception as e:
+        print(f"Could not capture plan for slow query {key}: {e}")
+        # Let a later occurrence try again.
+        slow_queries.set_plan(key, None)
+
+
+def _schedule_explain(key: str, statement: str, parameters):
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    # A fresh context: the plan capture must not count against the request's
+    # query budget or query log, nor see its route.
+    task = loop.create_task(
+        _capture_plan(key, statement, parameters), context=contextvars.Context()
+    )
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+
+
+def log_slow_queries(engine: AsyncEngine):
+    """Record statements on ``engine`` slower than DB_SLOW_QUERY_MS."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_log_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _check(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("slow_log_started_at")
+        if not started:
+            return
+        seconds = time.perf_counter() - started.pop()
+        threshold = variables.DB_SLOW_QUERY_MS
+        if not threshold or seconds * 1000 < threshold:
+            return
+        if context is not None and context.execution_options.get(EXEMPT):
+            return
+
+        shape = statement_shape(statement)
+        entry = slow_queries.record(shape, bind_shape(parameters, executemany), seconds)
+        metrics.incr("db.slow_query", method=current_tag()[0])
+        print(f"Slow query ({seconds * 1000:.0f} ms) [{entry['fingerprint']}]: {shape}")
+
+        # EXPLAIN ANALYZE executes the statement again, so only plain SELECTs
+        # qualify, and each shape is explained once.
+        if (
+            entry["plan"] is None
+            and not executemany
+            and shape.lstrip("( ").upper().startswith("SELECT")
+            and "FOR UPDATE" not in shape.upper()
+            and random.random() < variables.DB_SLOW_QUERY_EXPLAIN_SAMPLE
+        ):
+            entry["plan"] = "pending"
+            _schedule_explain(entry["fingerprint"], statement, parameters)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(exception_context):
+        conn = exception_context.connection
+        started = conn.info.get("slow_log_started_at") if conn is not None else None
+        if started:
+            started.pop()
@@ -1,6 +1,16 @@
+from app.db.models.counter import ROW_COUNTER, CounterTableEnum
+from app.db.models.inventory import INVENTORY, InventoryTableEnum
 from app.db.models.item import ITEM, ItemTableEnum
+from app.db.models.shop import SHOP, ShopTableEnum
+from app.db.models.user import USER, USER_META, USER_SESSION, UserTableEnum
 
 
 TABLE_CLASS_MAP = {
-    ItemTableEnum.ITEM: ITEM
+    ItemTableEnum.ITEM: ITEM,
+    UserTableEnum.USER: USER,
+    UserTableEnum.USER_META: USER_META,
+    UserTableEnum.USER_SESSION: USER_SESSION,
+    ShopTableEnum.SHOP: SHOP,
+    InventoryTableEnum.INVENTORY: INVENTORY,
+    CounterTableEnum.ROW_COUNTER: ROW_COUNTER,
 }
@@ -1,11 +1,13 @@
 from typing import List, Dict, Any
 import random
-import uuid
 import time
-from sqlmodel import Session, select
-from app.db.models.shop import SHOP
-from app.db.models.item import ITEM
-from app.db.models.user import USER, UserRole
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.models.shop import ShopTableEnum
+from app.db.models.item import ItemTableEnum
+from app.db.models.user import USER, UserRole, UserTableEnum
+from app.db.session import DB
+from app.helpers.ids import uuid7
 from app.helpers.loginHelper import security
 
 # --- Comprehensive India Data ---
@@ -178,11 +180,23 @@ def generate_random_coordinate_near_city(lat, lon, radius_km=10):
     new_lon = lon + random.uniform(-offset, offset)
     return new_lat, new_lon
 
-def generate_fake_data(db: Session, shops_count: int = 200, items_per_shop: int = 10):
+def _pick_item_templates(category_items, items_per_shop: int):
+    """Distinct item names for one shop; numbered variants once templates run out."""
+    picked = random.sample(category_items, min(items_per_shop, len(category_items)))
+    variant = 2
+    while len(picked) < items_per_shop:
+        for name, base_price, desc in category_items:
+            if len(picked) >= items_per_shop:
+                break
+            picked.append((f"{name} (Variant {variant})", base_price, desc))
+        variant += 1
+    return picked
+
+async def generate_fake_data(db: AsyncSession, shops_count: int = 200, items_per_shop: int = 10):
     print(f"Starting massive fake data generation: Target {shops_count} shops...")
     
-    generated_shops = []
-    generated_items = []
+    shop_rows = []
+    item_rows = []
     
     # Flatten city list to pick randomly
     all_cities: List[Dict[str, Any]] = []
@@ -191,30 +205,27 @@ def generate_fake_data(db: Session, shops_count: int = 200, items_per_shop: int
             all_cities.append({"city": city_name, "state": state, "coords": coords})
             
     # Create a few vendor users to own these shops
-    vendors = []
-    for i in range(10): # Create 10 dummy vendors
-        vendor_id = uuid.uuid4()
-        vendor_email = f"vendor_bulk_{i}_{int(time.time())}@nearbuy.com"
-        vendor_user = USER(
-            id=vendor_id,
-            email=vendor_email,
-            password=security().hash_password("Vendor@123"),
-            fullName=f"Vendor {i+1}",
-            role=UserRole.VENDOR
-        )
-        # Check if exists first to avoid dupes if run multiple times
-        existing = db.exec(select(USER).where(USER.email == vendor_email)).first()
-        if not existing:
-            db.add(vendor_user)
-            vendors.append(vendor_user)
-        else:
-            vendors.append(existing)
-    
-    db.commit() # Commit vendors first
-    
-    shops_created = 0
+    # Every vendor shares the same password, so hash it once.
+    vendor_password = security().hash_password("Vendor@123")
+    vendor_rows = [
+        {
+            "id": uuid7(),
+            "email": f"vendor_bulk_{i}_{int(time.time())}@nearbuy.com",
+            "password": vendor_password,
+            "fullName": f"Vendor {i+1}",
+            "role": UserRole.VENDOR,
+        }
+        for i in range(10)  # Create 10 dummy vendors
+    ]
+    # Skip emails that already exist if run multiple times within the same second
+    _, ok = await DB.insert_many(dbClassNam=UserTableEnum.USER, rows=vendor_rows, db_pool=db, ignore_conflicts=True)
+    if not ok:
+        print("Could not create vendors, aborting fake data generation.")
+        return 0, 0
+    emails = [row["email"] for row in vendor_rows]
+    vendors = (await db.exec(select(USER).where(USER.email.in_(emails)))).all()
     
-    while shops_created < shops_count:
+    while len(shop_rows) < shops_count:
         # Pick a random city
         city_data = random.choice(all_cities)
         city_name = city_data["city"] 
@@ -232,24 +243,20 @@ def generate_fake_data(db: Session, shops_count: int = 200, items_per_shop: int
         lat, lon = generate_random_coordinate_near_city(base_lat, base_lon)
         
         owner = random.choice(vendors)
-        shop_id = uuid.uuid4()
+        shop_id = uuid7()
         
-        shop = SHOP(
-            shop_id=shop_id,
-            owner_id=owner.id,
-            fullName=owner.fullName,
-            shopName=shop_name,
-            address=f"{random.randint(1, 100)}, {brand_name} Street, {city_name}, {state_name}",
-            contact=f"+91-{random.randint(6000000000, 9999999999)}",
-            description=f"Authorized {brand_name} store in {city_name}. Best deals on {category}.",
-            is_open=True,
-            latitude=lat,
-            longitude=lon
-        )
-        db.add(shop)
-        db.commit() # Commit shop to ensure ID exists for items
-        generated_shops.append(shop)
-        shops_created += 1
+        shop_rows.append({
+            "shop_id": shop_id,
+            "owner_id": owner.id,
+            "fullName": owner.fullName,
+            "shopName": shop_name,
+            "address": f"{random.randint(1, 100)}, {brand_name} Street, {city_name}, {state_name}",
+            "contact": f"+91-{random.randint(6000000000, 9999999999)}",
+            "description": f"Authorized {brand_name} store in {city_name}. Best deals on {category}.",
+            "is_open": True,
+            "latitude": lat,
+            "longitude": lon,
+        })
         
         # Generate items for this shop
         # Ensure we have items for this category
@@ -258,30 +265,30 @@ def generate_fake_data(db: Session, shops_count: int = 200, items_per_shop: int
             # Fallback
             category_items = ITEM_TEMPLATES["Grocery"]
             
-        # Pick random items from the category
-        # If items_per_shop is larger than available templates, we might duplicate with slight price diff
-        for _ in range(items_per_shop):
-            item_template = random.choice(category_items)
-            name, base_price, desc = item_template
-            
+        for name, base_price, desc in _pick_item_templates(category_items, items_per_shop):
             # Vary price slightly
             price = base_price * random.uniform(0.9, 1.1)
             
-            item = ITEM(
-                id=uuid.uuid4(),
-                shop_id=shop_id,
-                itemName=name,
-                price=round(price, 2),
-                description=desc,
-                note=f"Category: {category}"
-            )
-            db.add(item)
-            generated_items.append(item)
+            item_rows.append({
+                "id": uuid7(),
+                "shop_id": shop_id,
+                "itemName": name,
+                "price": round(price, 2),
+                "description": desc,
+                "note": f"Category: {category}",
+            })
             
-        # Commit in batches of 50 shops to avoid massive transaction
-        if shops_created % 50 == 0:
-            print(f"  ...Created {shops_created} shops so far.")
+        if len(shop_rows) % 50 == 0:
+            print(f"  ...Prepared {len(shop_rows)} shops so far.")
+
+    # Shops before items so the shop_id foreign keys resolve; one transaction overall.
+    shops_written, ok = await DB.insert_many(dbClassNam=ShopTableEnum.SHOP, rows=shop_rows, db_pool=db)
+    if ok:
+        items_written, ok = await DB.insert_many(dbClassNam=ItemTableEnum.ITEM, rows=item_rows, db_pool=db)
+    if not ok:
+        print("Fake data generation failed, nothing was written.")
+        return 0, 0
 
-    db.commit()
-    print(f"Successfully generated {len(generated_shops)} shops and {len(generated_items)} items across India.")
-    return len(generated_shops), len(generated_items)
+    await db.commit()
+    print(f"Successfully generated {shops_written} shops and {items_written} items across India.")
+    return shops_written, items_written
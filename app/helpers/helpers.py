@@ -1,10 +1,9 @@
+from functools import cached_property, lru_cache
 import logging
 import secrets
 import uuid
 from fastapi import Request
-from pydantic import BaseModel
-from typing import Any, Dict, Optional
-import http.cookies
+from typing import Any, Dict, Optional, Tuple
 from ua_parser import user_agent_parser
 from fastapi.responses import JSONResponse
 from typing import Any, Dict
@@ -13,14 +12,49 @@ from app.helpers import variables
 
 
 
-class ApiReqData(BaseModel):
-    ip: Optional[str]
-    country: Optional[str]
-    origin: Optional[str]
-    referer: Optional[str]
-    browser: Optional[str]
-    os: Optional[str]
-    sessionID: Optional[str]
+class ApiReqData:
+    """Request metadata, each field read from the request on first access.
+
+    Endpoints that only need the object (or a header or two) never pay for
+    User-Agent parsing; browser and os are parsed together, once, on demand.
+    """
+
+    def __init__(self, request: Request):
+        self._request = request
+
+    @cached_property
+    def ip(self) -> Optional[str]:
+        headers = self._request.headers
+        return headers.get("cf-connecting-ip") or headers.get("x-real-ip")
+
+    @cached_property
+    def country(self) -> Optional[str]:
+        return self._request.headers.get("cf-ipcountry", "")
+
+    @cached_property
+    def origin(self) -> Optional[str]:
+        return self._request.headers.get("origin")
+
+    @cached_property
+    def referer(self) -> Optional[str]:
+        return self._request.headers.get("referer")
+
+    @cached_property
+    def _user_agent(self) -> Tuple[str, str]:
+        return get_user_agent_details(self._request.headers.get("user-agent") or "")
+
+    @property
+    def browser(self) -> Optional[str]:
+        return self._user_agent[0]
+
+    @property
+    def os(self) -> Optional[str]:
+        return self._user_agent[1]
+
+    @cached_property
+    def sessionID(self) -> Optional[str]:
+        # Starlette parses the cookie header once per request and keeps the result.
+        return self._request.cookies.get(variables.COOKIE_KEY)
 
 
 def generate_secure_random_number():
@@ -29,6 +63,7 @@ def generate_secure_random_number():
     return randNum
 
 
+@lru_cache(maxsize=variables.USER_AGENT_CACHE_SIZE)
 def get_user_agent_details(user_agent):
     parsed_data = user_agent_parser.Parse(user_agent)
     browser_name = parsed_data["user_agent"]["family"]
@@ -41,36 +76,7 @@ def get_user_agent_details(user_agent):
 
 
 async def get_fastApi_req_data(request: Request) -> ApiReqData:
-    headers = request.headers
-    # ip = request.client.host
-    # print(f"HEADERS :: {headers}")
-    # print(f"IP :: {headers}")
-    cfip = headers.get("cf-connecting-ip", "")
-    ip = headers.get("x-real-ip")
-    country = headers.get("cf-ipcountry", "")
-    origin = headers.get("origin")
-    referer = headers.get("referer")
-    ua = get_user_agent_details(headers.get("user-agent"))
-    cookie = headers.get("cookie")
-    sessionID = None
-
-    if cookie:
-        cookie_dict = http.cookies.SimpleCookie(cookie)
-        sessionID = (
-            cookie_dict.get(variables.COOKIE_KEY).value
-            if variables.COOKIE_KEY in cookie_dict
-            else None
-        )
-
-    return ApiReqData(
-        ip=cfip or ip,
-        country=country,
-        origin=origin,
-        referer=referer,
-        browser=ua[0],
-        os=ua[1],
-        sessionID=sessionID,
-    )
+    return ApiReqData(request)
 
 
 def send_json_response(
@@ -1,19 +1,74 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import traceback
 from argon2 import PasswordHasher
 import re, time
 import pyotp, pyqrcode
+from app.core.metrics import metrics
+from app.helpers import variables
+
+# One hasher for the process, built from the configured cost parameters.
+# Hashes made with other parameters still verify (they are encoded in the hash).
+password_hasher = PasswordHasher(
+    time_cost=variables.ARGON2_TIME_COST,
+    memory_cost=variables.ARGON2_MEMORY_COST_KIB,
+    parallelism=variables.ARGON2_PARALLELISM,
+)
+# argon2-cffi releases the GIL while hashing, so threads run hashes in parallel
+# and the event loop keeps serving requests. Each running hash holds
+# ARGON2_MEMORY_COST_KIB of memory; the worker count bounds the total.
+_hash_pool = ThreadPoolExecutor(
+    max_workers=variables.PASSWORD_HASH_WORKERS, thread_name_prefix="argon2"
+)
+_in_flight = 0
+
+
+def _report_in_flight():
+    metrics.set_gauge("password_hash.in_flight", _in_flight)
+    metrics.set_gauge(
+        "password_hash.queue_depth", max(0, _in_flight - variables.PASSWORD_HASH_WORKERS)
+    )
+
+
+async def run_in_hash_pool(op: str, fn, *args):
+    """Run ``fn(*args)`` on the Argon2 pool, timing queue wait and run time per ``op``."""
+    global _in_flight
+    queued_at = time.perf_counter()
+
+    def timed():
+        started = time.perf_counter()
+        metrics.observe("password_hash.wait", started - queued_at, op=op)
+        try:
+            return fn(*args)
+        finally:
+            metrics.observe("password_hash.run", time.perf_counter() - started, op=op)
+
+    _in_flight += 1
+    _report_in_flight()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, timed)
+    finally:
+        _in_flight -= 1
+        _report_in_flight()
 
 
 class security:
     def hash_password(self, password):
-        return PasswordHasher().hash(password)
+        return password_hasher.hash(password)
 
     def verify_password(self, hash_password, password):
         try:
-            return PasswordHasher().verify(hash_password, password)
+            return password_hasher.verify(hash_password, password)
         except:
             return False
 
+    # Request handlers use these: the blocking versions above stall the event loop.
+    async def hash_password_async(self, password):
+        return await run_in_hash_pool("hash", self.hash_password, password)
+
+    async def verify_password_async(self, hash_password, password):
+        return await run_in_hash_pool("verify", self.verify_password, hash_password, password)
+
     def is_password_strong(self, password):
         errors = set()
         if len(password) < 8:
@@ -1,3 +1,4 @@
+import os
 from os import getenv
 from typing import Literal
 from dotenv import load_dotenv
@@ -15,6 +16,91 @@ TYPESENSE_API_KEY = getenv("TYPESENSE_API_KEY")
 REDIS_HOST = getenv("REDIS_HOST")
 REDIS_PORT = int(getenv("REDIS_PORT", "6379"))
 
+# Connection pool sizing per workload class (see app/db/engines.py).
+DB_API_POOL_SIZE = int(getenv("DB_API_POOL_SIZE", "20"))
+DB_API_MAX_OVERFLOW = int(getenv("DB_API_MAX_OVERFLOW", "10"))
+DB_SYNC_POOL_SIZE = int(getenv("DB_SYNC_POOL_SIZE", "2"))
+DB_SYNC_MAX_OVERFLOW = int(getenv("DB_SYNC_MAX_OVERFLOW", "0"))
+DB_ADMIN_POOL_SIZE = int(getenv("DB_ADMIN_POOL_SIZE", "2"))
+DB_ADMIN_MAX_OVERFLOW = int(getenv("DB_ADMIN_MAX_OVERFLOW", "1"))
+DB_POOL_RECYCLE = int(getenv("DB_POOL_RECYCLE", "60"))
+DB_POOL_TIMEOUT = int(getenv("DB_POOL_TIMEOUT", "30"))
+
+# Read replicas (comma separated URLs). Empty means every query hits the primary.
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+# After a user's own write, keep their reads on the primary for this many seconds (0 = off).
+READ_YOUR_WRITES_SECONDS = int(getenv("READ_YOUR_WRITES_SECONDS", "0"))
+# How long a cached COUNT(*) for paginated listings stays valid.
+COUNT_CACHE_SECONDS = int(getenv("COUNT_CACHE_SECONDS", "60"))
+# Rows per INSERT statement in DB.insert_many / DB.upsert_many.
+BULK_CHUNK_SIZE = int(getenv("BULK_CHUNK_SIZE", "1000"))
+# Hash partitions for item and inventory on shop_id (0 = plain tables). Read by the
+# models and the 5b7d2f9a0c41 migration; changing it needs that migration re-run.
+SHOP_HASH_PARTITIONS = int(getenv("SHOP_HASH_PARTITIONS", "0"))
+# statement_timeout (ms) for every API-pool connection (0 = server default).
+DB_STATEMENT_TIMEOUT_MS = int(getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+# Defaults for routes decorated with query_budget (app/db/budget.py); 0 disables a limit.
+DB_BUDGET_STATEMENT_TIMEOUT_MS = int(getenv("DB_BUDGET_STATEMENT_TIMEOUT_MS", "2000"))
+DB_BUDGET_MAX_QUERIES = int(getenv("DB_BUDGET_MAX_QUERIES", "50"))
+DB_BUDGET_MAX_SECONDS = float(getenv("DB_BUDGET_MAX_SECONDS", "5"))
+# Dev/test: count statements per request (X-DB-Query-Count header) and flag
+# statement shapes repeated this many times in one request as likely N+1s.
+DB_QUERY_COUNTER = getenv("DB_QUERY_COUNTER", "false").lower() == "true"
+DB_N_PLUS_ONE_THRESHOLD = int(getenv("DB_N_PLUS_ONE_THRESHOLD", "3"))
+# Statements slower than this (ms) go to the slow-query log (0 = off).
+DB_SLOW_QUERY_MS = int(getenv("DB_SLOW_QUERY_MS", "500"))
+# Fraction of new slow SELECT shapes whose plan is captured with EXPLAIN ANALYZE.
+DB_SLOW_QUERY_EXPLAIN_SAMPLE = float(getenv("DB_SLOW_QUERY_EXPLAIN_SAMPLE", "0.1"))
+DB_SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(getenv("DB_SLOW_QUERY_EXPLAIN_TIMEOUT_MS", "10000"))
+DB_SLOW_QUERY_MAX_ENTRIES = int(getenv("DB_SLOW_QUERY_MAX_ENTRIES", "200"))
+# Background maintenance (app/db/maintenance.py): partition upkeep and retention.
+DB_MAINTENANCE_INTERVAL_SECONDS = int(getenv("DB_MAINTENANCE_INTERVAL_SECONDS", "3600"))
+USER_META_PARTITIONS_AHEAD = int(getenv("USER_META_PARTITIONS_AHEAD", "3"))
+# Monthly USER_META partitions older than this are dropped. Off by default (0 keeps
+# them all): dropping audit history is something to opt into.
+USER_META_RETENTION_MONTHS = int(getenv("USER_META_RETENTION_MONTHS", "0"))
+# Where login sessions live: "postgres" (USER_SESSION table, cached below),
+# "redis" (hashes that expire with the session) or "signed" (HMAC-signed tokens
+# checked without I/O, revocations in Redis). Only postgres uses USER_SESSION.
+SESSION_BACKEND = getenv("SESSION_BACKEND", "postgres").lower()
+if SESSION_BACKEND not in ("postgres", "redis", "signed"):
+    raise ValueError(f"SESSION_BACKEND must be postgres, redis or signed, not {SESSION_BACKEND!r}")
+# Comma separated secrets for signed tokens; the first signs, all verify (rotation).
+SESSION_SIGNING_KEYS = [k.strip() for k in getenv("SESSION_SIGNING_KEYS", "").split(",") if k.strip()]
+if SESSION_BACKEND == "signed" and not SESSION_SIGNING_KEYS:
+    raise ValueError("SESSION_SIGNING_KEYS is required when SESSION_BACKEND=signed")
+# How stale a worker's copy of the signed-token revocation list may get.
+SESSION_REVOCATION_REFRESH_SECONDS = float(getenv("SESSION_REVOCATION_REFRESH_SECONDS", "2"))
+# Argon2id cost for new password hashes (argon2-cffi defaults) and the number of
+# threads hashing off the event loop (0 = one per CPU).
+ARGON2_TIME_COST = int(getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST_KIB = int(getenv("ARGON2_MEMORY_COST_KIB", "65536"))
+ARGON2_PARALLELISM = int(getenv("ARGON2_PARALLELISM", "4"))
+PASSWORD_HASH_WORKERS = int(getenv("PASSWORD_HASH_WORKERS", "0")) or (os.cpu_count() or 1)
+# Expired USER_SESSION rows are deleted in the background this often, this many per transaction.
+SESSION_SWEEP_INTERVAL_SECONDS = int(getenv("SESSION_SWEEP_INTERVAL_SECONDS", "300"))
+SESSION_SWEEP_BATCH_SIZE = int(getenv("SESSION_SWEEP_BATCH_SIZE", "1000"))
+# USER_META audit rows are buffered in memory (app/db/audit.py) and written every
+# AUDIT_FLUSH_INTERVAL_MS or AUDIT_BATCH_SIZE rows; past AUDIT_QUEUE_SIZE they are dropped.
+AUDIT_FLUSH_INTERVAL_MS = int(getenv("AUDIT_FLUSH_INTERVAL_MS", "200"))
+AUDIT_BATCH_SIZE = int(getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_QUEUE_SIZE = int(getenv("AUDIT_QUEUE_SIZE", "10000"))
+# Writes a row gets before it is logged and dropped (audit.dead_lettered).
+AUDIT_MAX_ATTEMPTS = max(1, int(getenv("AUDIT_MAX_ATTEMPTS", "5")))
+# Write out the buffer on graceful shutdown.
+AUDIT_FLUSH_ON_SHUTDOWN = getenv("AUDIT_FLUSH_ON_SHUTDOWN", "true").lower() == "true"
+# Distinct User-Agent strings whose parsed browser/OS are kept per worker.
+USER_AGENT_CACHE_SIZE = int(getenv("USER_AGENT_CACHE_SIZE", "1024"))
+
+# Session cache in front of USER_SESSION (app/core/session.py): Redis entries live
+# this many seconds (capped by the session's expiry, 0 disables the cache), and
+# each worker keeps up to SESSION_CACHE_LOCAL_SIZE of them for LOCAL_TTL seconds.
+SESSION_CACHE_TTL_SECONDS = int(getenv("SESSION_CACHE_TTL_SECONDS", "300"))
+SESSION_CACHE_LOCAL_TTL_SECONDS = float(getenv("SESSION_CACHE_LOCAL_TTL_SECONDS", "30"))
+SESSION_CACHE_LOCAL_SIZE = int(getenv("SESSION_CACHE_LOCAL_SIZE", "10000"))
+
 # Production environment detection
 # Set IS_PRODUCTION=true in your production environment variables
 IS_PRODUCTION = getenv("IS_PRODUCTION", "false").lower() == "true"
@@ -23,4 +109,8 @@ IS_PRODUCTION = getenv("IS_PRODUCTION", "false").lower() == "true"
 # In production (HTTPS + cross-origin), use secure=True and samesite="none"
 # In development (localhost), use secure=False and samesite="lax"
 COOKIE_SECURE: bool = IS_PRODUCTION
-COOKIE_SAMESITE: Literal["lax", "strict", "none"] = "none" if IS_PRODUCTION else "lax"
\ No newline at end of file
+COOKIE_SAMESITE: Literal["lax", "strict", "none"] = "none" if IS_PRODUCTION else "lax"
+
+# What to do when the database's Alembic revision differs from the code's head:
+# "fail" refuses to start, "warn" logs and continues, "off" skips the check.
+SCHEMA_CHECK_MODE = getenv("SCHEMA_CHECK_MODE", "fail" if IS_PRODUCTION else "warn").lower()
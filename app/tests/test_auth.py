@@ -91,6 +91,25 @@ async def test_login_and_logout(client: AsyncClient):
     assert 'Max-Age=0' in logout_response.headers['set-cookie']
 
 
+@pytest.mark.asyncio
+async def test_logged_out_session_is_not_served_from_cache(client: AsyncClient):
+    """Logout must evict the session cache, not just the USER_SESSION row."""
+    unique_email = f"testcache_{uuid.uuid4()}@example.com"
+    password = "a_very_secure_password"
+    user_data = {"fullName": "Cache Test User", "email": unique_email, "password": password}
+    assert (await client.post("/users/signup/user", json=user_data)).status_code == 201
+
+    login_response = await client.post("/users/login", json={"email": unique_email, "password": password})
+    auth_cookies = {"shopNear_": login_response.cookies["shopNear_"]}
+
+    # Two checks: the first fills the cache, the second is served from it.
+    assert (await client.get("/users/auth", cookies=auth_cookies)).status_code == 200
+    assert (await client.get("/users/auth", cookies=auth_cookies)).status_code == 200
+
+    assert (await client.post("/users/logout", cookies=auth_cookies)).status_code == 200
+    assert (await client.get("/users/auth", cookies=auth_cookies)).status_code == 401
+
+
 @pytest.mark.asyncio
 async def test_login_failure_wrong_password(client: AsyncClient):
     """Test that login fails with an incorrect password."""
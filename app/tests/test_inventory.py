@@ -39,13 +39,13 @@ async def client():
 @pytest.mark.asyncio
 async def test_add_inventory(client: AsyncClient):
     with patch("app.db.session.DB.getUserSession", new_callable=AsyncMock, return_value=mock_user_session), \
+         patch("app.api.v1.endpoints.functions.inventory.db.load_one", new_callable=AsyncMock) as mock_load_one, \
          patch("app.api.v1.endpoints.functions.inventory.db.get_attr_all") as mock_get_attr, \
          patch("app.api.v1.endpoints.functions.inventory.db.insert", new_callable=AsyncMock) as mock_insert, \
-         patch("uuid.uuid4", return_value=TEST_INVENTORY_ID):
+         patch("app.api.v1.endpoints.functions.inventory.uuid7", return_value=TEST_INVENTORY_ID):
 
-        mock_get_attr.side_effect = [
-            mock_shop, mock_db_user, mock_item, None
-        ]
+        mock_load_one.side_effect = [mock_shop, mock_db_user, mock_item]
+        mock_get_attr.return_value = None
         mock_insert.return_value = (MagicMock(spec=["model_dump"], **{"model_dump.return_value": {}}), True)
 
         inventory_data = {
@@ -65,6 +65,7 @@ async def test_add_inventory(client: AsyncClient):
 @pytest.mark.asyncio
 async def test_update_inventory(client: AsyncClient):
     with patch("app.db.session.DB.getUserSession", new_callable=AsyncMock, return_value=mock_user_session), \
+         patch("app.api.v1.endpoints.functions.inventory.db.load_one", new_callable=AsyncMock) as mock_load_one, \
          patch("app.api.v1.endpoints.functions.inventory.db.get_attr_all") as mock_get_attr, \
          patch("app.api.v1.endpoints.functions.inventory.db.update_attr_all", new_callable=AsyncMock) as mock_update:
 
@@ -76,10 +77,9 @@ async def test_update_inventory(client: AsyncClient):
         )
         mock_updated_record = MagicMock(spec=["model_dump"], **{"model_dump.return_value": {}})
 
-        mock_get_attr.side_effect = [
-            mock_inventory_record, mock_shop, mock_db_user, mock_updated_record
-        ]
-        mock_update.return_value = ("Updated successfully.", True)
+        mock_get_attr.return_value = mock_inventory_record
+        mock_load_one.side_effect = [mock_shop, mock_db_user]
+        mock_update.return_value = (mock_updated_record, True)
 
         update_data = {
             "inventory_id": TEST_INVENTORY_ID,
@@ -130,11 +130,9 @@ async def test_get_inventory_for_shop(client: AsyncClient):
 async def test_delete_inventory(client: AsyncClient):
     """Test successfully deleting an inventory record."""
     with patch("app.db.session.DB.getUserSession", new_callable=AsyncMock, return_value=mock_user_session), \
-         patch("app.api.v1.endpoints.functions.inventory.db.get_attr_all") as mock_get_attr, \
          patch("app.api.v1.endpoints.functions.inventory.db.delete_attr", new_callable=AsyncMock) as mock_delete:
         
-        mock_get_attr.return_value = MagicMock(spec=["model_dump"], **{"model_dump.return_value": {}})
-        mock_delete.return_value = ("Deleted successfully.", True)
+        mock_delete.return_value = (MagicMock(spec=["model_dump"], **{"model_dump.return_value": {}}), True)
 
         headers = {"Cookie": "shopNear_=test_session_token"}
         response = await client.delete(f"/inventory/{TEST_INVENTORY_ID}", headers=headers)
@@ -38,8 +38,10 @@ async def client():
 async def test_add_item(client: AsyncClient):
     """Test successfully adding a new item."""
     with patch("app.db.session.DB.getUserSession", new_callable=AsyncMock, return_value=mock_user_session), \
+         patch("app.api.v1.endpoints.functions.items.DB.load_one", new_callable=AsyncMock) as mock_load_one, \
          patch("app.api.v1.endpoints.functions.items.DB.get_attr_all") as mock_get_attr:
-        mock_get_attr.side_effect = [mock_shop, mock_db_user, None] # Shop owner check
+        mock_load_one.side_effect = [mock_shop, mock_db_user] # Shop owner check
+        mock_get_attr.return_value = None # No duplicate item
         item_data = {"shop_id": TEST_SHOP_ID, "itemName": TEST_ITEM_NAME, "price": 19.99}
         headers = {"Cookie": "shopNear_=test_session_token"}
         response = await client.post("/items/add_item", json=item_data, headers=headers)
@@ -61,20 +63,29 @@ async def test_get_all_items(client: AsyncClient):
         response = await client.get("/items/get_all_items", headers=headers)
     assert response.status_code == 200
 
+@pytest.mark.asyncio
+async def test_get_all_items_keyset(client: AsyncClient):
+    """Test keyset pagination returns a cursor and rejects a malformed one."""
+    with patch("app.db.session.DB.getUserSession", new_callable=AsyncMock, return_value=mock_user_session):
+        headers = {"Cookie": "shopNear_=test_session_token"}
+        response = await client.get("/items/get_all_items?mode=keyset&page_size=1&count=none", headers=headers)
+        assert response.status_code == 200
+        pagination = response.json()["body"]["pagination"]
+        assert "next_cursor" in pagination
+        assert pagination["total"] is None
+
+        bad = await client.get("/items/get_all_items?cursor=not-a-cursor", headers=headers)
+    assert bad.status_code == 400
+
 @pytest.mark.asyncio
 async def test_update_item(client: AsyncClient):
     """Test successfully updating an existing item."""
     with patch("app.db.session.DB.getUserSession", new_callable=AsyncMock, return_value=mock_user_session), \
-         patch("app.api.v1.endpoints.functions.items.DB.get_attr_all") as mock_get_attr, \
          patch("app.api.v1.endpoints.functions.items.DB.update_attr_all", new_callable=AsyncMock) as mock_update:
         
-        # DEFINITIVE FIX: Mock the DB calls specifically for the update endpoint's logic.
-        mock_existing_item = ITEM(id=TEST_ITEM_ID, itemName=TEST_ITEM_NAME, price=19.99, shop_id=uuid.UUID(TEST_SHOP_ID))
+        # The update is a single UPDATE ... RETURNING, so the endpoint builds its response from the returned row.
         mock_updated_item = ITEM(id=TEST_ITEM_ID, itemName=TEST_ITEM_NAME, price=25.50, shop_id=uuid.UUID(TEST_SHOP_ID))
-        
-        # The endpoint calls get_attr_all TWICE: once to find the item, and once to return the updated version.
-        mock_get_attr.side_effect = [mock_existing_item, mock_updated_item]
-        mock_update.return_value = ("Updated successfully", True)
+        mock_update.return_value = (mock_updated_item, True)
 
         update_data = {"shop_id": TEST_SHOP_ID, "itemName": TEST_ITEM_NAME, "price": 25.50}
         headers = {"Cookie": "shopNear_=test_session_token"}
@@ -0,0 +1,104 @@
+import asyncio
+import uuid
+import pytest
+
+from app.db.loader import load_many
+from app.db.models.shop import SHOP, ShopTableEnum
+from app.db.models.user import USER, UserTableEnum
+from app.db.session import DB
+
+
+class RecordingSession:
+    """Stands in for the request's AsyncSession: records every SELECT the loader sends."""
+
+    def __init__(self, rows=(), error=None):
+        self.info = {}
+        self.rows = list(rows)
+        self.error = error
+        self.queries = []
+        self.running = 0
+        self.overlapped = False
+
+    async def exec(self, statement):
+        self.queries.append(statement.compile().params["values"])
+        self.running += 1
+        self.overlapped |= self.running > 1
+        try:
+            await asyncio.sleep(0)
+        finally:
+            self.running -= 1
+        if self.error is not None:
+            raise self.error
+        wanted = set(self.queries[-1])
+        rows = [row for row in self.rows if wanted & {getattr(row, "shop_id", None), getattr(row, "email", None)}]
+
+        class Result:
+            def all(self):
+                return rows
+
+        return Result()
+
+
+def shop(shop_id: uuid.UUID) -> SHOP:
+    return SHOP(shop_id=shop_id, owner_id=uuid.uuid4(), shopName=f"Shop {shop_id}")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_load_one_calls_share_one_select():
+    """Lookups gathered on one session are answered by a single query on that session."""
+    first, second, missing = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    session = RecordingSession(rows=[shop(first), shop(second)])
+
+    results = await asyncio.gather(*(
+        DB.load_one(dbClassNam=ShopTableEnum.SHOP, db_pool=session, column="shop_id", value=str(key))
+        for key in (first, second, missing)
+    ))
+
+    assert len(session.queries) == 1
+    assert set(session.queries[0]) == {first, second, missing}
+    assert [r.shop_id if r else None for r in results] == [first, second, None]
+
+
+@pytest.mark.asyncio
+async def test_gathered_lookups_across_tables_run_one_statement_per_table():
+    """A handler's gathered shop and owner checks cost one SELECT per table, sent one at a time."""
+    shop_ids = [uuid.uuid4() for _ in range(3)]
+    emails = ["owner@example.com", "admin@example.com"]
+    session = RecordingSession(rows=[shop(k) for k in shop_ids] + [USER(id=uuid.uuid4(), email=e) for e in emails])
+
+    results = await asyncio.gather(
+        *(DB.load_one(dbClassNam=ShopTableEnum.SHOP, db_pool=session, column="shop_id", value=k) for k in shop_ids),
+        *(DB.load_one(dbClassNam=UserTableEnum.USER, db_pool=session, column="email", value=e) for e in emails),
+    )
+
+    assert len(session.queries) == 2
+    assert not session.overlapped
+    assert [r.shop_id for r in results[:3]] == shop_ids
+    assert [r.email for r in results[3:]] == emails
+
+
+@pytest.mark.asyncio
+async def test_loaded_rows_are_memoized_for_the_session():
+    """A second lookup of the same key, misses included, does not query again."""
+    found, missing = uuid.uuid4(), uuid.uuid4()
+    session = RecordingSession(rows=[shop(found)])
+
+    await DB.load_many(dbClassNam=ShopTableEnum.SHOP, db_pool=session, column="shop_id", values=[found, missing])
+    again = await DB.load_many(dbClassNam=ShopTableEnum.SHOP, db_pool=session, column="shop_id", values=[found, missing])
+
+    assert len(session.queries) == 1
+    assert again[found].shop_id == found
+    assert again[missing] is None
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_reaches_every_waiter():
+    """When the shared SELECT fails, each lookup in the batch sees the error."""
+    session = RecordingSession(error=RuntimeError("connection lost"))
+    results = await asyncio.gather(
+        *(load_many(SHOP, "shop_id", [uuid.uuid4()], session) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert len(session.queries) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
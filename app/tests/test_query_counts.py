@@ -0,0 +1,70 @@
+import json
+import os
+from pathlib import Path
+import uuid
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlmodel import select
+
+from main import app
+from app.db.models.shop import SHOP
+from app.db.query_counter import QUERY_COUNT_HEADER, track_queries, write_baseline
+from app.db.session import DataBasePool
+from app.helpers import variables
+
+# Re-record with: UPDATE_QUERY_BASELINE=true pytest app/tests/test_query_counts.py
+BASELINE_PATH = Path(__file__).with_name("query_baseline.json")
+BASELINE = json.loads(BASELINE_PATH.read_text())
+UPDATE_BASELINE = os.getenv("UPDATE_QUERY_BASELINE", "false").lower() == "true"
+
+# (method, route, json body) - routes without path parameters so route == URL.
+ENDPOINTS = [
+    ("GET", "/api/v1/analytics/stats", None),
+    ("GET", "/api/v1/categories", None),
+    ("GET", "/api/v1/public/shops", None),
+    ("POST", "/api/v1/users/login", {"email": "query-count@example.com", "password": "not-a-user"}),
+]
+
+
+# --- Pytest Fixture ---
+@pytest_asyncio.fixture
+async def client(monkeypatch):
+    monkeypatch.setattr(variables, "DB_QUERY_COUNTER", True)
+    await DataBasePool.setup()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+    await DataBasePool.teardown()
+
+
+# --- Query Count Tests ---
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method,route,body", ENDPOINTS)
+async def test_query_count_within_baseline(client: AsyncClient, method, route, body):
+    """An endpoint must not issue more statements than its recorded baseline."""
+    response = await client.request(method, route, json=body)
+    count = int(response.headers[QUERY_COUNT_HEADER])
+    key = f"{method} {route}"
+
+    if UPDATE_BASELINE:
+        write_baseline(BASELINE_PATH, {key: count})
+        return
+    assert key in BASELINE, f"{key} has no baseline; re-record query_baseline.json"
+    assert count <= BASELINE[key], f"{key} ran {count} statements (baseline {BASELINE[key]})"
+
+
+@pytest.mark.asyncio
+async def test_repeated_statement_is_flagged():
+    """The same statement shape run in a loop is reported as an N+1 pattern."""
+    await DataBasePool.setup()
+    try:
+        with track_queries() as log:
+            async with DataBasePool.session() as session:
+                for _ in range(variables.DB_N_PLUS_ONE_THRESHOLD):
+                    await session.exec(select(SHOP).where(SHOP.shop_id == uuid.uuid4()))
+    finally:
+        await DataBasePool.teardown()
+
+    assert log.count == variables.DB_N_PLUS_ONE_THRESHOLD
+    assert len(log.repeated()) == 1
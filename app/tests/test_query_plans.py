@@ -0,0 +1,20 @@
+import pytest
+
+from app.db.hot_queries import HOT_QUERIES, explain, seq_scans
+from app.db.session import DataBasePool
+
+
+# --- Query Plan Checks ---
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+async def test_hot_query_uses_index(name: str):
+    """Every declared hot query must be answerable without a sequential scan."""
+    await DataBasePool.setup()
+    try:
+        async with DataBasePool.session() as session:
+            plan = await explain(session, HOT_QUERIES[name]())
+    finally:
+        await DataBasePool.teardown()
+
+    assert seq_scans(plan) == [], f"{name} plans to a Seq Scan: {plan}"
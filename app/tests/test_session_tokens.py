@@ -0,0 +1,63 @@
+import time
+import uuid
+import pytest
+
+from app.core.session import SignedSessionTokens
+from app.db.models.user import UserRole
+from app.helpers import variables
+
+
+def session_data(expires_in: int = 3600) -> dict:
+    return {
+        "pk": str(uuid.uuid4()),
+        "email": "signed@example.com",
+        "ip": "127.0.0.1", "browser": "test-client", "os": "pytest",
+        "created_at": int(time.time()),
+        "expired_at": int(time.time()) + expires_in,
+        "role": UserRole.VENDOR.value,
+    }
+
+
+@pytest.fixture
+def tokens(monkeypatch):
+    monkeypatch.setattr(variables, "SESSION_SIGNING_KEYS", ["current-key", "previous-key"])
+    return SignedSessionTokens()
+
+
+@pytest.mark.asyncio
+async def test_signed_token_round_trip(tokens):
+    token = tokens.create(session_data()).pk
+    session = tokens.verify(token)
+    assert session is not None
+    assert session.email == "signed@example.com"
+    assert session.role == UserRole.VENDOR
+
+
+@pytest.mark.asyncio
+async def test_tampered_or_expired_token_is_rejected(tokens):
+    token = tokens.create(session_data()).pk
+    version, body, signature = token.split(".")
+    assert tokens.verify(f"{version}.{body}x.{signature}") is None
+    assert tokens.verify(str(uuid.uuid4())) is None
+    assert tokens.verify(tokens.create(session_data(expires_in=-1)).pk) is None
+
+
+@pytest.mark.asyncio
+async def test_token_signed_with_previous_key_still_verifies(tokens, monkeypatch):
+    monkeypatch.setattr(variables, "SESSION_SIGNING_KEYS", ["previous-key"])
+    token = tokens.create(session_data()).pk
+    monkeypatch.setattr(variables, "SESSION_SIGNING_KEYS", ["current-key", "previous-key"])
+    assert tokens.verify(token) is not None
+    monkeypatch.setattr(variables, "SESSION_SIGNING_KEYS", ["current-key"])
+    assert tokens.verify(token) is None
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_is_rejected(tokens):
+    token = tokens.create(session_data()).pk
+    await tokens.revoke(token)
+    assert tokens.verify(token) is None
+    # A fresh worker picks the revocation up from Redis.
+    other_worker = SignedSessionTokens()
+    await other_worker.refresh()
+    assert other_worker.verify(token) is None
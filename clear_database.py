@@ -9,25 +9,20 @@ from app.db.session import DataBasePool
 
 async def clear_database():
     await DataBasePool.setup()
-    db_pool = DataBasePool._db_pool
-    
-    if db_pool is None:
-        print("Database pool is not initialized.")
-        return
     
     print("Clearing existing data...")
-    
-    # Delete all items first (foreign key constraint)
-    item_count = len(db_pool.exec(select(ITEM)).all())
-    print(f"  Deleting {item_count} items...")
-    db_pool.exec(delete(ITEM))
-    
-    # Delete all shops
-    shop_count = len(db_pool.exec(select(SHOP)).all())
-    print(f"  Deleting {shop_count} shops...")
-    db_pool.exec(delete(SHOP))
-    
-    db_pool.commit()
+    async with DataBasePool.session() as db_pool:
+        # Delete all items first (foreign key constraint)
+        item_count = len((await db_pool.exec(select(ITEM))).all())
+        print(f"  Deleting {item_count} items...")
+        await db_pool.exec(delete(ITEM))
+        
+        # Delete all shops
+        shop_count = len((await db_pool.exec(select(SHOP))).all())
+        print(f"  Deleting {shop_count} shops...")
+        await db_pool.exec(delete(SHOP))
+        
+        await db_pool.commit()
     print("✅ Database cleared successfully!")
 
 if __name__ == "__main__":
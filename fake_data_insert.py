@@ -1,21 +1,19 @@
 import uuid
 import time
-from sqlmodel import Session, select
+from sqlmodel import select
 from app.db.models.shop import SHOP
 from app.db.models.item import ITEM
 from app.db.models.user import USER, UserRole
 from app.db.session import DataBasePool
+from app.helpers.ids import uuid7
 from app.helpers.loginHelper import security
 from app.helpers.geo import create_point_geometry
 
 async def setup_db():
     await DataBasePool.setup()
 
-def run():
-    db_pool = DataBasePool._db_pool
-    if db_pool is None:
-        print("Database pool is not initialized.")
-        return
+async def run():
+    db_pool = DataBasePool.session()
 
     # --- Use the IDs you provided ---
     owner_id = uuid.UUID("3e592b3b-5064-4ff5-9fcf-2bf8382972fe")
@@ -24,7 +22,7 @@ def run():
 
     # --- 1. Create or Find the Vendor User ---
     statement = select(USER).where(USER.id == owner_id)
-    existing_user = db_pool.exec(statement).first()
+    existing_user = (await db_pool.exec(statement)).first()
     if not existing_user:
         vendor_user = USER(id=owner_id, email=vendor_email, password=security().hash_password("Anita@2024"), fullName="Anita Verma", role=UserRole.VENDOR)
         db_pool.add(vendor_user)
@@ -34,7 +32,7 @@ def run():
 
     # --- 2. Create or Update the Shop with Location ---
     statement = select(SHOP).where(SHOP.shop_id == shop_id)
-    existing_shop = db_pool.exec(statement).first()
+    existing_shop = (await db_pool.exec(statement)).first()
     
     # Define the location point
     # shop_location = create_point_geometry(latitude=20.2961, longitude=85.8245)
@@ -64,16 +62,17 @@ def run():
     # --- 3. Create or Find an Item for the Shop ---
     item_name = "Hand-painted Silk Scarf"
     statement = select(ITEM).where(ITEM.itemName == item_name, ITEM.shop_id == shop_id)
-    existing_item = db_pool.exec(statement).first()
+    existing_item = (await db_pool.exec(statement)).first()
     if not existing_item:
-        item = ITEM(id=uuid.uuid4(), shop_id=shop_id, itemName=item_name, price=1250.00, description="A beautiful, one-of-a-kind silk scarf.")
+        item = ITEM(id=uuid7(), shop_id=shop_id, itemName=item_name, price=1250.00, description="A beautiful, one-of-a-kind silk scarf.")
         db_pool.add(item)
         print(f"Creating item: {item.itemName}")
     else:
         print(f"Found existing item: {existing_item.itemName}")
 
     # --- 4. Commit to Database ---
-    db_pool.commit()
+    await db_pool.commit()
+    await db_pool.close()
     print("\n--- Seeding Complete! ---")
     print("User, Shop, and Item are now correctly configured in the database.")
     print("-------------------------\n")
@@ -82,5 +81,8 @@ def run():
 if __name__ == "__main__":
     import asyncio
     print("Starting database seeding...")
-    asyncio.run(setup_db())
-    run()
\ No newline at end of file
+    async def main():
+        await setup_db()
+        await run()
+
+    asyncio.run(main())
\ No newline at end of file
@@ -2,9 +2,17 @@ from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from app.api.v1.endpoints.usersApi import user_router
 from app.core.limiter import limiter
+from app.core.session import signed_sessions
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
+import asyncio
+from app.db.audit import audit_writer
+from app.db.cache_bus import listen_for_invalidations
+from app.db.maintenance import maintenance_loop, session_sweeper_loop
+from app.db.query_counter import QueryCountMiddleware
 from app.db.session import DataBasePool
+from app.helpers import variables
+from RDB.redis_client import close_async_redis_client
 from app.api.v1.endpoints.shopsApi import shop_router
 from app.api.v1.endpoints.itemsApi import item_router
 from app.api.v1.endpoints.inventoryApi import inventory_router
@@ -24,13 +32,28 @@ port = 8050
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # setup() runs the first maintenance pass; this keeps partitions topped up.
     await DataBasePool.setup()
+    if variables.SESSION_BACKEND == "signed":
+        # Start with the current revocation list; verify() keeps it fresh from then on.
+        await signed_sessions.refresh()
+    maintenance_task = asyncio.create_task(maintenance_loop())
+    cache_listener_task = asyncio.create_task(listen_for_invalidations())
+    session_sweeper_task = asyncio.create_task(session_sweeper_loop())
     try:
         create_collections()
     except Exception as e:
         print(f"Warning: Could not connect to Typesense: {e}")
     yield
+    background = (maintenance_task, cache_listener_task, session_sweeper_task)
+    for task in background:
+        task.cancel()
+    # Let them unwind (release advisory locks, close the listener connection)
+    # before their engines are disposed.
+    await asyncio.gather(*background, return_exceptions=True)
+    await audit_writer.stop()
     await DataBasePool.teardown()
+    await close_async_redis_client()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -57,6 +80,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Tracks the current endpoint for DB logging; counts queries when DB_QUERY_COUNTER=true.
+app.add_middleware(QueryCountMiddleware)
+
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)  # type: ignore
 
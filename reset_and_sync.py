@@ -27,8 +27,15 @@ def reset_collections():
     
     # Now sync the data
     print("\nSyncing data from database...")
+    import asyncio
+    from app.db.engines import EngineRegistry
     from typesense_helper.sync_db_to_typesense import sync_database_to_typesense
-    sync_database_to_typesense()
+
+    async def sync():
+        await sync_database_to_typesense()
+        await EngineRegistry.dispose()
+
+    asyncio.run(sync())
 
 if __name__ == "__main__":
     reset_collections()
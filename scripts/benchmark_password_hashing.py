@@ -0,0 +1,92 @@
+"""Login throughput ceiling of the configured Argon2 parameters.
+
+Times a single password verification, then runs as many concurrent
+verifications as --concurrency allows against thread pools of growing size
+and reports verifications (logins) per second, per thread, and the worst
+event-loop stall seen meanwhile. Cost parameters come from the environment
+(ARGON2_TIME_COST, ARGON2_MEMORY_COST_KIB, ARGON2_PARALLELISM).
+
+    python scripts/benchmark_password_hashing.py --seconds 5 --concurrency 64
+"""
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.helpers import variables
+from app.helpers.loginHelper import security
+
+PASSWORD = "Benchmark@123"
+
+
+async def _loop_stall(stop: asyncio.Event) -> float:
+    """Largest delay of a 1 ms sleep while the benchmark runs."""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        worst = max(worst, time.perf_counter() - started - 0.001)
+    return worst
+
+
+async def _run(workers: int, concurrency: int, seconds: float, password_hash: str):
+    pool = ThreadPoolExecutor(max_workers=workers)
+    loop = asyncio.get_running_loop()
+    deadline = time.perf_counter() + seconds
+    done = 0
+
+    async def client():
+        nonlocal done
+        while time.perf_counter() < deadline:
+            await loop.run_in_executor(pool, security().verify_password, password_hash, PASSWORD)
+            done += 1
+
+    stop = asyncio.Event()
+    stall = asyncio.create_task(_loop_stall(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    pool.shutdown()
+    return done / elapsed, await stall
+
+
+async def main(seconds: float, concurrency: int):
+    cpus = os.cpu_count() or 1
+    print(
+        f"Argon2id time_cost={variables.ARGON2_TIME_COST} "
+        f"memory_cost={variables.ARGON2_MEMORY_COST_KIB} KiB "
+        f"parallelism={variables.ARGON2_PARALLELISM}, {cpus} CPUs"
+    )
+    password_hash = security().hash_password(PASSWORD)
+
+    samples = []
+    for _ in range(10):
+        started = time.perf_counter()
+        security().verify_password(password_hash, PASSWORD)
+        samples.append(time.perf_counter() - started)
+    single = sorted(samples)[len(samples) // 2]
+    print(f"One verification: {single * 1000:.1f} ms (median of 10), "
+          f"i.e. {1 / single:.1f} logins/s per core when run inline")
+
+    workers = 1
+    print(f"{'threads':>8} {'logins/s':>10} {'per thread':>11} {'max loop stall':>15}")
+    while True:
+        rate, stall = await _run(workers, concurrency, seconds, password_hash)
+        print(f"{workers:>8} {rate:>10.1f} {rate / workers:>11.1f} {stall * 1000:>12.1f} ms")
+        if workers >= cpus:
+            break
+        workers = min(workers * 2, cpus)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each run")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent logins")
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds, args.concurrency))
@@ -1,27 +1,26 @@
 import sys
 import os
 import asyncio
-import uuid
-from sqlmodel import Session, select, create_engine
+from sqlmodel import select
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from app.db.engines import EngineRegistry, Workload
 from app.db.models.user import USER, UserRole
+from app.helpers.ids import uuid7
 from app.helpers.loginHelper import security
-from app.helpers.variables import DATABASE_URL
 
 async def create_admin_user():
     print("Connecting to database...")
-    engine = create_engine(DATABASE_URL)
     
     admin_email = "admin@nearbuy.com"
     admin_password = "AdminPassword@123"
     
-    with Session(engine) as session:
+    async with EngineRegistry.session(Workload.ADMIN) as session:
         # Check if admin already exists
         statement = select(USER).where(USER.email == admin_email)
-        existing_user = session.exec(statement).first()
+        existing_user = (await session.exec(statement)).first()
         
         if existing_user:
             print(f"Admin user already exists: {admin_email}")
@@ -30,13 +29,13 @@ async def create_admin_user():
                 print("Updating existing user to ADMIN role...")
                 existing_user.role = UserRole.ADMIN
                 session.add(existing_user)
-                session.commit()
+                await session.commit()
                 print("User updated.")
             return
 
         print(f"Creating new admin user: {admin_email}")
         new_admin = USER(
-            id=uuid.uuid4(),
+            id=uuid7(),
             email=admin_email,
             password=security().hash_password(admin_password),
             fullName="System Admin",
@@ -44,10 +43,14 @@ async def create_admin_user():
         )
         
         session.add(new_admin)
-        session.commit()
+        await session.commit()
         print("Admin user created successfully!")
         print(f"Email: {admin_email}")
         print(f"Password: {admin_password}")
 
 if __name__ == "__main__":
-    asyncio.run(create_admin_user())
+    async def main():
+        await create_admin_user()
+        await EngineRegistry.dispose()
+
+    asyncio.run(main())
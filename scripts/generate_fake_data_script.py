@@ -1,18 +1,17 @@
 import sys
 import os
 import asyncio
-from sqlmodel import Session, create_engine
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from app.db.engines import EngineRegistry, Workload
 from app.helpers.fake_data_generator import generate_fake_data
-from app.helpers.variables import DATABASE_URL
 
-def run_fake_data_generation():
-    engine = create_engine(DATABASE_URL)
-    with Session(engine) as session:
-        generate_fake_data(session, num_shops=10, items_per_shop=5)
+async def run_fake_data_generation():
+    async with EngineRegistry.session(Workload.ADMIN) as session:
+        await generate_fake_data(session, 10, 5)
+    await EngineRegistry.dispose()
 
 if __name__ == "__main__":
-    run_fake_data_generation()
+    asyncio.run(run_fake_data_generation())
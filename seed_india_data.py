@@ -1,11 +1,11 @@
 import asyncio
-import uuid
 import random
 from sqlmodel import select
-from app.db.models.shop import SHOP
-from app.db.models.item import ITEM
-from app.db.models.user import USER, UserRole
-from app.db.session import DataBasePool
+from app.db.models.shop import SHOP, ShopTableEnum
+from app.db.models.item import ITEM, ItemTableEnum
+from app.db.models.user import USER, UserRole, UserTableEnum
+from app.db.session import DB, DataBasePool
+from app.helpers.ids import uuid7
 from app.helpers.loginHelper import security
 
 # India Data: States and major cities with approximate lat/lon
@@ -68,19 +68,50 @@ ITEM_TEMPLATES = {
     "Sports": [("Cricket Bat", 2500), ("Football", 800), ("Yoga Mat", 600), ("Dumbbells (Pair)", 1200)]
 }
 
+def _select_items(shop_type):
+    items = ITEM_TEMPLATES.get(shop_type, [])
+
+    # For grocery shops, ensure essential items are always included
+    if shop_type == "Grocery":
+        # Essential grocery items: Rice, Milk, Cooking Oil
+        essential_items = [
+            ("Rice (5kg)", 300),
+            ("Milk (1L)", 60),
+            ("Cooking Oil (1L)", 150)
+        ]
+        other_items = [item for item in items if item not in essential_items]
+        # Add essential items plus 1-2 other random items
+        num_additional = random.randint(1, min(2, len(other_items)))
+        return essential_items + random.sample(other_items, num_additional)
+
+    # For electronics shops, ensure essential items are always included
+    if shop_type == "Electronics":
+        # Essential electronics items: Batteries, Chargers, Headphones
+        essential_items = [
+            ("Batteries", 50),
+            ("Chargers", 500),
+            ("Headphones", 2000)
+        ]
+        other_items = [item for item in items if item not in essential_items]
+        # Add essential items plus 1-3 other random items
+        num_additional = random.randint(1, min(3, len(other_items)))
+        return essential_items + random.sample(other_items, num_additional)
+
+    # For other shop types, select 2-4 items randomly as before
+    return random.sample(items, min(len(items), random.randint(2, 4)))
+
+
 async def seed_data():
     await DataBasePool.setup()
-    db_pool = DataBasePool._db_pool
-    
-    if db_pool is None:
-        print("Database pool is not initialized.")
-        return
+    db_pool = DataBasePool.session()
 
     print("Starting data seeding for India...")
 
+    # Plan every shop first, then write users, shops and items in a few bulk statements.
+    planned_shops = []
     for state, cities in INDIA_DATA.items():
         for city, (base_lat, base_lon) in cities.items():
-            print(f"Seeding data for {city}, {state}...")
+            print(f"Planning data for {city}, {state}...")
             
             # Create 4-5 shops per city
             # First shop is ALWAYS grocery, second is ALWAYS electronics
@@ -99,115 +130,98 @@ async def seed_data():
                 # Randomize location slightly around the city center (approx within 5-10km)
                 lat_offset = random.uniform(-0.05, 0.05)
                 lon_offset = random.uniform(-0.05, 0.05)
-                shop_lat = base_lat + lat_offset
-                shop_lon = base_lon + lon_offset
-                
+
                 shop_name = f"{city} {shop_name_suffix} {i+1}"
-                owner_email = f"owner_{city.lower().replace(' ', '')}_{i+1}@example.com"
-                
-                # 1. Create Vendor User
-                statement = select(USER).where(USER.email == owner_email)
-                existing_user = db_pool.exec(statement).first()
-                
-                if not existing_user:
-                    owner_id = uuid.uuid4()
-                    vendor_user = USER(
-                        id=owner_id,
-                        email=owner_email,
-                        password=security().hash_password("Password@123"),
-                        fullName=f"Owner {shop_name}",
-                        role=UserRole.VENDOR
-                    )
-                    db_pool.add(vendor_user)
-                    # print(f"  Created user: {owner_email}")
-                else:
-                    owner_id = existing_user.id
-                    # print(f"  User exists: {owner_email}")
+                planned_shops.append({
+                    "shop_name": shop_name,
+                    "owner_email": f"owner_{city.lower().replace(' ', '')}_{i+1}@example.com",
+                    "address": f"Shop {i+1}, {city}, {state}",
+                    "description": f"{shop_desc_suffix} in {city}.",
+                    "latitude": base_lat + lat_offset,
+                    "longitude": base_lon + lon_offset,
+                    "items": _select_items(shop_type),
+                })
 
-                # 2. Create Shop
-                # Check if shop exists by name and owner (simplified check)
-                statement = select(SHOP).where(SHOP.shopName == shop_name, SHOP.owner_id == owner_id)
-                existing_shop = db_pool.exec(statement).first()
-                
-                if not existing_shop:
-                    shop_id = uuid.uuid4()
-                    shop = SHOP(
-                        shop_id=shop_id,
-                        owner_id=owner_id,
-                        fullName=f"Owner {shop_name}",
-                        shopName=shop_name,
-                        address=f"Shop {i+1}, {city}, {state}",
-                        contact=f"+91-{random.randint(7000000000, 9999999999)}",
-                        description=f"{shop_desc_suffix} in {city}.",
-                        is_open=True,
-                        latitude=shop_lat,
-                        longitude=shop_lon
-                    )
-                    db_pool.add(shop)
-                    # print(f"  Created shop: {shop_name}")
-                else:
-                    shop_id = existing_shop.shop_id
-                    existing_shop.latitude = shop_lat
-                    existing_shop.longitude = shop_lon
-                    db_pool.add(existing_shop)
-                    # print(f"  Shop exists: {shop_name}")
-
-                # 3. Create Items for the Shop
-                items = ITEM_TEMPLATES.get(shop_type, [])
-                
-                # For grocery shops, ensure essential items are always included
-                if shop_type == "Grocery":
-                    # Essential grocery items: Rice, Milk, Cooking Oil
-                    essential_items = [
-                        ("Rice (5kg)", 300),
-                        ("Milk (1L)", 60),
-                        ("Cooking Oil (1L)", 150)
-                    ]
-                    other_items = [item for item in items if item not in essential_items]
-                    # Add essential items plus 1-2 other random items
-                    num_additional = random.randint(1, min(2, len(other_items)))
-                    selected_items = essential_items + random.sample(other_items, num_additional)
-                
-                # For electronics shops, ensure essential items are always included
-                elif shop_type == "Electronics":
-                    # Essential electronics items: Batteries, Chargers, Headphones
-                    essential_items = [
-                        ("Batteries", 50),
-                        ("Chargers", 500),
-                        ("Headphones", 2000)
-                    ]
-                    other_items = [item for item in items if item not in essential_items]
-                    # Add essential items plus 1-3 other random items
-                    num_additional = random.randint(1, min(3, len(other_items)))
-                    selected_items = essential_items + random.sample(other_items, num_additional)
-                
-                else:
-                    # For other shop types, select 2-4 items randomly as before
-                    selected_items = random.sample(items, min(len(items), random.randint(2, 4)))
-                
-                for item_name, base_price in selected_items:
-                    statement = select(ITEM).where(ITEM.itemName == item_name, ITEM.shop_id == shop_id)
-                    existing_item = db_pool.exec(statement).first()
-                    
-                    if not existing_item:
-                        price = base_price + random.randint(-100, 100) # Slight price variation
-                        item = ITEM(
-                            id=uuid.uuid4(),
-                            shop_id=shop_id,
-                            itemName=item_name,
-                            price=float(price),
-                            description=f"High quality {item_name} available at {shop_name}."
-                        )
-                        db_pool.add(item)
-                        # print(f"    Added item: {item_name}")
-    
     try:
-        db_pool.commit()
+        # 1. Vendor users (existing emails are kept as they are)
+        # Every seeded vendor shares the same password, so hash it once.
+        password = security().hash_password("Password@123")
+        user_rows = [
+            {
+                "email": plan["owner_email"],
+                "password": password,
+                "fullName": f"Owner {plan['shop_name']}",
+                "role": UserRole.VENDOR,
+            }
+            for plan in planned_shops
+        ]
+        _, ok = await DB.insert_many(dbClassNam=UserTableEnum.USER, rows=user_rows, db_pool=db_pool, ignore_conflicts=True)
+        if not ok:
+            raise RuntimeError("Could not insert vendor users")
+        emails = [plan["owner_email"] for plan in planned_shops]
+        owners = {u.email: u.id for u in (await db_pool.exec(select(USER).where(USER.email.in_(emails)))).all()}
+
+        # 2. Shops: new ones are inserted, existing ones (same name and owner) get their location updated
+        names = [plan["shop_name"] for plan in planned_shops]
+        existing_shops = {
+            (shop.shopName, shop.owner_id): shop
+            for shop in (await db_pool.exec(select(SHOP).where(SHOP.shopName.in_(names)))).all()
+        }
+        shop_rows = []
+        for plan in planned_shops:
+            owner_id = owners[plan["owner_email"]]
+            existing_shop = existing_shops.get((plan["shop_name"], owner_id))
+            plan["shop_id"] = existing_shop.shop_id if existing_shop else uuid7()
+            shop_rows.append({
+                "shop_id": plan["shop_id"],
+                "owner_id": owner_id,
+                "fullName": f"Owner {plan['shop_name']}",
+                "shopName": plan["shop_name"],
+                "address": plan["address"],
+                "contact": existing_shop.contact if existing_shop else f"+91-{random.randint(7000000000, 9999999999)}",
+                "description": plan["description"],
+                "is_open": True,
+                "latitude": plan["latitude"],
+                "longitude": plan["longitude"],
+            })
+        _, ok = await DB.upsert_many(
+            dbClassNam=ShopTableEnum.SHOP, rows=shop_rows, db_pool=db_pool,
+            conflict_columns=["shop_id"], update_columns=["latitude", "longitude"],
+        )
+        if not ok:
+            raise RuntimeError("Could not write shops")
+
+        # 3. Items for every shop, skipping names the shop already has
+        shop_ids = [plan["shop_id"] for plan in planned_shops]
+        existing_items = {
+            (item.shop_id, item.itemName)
+            for item in (await db_pool.exec(select(ITEM).where(ITEM.shop_id.in_(shop_ids)))).all()
+        }
+        item_rows = []
+        for plan in planned_shops:
+            for item_name, base_price in plan["items"]:
+                if (plan["shop_id"], item_name) in existing_items:
+                    continue
+                price = base_price + random.randint(-100, 100) # Slight price variation
+                item_rows.append({
+                    "id": uuid7(),
+                    "shop_id": plan["shop_id"],
+                    "itemName": item_name,
+                    "price": float(price),
+                    "description": f"High quality {item_name} available at {plan['shop_name']}.",
+                })
+        _, ok = await DB.insert_many(dbClassNam=ItemTableEnum.ITEM, rows=item_rows, db_pool=db_pool)
+        if not ok:
+            raise RuntimeError("Could not insert items")
+
+        await db_pool.commit()
         print("\n--- Seeding Complete! ---")
-        print("Database populated with India-based data.")
+        print(f"Database populated with India-based data: {len(shop_rows)} shops, {len(item_rows)} new items.")
     except Exception as e:
         print(f"Error committing to database: {e}")
-        db_pool.rollback()
+        await db_pool.rollback()
+    finally:
+        await db_pool.close()
 
 if __name__ == "__main__":
     asyncio.run(seed_data())
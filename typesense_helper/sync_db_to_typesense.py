@@ -1,23 +1,23 @@
+import asyncio
 import os
 import sys
-from sqlmodel import Session, create_engine, select
+from sqlmodel import select
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from app.db.engines import EngineRegistry, Workload
 from app.db.models.shop import SHOP
 from app.db.models.item import ITEM
 from typesense_helper.typesense_client import get_typesense_client, create_collections
-from app.helpers.variables import DATABASE_URL
 
-engine = create_engine(DATABASE_URL)
-
-def sync_database_to_typesense():
+async def sync_database_to_typesense():
     ts_client = get_typesense_client()
     print("Ensuring Typesense collections exist...")
-    create_collections()
+    # Typesense calls are blocking HTTP; keep them off the event loop.
+    await asyncio.to_thread(create_collections)
 
-    with Session(engine) as session:
+    async with EngineRegistry.session(Workload.SYNC, read_only=True) as session:
         print("Fetching all shops from the database...")
-        shops = session.exec(select(SHOP)).all()
+        shops = (await session.exec(select(SHOP))).all()
         print(f"Found {len(shops)} shops in database")
         
         shop_documents = []
@@ -46,7 +46,8 @@ def sync_database_to_typesense():
         
         if shop_documents:
             print(f"Indexing {len(shop_documents)} shops...")
-            result = ts_client.collections["shops"].documents.import_(
+            result = await asyncio.to_thread(
+                ts_client.collections["shops"].documents.import_,
                 shop_documents, {"action": "upsert"}
             )
             print(f"Import result: {result}")
@@ -55,7 +56,7 @@ def sync_database_to_typesense():
             print("No shop documents to index!")
             
         print("Fetching all items from the database...")
-        items = session.exec(select(ITEM)).all()
+        items = (await session.exec(select(ITEM))).all()
         print(f"Found {len(items)} items in database")
         item_documents = []
         for item in items:
@@ -70,7 +71,8 @@ def sync_database_to_typesense():
 
         if item_documents:
             print(f"Indexing {len(item_documents)} items...")
-            result = ts_client.collections["items"].documents.import_(
+            result = await asyncio.to_thread(
+                ts_client.collections["items"].documents.import_,
                 item_documents, {"action": "upsert"}
             )
             print(f"Import result summary: {len([r for r in result if r.get('success')])} successful")
@@ -78,5 +80,9 @@ def sync_database_to_typesense():
 
 if __name__ == "__main__":
     print("Starting full database sync to Typesense...")
-    sync_database_to_typesense()
+    async def main():
+        await sync_database_to_typesense()
+        await EngineRegistry.dispose()
+
+    asyncio.run(main())
     print("Sync complete.")
@@ -6,11 +6,10 @@ from app.db.session import DataBasePool
 
 async def verify_data():
     await DataBasePool.setup()
-    db_pool = DataBasePool._db_pool
-    
-    shop_count = db_pool.exec(select(func.count()).select_from(SHOP)).one()
-    item_count = db_pool.exec(select(func.count()).select_from(ITEM)).one()
-    
+    async with DataBasePool.session() as db_pool:
+        shop_count = (await db_pool.exec(select(func.count()).select_from(SHOP))).one()
+        item_count = (await db_pool.exec(select(func.count()).select_from(ITEM))).one()
+
     print(f"Total Shops: {shop_count}")
     print(f"Total Items: {item_count}")
 